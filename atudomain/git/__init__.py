@@ -1,2 +1,9 @@
 from atudomain.git.repository import Git
+from atudomain.git.objects import BranchDetails
+from atudomain.git.objects import CommitPage
 from atudomain.git.objects import Commit
+from atudomain.git.objects import FileChange
+from atudomain.git.objects import LazyCommit
+from atudomain.git.objects import NewCommit
+from atudomain.git.objects import ObjectInfo
+from atudomain.git.async_repository import AsyncGit
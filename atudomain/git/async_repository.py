@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+
+import asyncio
+import subprocess
+
+from atudomain.git.objects import Commit
+from atudomain.git.parsers import GitBranchParser
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.parsers import GitMachineLogParser
+from atudomain.git.repository import Git
+from atudomain.git.repository import LOG_FORMAT_MACHINE
+from atudomain.git.repository import LOG_FORMAT_RAW
+from atudomain.git.repository import NoCommitsError
+from atudomain.git.repository import NotARepositoryError
+
+from typing import AsyncIterator, List, Set
+
+
+class AsyncGit:
+    """
+    Asyncio counterpart of Git. Runs git with asyncio subprocesses, so it does not block event loop.
+    Number of git processes running at the same time is limited by max_processes, except for git processes
+    of iter_commits, which wait on full pipe without slot while the caller handles yielded commits.
+    Cancelling a call kills its git process.
+
+    :param directory: Path to git repository or bare repository. It is checked on first call.
+    :type directory: str
+    :param executable_directory: Path to directory with git binary.
+    :type executable_directory: str
+    :param log_format: Default output format requested from git log, 'raw' or 'machine'.
+    :type log_format: str
+    :param max_processes: Maximum number of git processes run or read at the same time by this object.
+    :type max_processes: int
+    """
+    def __init__(
+            self,
+            directory: str,
+            executable_directory="",
+            log_format=LOG_FORMAT_RAW,
+            max_processes=4
+    ):
+        self._directory = directory
+        self._executable_directory = executable_directory
+        self._log_format = Git._check_log_format(log_format)
+        self._max_processes = max_processes
+        self._semaphore = None
+        self._directory_checked = False
+        self._processes: Set[asyncio.subprocess.Process] = set()
+        self._git_log_parser = GitLogParser()
+        self._git_machine_log_parser = GitMachineLogParser()
+        self._git_branch_parser = GitBranchParser()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(
+            self
+    ) -> None:
+        """
+        Kills git processes that are still running.
+        """
+        for process in list(self._processes):
+            await self._kill(process)
+
+    def _build_env(
+            self
+    ):
+        return Git._build_executable_env(self._executable_directory)
+
+    def _get_semaphore(
+            self
+    ) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_processes)
+        return self._semaphore
+
+    async def _spawn(
+            self,
+            command: List[str],
+            stdin=asyncio.subprocess.DEVNULL
+    ) -> asyncio.subprocess.Process:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *command,
+            stdin=stdin,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._build_env(),
+            cwd=self._directory
+        )
+        self._processes.add(process)
+        return process
+
+    async def _kill(
+            self,
+            process: asyncio.subprocess.Process
+    ) -> None:
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+        self._processes.discard(process)
+
+    async def _check_directory(
+            self
+    ) -> None:
+        if self._directory_checked:
+            return
+        completed_process = await self._run(["rev-parse", "--git-dir"], check=False, check_directory=False)
+        if completed_process.returncode != 0:
+            raise NotARepositoryError(self._directory)
+        self._directory_checked = True
+
+    async def _run(
+            self,
+            command: List[str],
+            check=True,
+            stdin=asyncio.subprocess.DEVNULL,
+            check_directory=True
+    ) -> subprocess.CompletedProcess:
+        """
+        Runs command and gets its output, waiting for free slot if max_processes are running.
+
+        :param command: Command to run.
+        :type command: List[str]
+        :param check: True if exception should be raised when command return code is not 0.
+        :type check: bool
+        :return: Result of command with stdout and stderr decoded.
+        :rtype: subprocess.CompletedProcess
+        """
+        if check_directory:
+            await self._check_directory()
+        async with self._get_semaphore():
+            process = await self._spawn(command, stdin=stdin)
+            try:
+                stdout, stderr = await process.communicate()
+            except BaseException:
+                await self._kill(process)
+                raise
+            self._processes.discard(process)
+        completed_process = subprocess.CompletedProcess(
+            ["git"] + command,
+            process.returncode,
+            stdout.decode(),
+            stderr.decode()
+        )
+        if check and completed_process.returncode != 0:
+            print(completed_process.stderr)
+            completed_process.check_returncode()
+        return completed_process
+
+    async def get_commits(
+            self,
+            revision_range="",
+            log_format=None,
+            lazy=False
+    ) -> List[Commit]:
+        """
+        Extracts commits from git 'log --pretty=raw' command, creates Commit objects from them
+        and appends them to a list.
+
+        :param revision_range: Any revision range that could be used with git log command.
+        :type revision_range: str
+        :param log_format: Output format requested from git log, 'raw' or 'machine'. None means instance default.
+        :type log_format: str
+        :param lazy: True if LazyCommit objects should be returned.
+        :type lazy: bool
+        :return: List of Commit objects extracted.
+        :rtype: List[Commit]
+        """
+        log_format = Git._check_log_format(log_format or self._log_format)
+        completed_process = await self._run(
+            Git._build_log_command([revision_range] if revision_range else [], log_format),
+            check=False
+        )
+        if completed_process.returncode == 128:
+            raise NoCommitsError(completed_process.stderr)
+        parser = self._git_machine_log_parser if log_format == LOG_FORMAT_MACHINE else self._git_log_parser
+        if lazy:
+            return parser.extract_lazy_commits(completed_process.stdout)
+        return parser.extract_commits(completed_process.stdout)
+
+    async def iter_commits(
+            self,
+            revision_range="",
+            log_format=None,
+            chunk_size=65536
+    ) -> AsyncIterator[Commit]:
+        """
+        Streams commits from git log command, yielding Commit objects while git is still writing its output.
+        Closing the iterator early (e.g. with aclose()) or cancelling it kills the git process.
+        Slot of max_processes is released while the caller handles yielded commits, so a slow consumer
+        does not block other calls, and taken again before the next read from git.
+
+        :param revision_range: Any revision range that could be used with git log command.
+        :type revision_range: str
+        :param log_format: Output format requested from git log, 'raw' or 'machine'. None means instance default.
+        :type log_format: str
+        :param chunk_size: Number of bytes read from git at once.
+        :type chunk_size: int
+        :return: Asynchronous iterator over Commit objects extracted.
+        :rtype: AsyncIterator[Commit]
+        """
+        log_format = Git._check_log_format(log_format or self._log_format)
+        if log_format == LOG_FORMAT_MACHINE:
+            parser, separator, skip = self._git_machine_log_parser, b"\0", 1
+        else:
+            parser, separator, skip = self._git_log_parser, b"\ncommit ", 1
+        await self._check_directory()
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        acquired = True
+        process = None
+        stderr_task = None
+        try:
+            process = await self._spawn(
+                Git._build_log_command([revision_range] if revision_range else [], log_format)
+            )
+            # stderr is drained at the same time as stdout, so git never blocks on a full stderr pipe.
+            stderr_task = asyncio.ensure_future(process.stderr.read())
+            pending = bytearray()
+            searched = 0
+            while True:
+                chunk = await process.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                pending += chunk
+                # Only new data, and separator possibly split between chunks, is searched.
+                end = pending.rfind(separator, max(searched - len(separator) + 1, 0))
+                searched = len(pending)
+                if end == -1:
+                    continue
+                commits = parser.extract_commits(pending[:end].decode())
+                del pending[:end + skip]
+                searched = len(pending)
+                semaphore.release()
+                acquired = False
+                for commit in commits:
+                    yield commit
+                await semaphore.acquire()
+                acquired = True
+            commits = parser.extract_commits(pending.decode()) if pending.strip(b"\0\n") else []
+            stderr = await stderr_task
+            if await process.wait() == 128:
+                raise NoCommitsError(stderr.decode())
+            semaphore.release()
+            acquired = False
+            for commit in commits:
+                yield commit
+        finally:
+            if stderr_task is not None and not stderr_task.done():
+                stderr_task.cancel()
+            if process is not None:
+                await self._kill(process)
+            if acquired:
+                semaphore.release()
+
+    async def get_branches(
+            self,
+            include=None,
+            exclude=None
+    ) -> List[str]:
+        """
+        Extracts branch names from 'git branch --all' command and appends them to a list.
+        Skips redundant information such as current branch pointer ('*') or relations ('->').
+
+        :param include: Regex (re module) to include branch names in list. None means all.
+        :type include: str
+        :param exclude: Regex (re module) to exclude branch names from list.
+        :type exclude: str
+        :return: List of branch names.
+        :rtype: List[str]
+        """
+        branches = self._git_branch_parser.extract_branches(
+            (await self._run(["branch", "--all"])).stdout
+        )
+        return Git._filter_branches(branches, include, exclude)
+
+    async def add_files(
+            self,
+            pathspec: str
+    ):
+        """
+        Adds files to stash.
+
+        :param pathspec: Git-add-compatible single-word expression.
+        :type pathspec: str
+        """
+        await self._run(["add", pathspec])
+
+    async def commit(
+            self,
+            message: str
+    ):
+        """
+        Creates a commit in a non-interactive way.
+
+        :param message: Commit message.
+        :type message: str
+        """
+        await self._run(["commit", "-m", message])
+
+    async def pull(
+            self
+    ):
+        """
+        Equivalent of 'git pull' without arguments.
+        """
+        await self._run(["pull"])
+
+    async def push(
+            self,
+            remote="origin",
+            branch="",
+            set_upstream=False
+    ):
+        """
+        Pushes to specific branch in specific remote.
+
+        :param remote: Name of remote.
+        :type remote: str
+        :param branch: Name of branch.
+        :type branch: str
+        :param set_upstream: If specified branch should become upstream.
+        :type set_upstream: bool
+        """
+        if branch:
+            command = ["push", remote, branch]
+        else:
+            command = ["push", remote]
+        if set_upstream:
+            command.append("--set-upstream")
+        await self._run(command)
+
+    async def checkout(
+            self,
+            target: str
+    ):
+        """
+        Checkouts to specified target.
+
+        :param target: Branch, commit or other target.
+        :type target: str
+        """
+        await self._run(["checkout", target])
+
+    async def checkout_new_branch(
+            self,
+            branch: str
+    ):
+        """
+        Creates new branch and checkouts to it.
+
+        :param branch: Name of branch.
+        :type branch: str
+        """
+        await self._run(["checkout", "-b", branch])
+
+    async def config(
+            self,
+            name: str,
+            value: str
+    ):
+        """
+        Changes git config values in current repository.
+
+        :param name: Name of entry to change.
+        :type name: str
+        :param value: New value for entry.
+        :type value: str
+        """
+        await self._run(["config", name, value])
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import binascii
+import datetime
+import hashlib
+import os
+import sqlite3
+
+from atudomain.git.objects import Commit
+from typing import Iterable, List, Optional, Tuple
+
+
+CACHE_FILE_NAME = "atudomain-git-commits.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    commit_id TEXT PRIMARY KEY,
+    tree TEXT NOT NULL,
+    parents TEXT NOT NULL,
+    author TEXT NOT NULL,
+    author_email TEXT NOT NULL,
+    author_timestamp INTEGER NOT NULL,
+    committer TEXT NOT NULL,
+    committer_email TEXT NOT NULL,
+    committer_timestamp INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    revision_range TEXT PRIMARY KEY,
+    include_tip TEXT NOT NULL,
+    exclude_tip TEXT NOT NULL,
+    commit_ids BLOB NOT NULL
+);
+"""
+
+
+def build_cache_path(
+        git_directory: str,
+        cache_directory=None
+) -> str:
+    """
+    Builds path of cache database. Without cache_directory the database is stored in git directory,
+    otherwise in cache_directory under name derived from git directory path.
+
+    :param git_directory: Absolute path to git directory.
+    :type git_directory: str
+    :param cache_directory: Optional directory for cache databases of many repositories.
+    :type cache_directory: str
+    :return: Path to cache database.
+    :rtype: str
+    """
+    if cache_directory is None:
+        return os.path.join(git_directory, CACHE_FILE_NAME)
+    digest = hashlib.sha1(os.path.abspath(git_directory).encode()).hexdigest()
+    return os.path.join(cache_directory, f"{digest}.sqlite")
+
+
+class GitCommitCache:
+    """
+    Persistent SQLite cache of parsed commits and of revision tips seen by previous queries.
+    Commits are immutable, so they are stored once by commit id and shared by all revision ranges.
+
+    :param path: Path to cache database, created if needed.
+    :type path: str
+    """
+    def __init__(
+            self,
+            path: str
+    ):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+
+    @staticmethod
+    def _pack_commit_ids(
+            commit_ids: List[str]
+    ) -> bytes:
+        return binascii.unhexlify(''.join(commit_ids))
+
+    @staticmethod
+    def _unpack_commit_ids(
+            packed: bytes,
+            id_size: int
+    ) -> List[str]:
+        hexlified = binascii.hexlify(packed).decode()
+        return [hexlified[i:i + id_size] for i in range(0, len(hexlified), id_size)]
+
+    def load_revision(
+            self,
+            revision_range: str
+    ) -> Optional[Tuple[str, str, List[str]]]:
+        """
+        :return: Include tip, exclude tip ('' if none) and commit ids of last query for revision_range.
+        :rtype: Optional[Tuple[str, str, List[str]]]
+        """
+        row = self._connection.execute(
+            "SELECT include_tip, exclude_tip, commit_ids FROM revisions WHERE revision_range = ?",
+            (revision_range,)
+        ).fetchone()
+        if row is None:
+            return None
+        include_tip, exclude_tip, packed = row
+        return include_tip, exclude_tip, self._unpack_commit_ids(packed, len(include_tip))
+
+    def store_revision(
+            self,
+            revision_range: str,
+            include_tip: str,
+            exclude_tip: str,
+            commit_ids: List[str],
+            new_commits: Iterable[Commit]
+    ) -> None:
+        """
+        Stores newly parsed commits and the tips and ordered commit ids of revision_range.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        x.commit_id,
+                        x.tree,
+                        ' '.join(x.parents),
+                        x.author,
+                        x.author_email,
+                        int(x.author_date.timestamp()),
+                        x.committer,
+                        x.committer_email,
+                        int(x.committer_date.timestamp()),
+                        x.message
+                    )
+                    for x in new_commits
+                )
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO revisions VALUES (?, ?, ?, ?)",
+                (revision_range, include_tip, exclude_tip, self._pack_commit_ids(commit_ids))
+            )
+
+    @staticmethod
+    def _build_commit(
+            row: tuple,
+            identities: dict
+    ) -> Commit:
+        (
+            commit_id,
+            tree,
+            parents,
+            author,
+            author_email,
+            author_timestamp,
+            committer,
+            committer_email,
+            committer_timestamp,
+            message
+        ) = row
+        intern = identities.setdefault
+        parents = tuple([intern(x, x) for x in parents.split(' ')]) if parents else ()
+        for timestamp in (author_timestamp, committer_timestamp):
+            if timestamp not in identities:
+                identities[timestamp] = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+        return Commit(
+            is_merge=len(parents) > 1,
+            commit_id=intern(commit_id, commit_id),
+            tree=tree,
+            parents=parents,
+            author=intern(author, author),
+            author_email=intern(author_email, author_email),
+            author_date=identities[author_timestamp],
+            committer=intern(committer, committer),
+            committer_email=intern(committer_email, committer_email),
+            committer_date=identities[committer_timestamp],
+            message=message
+        )
+
+    def get_commits(
+            self,
+            commit_ids: List[str]
+    ) -> Optional[List[Commit]]:
+        """
+        :return: Cached commits in order of commit_ids or None if any of them is missing.
+        :rtype: Optional[List[Commit]]
+        """
+        commits = dict()
+        identities = dict()
+        for start in range(0, len(commit_ids), 500):
+            chunk = commit_ids[start:start + 500]
+            for row in self._connection.execute(
+                    f"SELECT * FROM commits WHERE commit_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+            ):
+                commits[row[0]] = self._build_commit(row, identities)
+        if len(commits) != len(set(commit_ids)):
+            return None
+        return [commits[x] for x in commit_ids]
+
+    def clear(
+            self
+    ) -> None:
+        """
+        Removes all cached commits and revisions.
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM commits")
+            self._connection.execute("DELETE FROM revisions")
+
+    def close(
+            self
+    ) -> None:
+        self._connection.close()
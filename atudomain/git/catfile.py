@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import subprocess
+import threading
+
+from atudomain.git.objects import ObjectInfo
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+BATCH = "--batch"
+BATCH_CHECK = "--batch-check"
+
+
+class GitCatFile:
+    """
+    Keeps long-running 'git cat-file --batch' and 'git cat-file --batch-check' processes
+    and pipelines object requests through them. Processes are started on first use
+    and restarted when they exit unexpectedly.
+
+    :param start_process: Callable starting git with given arguments and binary stdin/stdout pipes.
+    :type start_process: Callable[[List[str]], subprocess.Popen]
+    """
+    def __init__(
+            self,
+            start_process: Callable[[List[str]], subprocess.Popen]
+    ):
+        self._start_process = start_process
+        self._processes: Dict[str, subprocess.Popen] = dict()
+
+    def _get_process(
+            self,
+            mode: str
+    ) -> subprocess.Popen:
+        process = self._processes.get(mode)
+        if process is None or process.poll() is not None:
+            self._stop_process(mode)
+            process = self._start_process(["cat-file", mode])
+            self._processes[mode] = process
+        return process
+
+    def _stop_process(
+            self,
+            mode: str
+    ) -> None:
+        process = self._processes.pop(mode, None)
+        if process is None:
+            return
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+    @staticmethod
+    def _write_requests(
+            process: subprocess.Popen,
+            object_ids: List[str]
+    ) -> None:
+        try:
+            process.stdin.write(''.join(f"{x}\n" for x in object_ids).encode())
+            process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    @staticmethod
+    def _read_response(
+            process: subprocess.Popen,
+            mode: str
+    ) -> Tuple[Optional[ObjectInfo], Optional[bytes]]:
+        header = process.stdout.readline()
+        if not header.endswith(b'\n'):
+            raise EOFError("git cat-file exited unexpectedly")
+        if header.endswith((b' missing\n', b' ambiguous\n')):
+            return None, None
+        fields = header.decode().split()
+        object_info = ObjectInfo(
+            object_id=fields[0],
+            object_type=fields[1],
+            size=int(fields[2])
+        )
+        if mode == BATCH_CHECK:
+            return object_info, None
+        data = process.stdout.read(object_info.size + 1)
+        if len(data) != object_info.size + 1:
+            raise EOFError("git cat-file exited unexpectedly")
+        return object_info, data[:-1]
+
+    def _query(
+            self,
+            mode: str,
+            object_ids: List[str]
+    ) -> List[Tuple[Optional[ObjectInfo], Optional[bytes]]]:
+        for object_id in object_ids:
+            if not object_id or '\n' in object_id:
+                raise ValueError(f"Invalid object name: {object_id!r}")
+        responses = list()
+        for attempt in range(2):
+            process = self._get_process(mode)
+            writer = threading.Thread(
+                target=self._write_requests,
+                args=(process, object_ids[len(responses):]),
+                daemon=True
+            )
+            writer.start()
+            try:
+                while len(responses) < len(object_ids):
+                    responses.append(self._read_response(process, mode))
+                writer.join()
+                return responses
+            except (EOFError, OSError, ValueError):
+                self._stop_process(mode)
+                writer.join()
+                if attempt:
+                    raise
+
+    def read_objects(
+            self,
+            object_ids: Iterable[str]
+    ) -> List[Tuple[Optional[ObjectInfo], Optional[bytes]]]:
+        """
+        Reads contents of many objects through a single 'git cat-file --batch' process.
+
+        :param object_ids: Object names, e.g. SHAs or revisions like 'HEAD^{tree}'.
+        :type object_ids: Iterable[str]
+        :return: Pairs of ObjectInfo and object data, in order of object_ids. (None, None) for missing objects.
+        :rtype: List[Tuple[Optional[ObjectInfo], Optional[bytes]]]
+        """
+        return self._query(BATCH, list(object_ids))
+
+    def object_info(
+            self,
+            object_ids: Iterable[str]
+    ) -> List[Optional[ObjectInfo]]:
+        """
+        Reads object headers through a single 'git cat-file --batch-check' process.
+
+        :param object_ids: Object names, e.g. SHAs or revisions like 'HEAD^{tree}'.
+        :type object_ids: Iterable[str]
+        :return: ObjectInfo for every object name, None for missing objects.
+        :rtype: List[Optional[ObjectInfo]]
+        """
+        return [x for x, _ in self._query(BATCH_CHECK, list(object_ids))]
+
+    def close(
+            self
+    ) -> None:
+        """
+        Stops running cat-file processes. They are started again on next request.
+        """
+        for mode in list(self._processes):
+            self._stop_process(mode)
+
+
+class MissingObjectError(Exception):
+    pass
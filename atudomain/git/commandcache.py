@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+import collections
+import os
+import re
+import subprocess
+import threading
+
+from atudomain.git.refs import find_common_directory
+from typing import List, Optional, Tuple
+
+
+DEFAULT_MAX_SIZE = 64 * 2 ** 20
+
+READ_ONLY_COMMANDS = frozenset([
+    "branch",
+    "cat-file",
+    "for-each-ref",
+    "log",
+    "ls-tree",
+    "merge-base",
+    "rev-list",
+    "rev-parse",
+    "show",
+    "symbolic-ref",
+])
+
+DATE_OPTIONS = frozenset([
+    "--since",
+    "--since-as-filter",
+    "--after",
+    "--until",
+    "--before",
+])
+
+# Unix timestamps and ISO 8601 dates, e.g. from datetime.isoformat(), which do not depend on current time.
+ABSOLUTE_DATE_REGEX = re.compile(
+    r"@?\d+|\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+)
+
+
+def is_read_only(
+        command: List[str]
+) -> bool:
+    """
+    :return: True if git command does not modify repository and its output depends only on refs,
+        objects and configuration and, for dates relative to current time, on time, see is_cacheable.
+        Commands of these kinds which modify repository, e.g. 'branch -d', are not recognized,
+        except for 'branch' and 'symbolic-ref'.
+    :rtype: bool
+    """
+    if not command or command[0] not in READ_ONLY_COMMANDS:
+        return False
+    if command[0] == "branch":
+        return all(x in ("--all", "-a", "--list", "-r", "--remotes") for x in command[1:])
+    if command[0] == "symbolic-ref":
+        arguments = [x for x in command[1:] if not x.startswith("-")]
+        return len(arguments) < 2 and "-d" not in command and "--delete" not in command
+    return True
+
+
+def is_cacheable(
+        command: List[str]
+) -> bool:
+    """
+    :return: True if git command is read-only and does not depend on current time, i.e. has no
+        relative dates, e.g. '--since=2 weeks ago', and no reflog selectors, e.g. 'master@{yesterday}'.
+    :rtype: bool
+    """
+    if not is_read_only(command):
+        return False
+    for index, argument in enumerate(command):
+        if "@{" in argument:
+            return False
+        option, separator, value = argument.partition("=")
+        if option in DATE_OPTIONS:
+            if not separator:
+                value = command[index + 1] if index + 1 < len(command) else ""
+            if not ABSOLUTE_DATE_REGEX.fullmatch(value.strip()):
+                return False
+    return True
+
+
+class GitCommandCache:
+    """
+    LRU cache of results of read-only git commands, bounded by total length of cached outputs.
+    Results are keyed by command arguments and fingerprint of repository state: modification times
+    of HEAD, packed-refs and config and of every directory under refs. Git updates refs by renaming
+    lock files, which changes modification time of directory holding the ref. Entries of previous
+    fingerprints are dropped as soon as state changes.
+
+    :param git_directory: Absolute path to git directory.
+    :type git_directory: str
+    :param max_size: Maximum total length of stdout and stderr of cached results.
+    :type max_size: int
+    """
+    def __init__(
+            self,
+            git_directory: str,
+            max_size=DEFAULT_MAX_SIZE
+    ):
+        common_directory = find_common_directory(git_directory)
+        self._paths = [
+            os.path.join(git_directory, "HEAD"),
+            os.path.join(common_directory, "packed-refs"),
+            os.path.join(common_directory, "config"),
+        ]
+        self._refs_directory = os.path.join(common_directory, "refs")
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[Tuple, subprocess.CompletedProcess]" = collections.OrderedDict()
+        self._fingerprint: Optional[Tuple] = None
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """
+        :rtype: int
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        :rtype: int
+        """
+        return self._misses
+
+    @property
+    def size(self) -> int:
+        """
+        :return: Total length of stdout and stderr of cached results.
+        :rtype: int
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _stat(
+            path: str
+    ) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def fingerprint(
+            self
+    ) -> Tuple:
+        """
+        :return: Stats of files and directories holding refs, changing whenever any ref changes.
+        :rtype: Tuple
+        """
+        stats = [self._stat(x) for x in self._paths]
+        stack = [self._refs_directory]
+        while stack:
+            path = stack.pop()
+            stats.append((path, self._stat(path)))
+            try:
+                stack.extend(x.path for x in os.scandir(path) if x.is_dir(follow_symlinks=False))
+            except OSError:
+                pass
+        return tuple(stats)
+
+    def build_key(
+            self,
+            command: List[str],
+            text=True
+    ) -> Tuple:
+        """
+        :param command: Command arguments.
+        :type command: List[str]
+        :param text: True if output of command is decoded to str, False for bytes.
+        :type text: bool
+        :return: Key of command result in current repository state.
+        :rtype: Tuple
+        """
+        return (tuple(command), text), self.fingerprint()
+
+    def _remove_oldest(
+            self
+    ) -> None:
+        _, completed_process = self._entries.popitem(last=False)
+        self._size -= len(completed_process.stdout) + len(completed_process.stderr)
+
+    def get(
+            self,
+            key: Tuple
+    ) -> Optional[subprocess.CompletedProcess]:
+        """
+        :param key: Key from build_key.
+        :type key: Tuple
+        :return: Cached result or None, counted as hit or miss.
+        :rtype: Optional[subprocess.CompletedProcess]
+        """
+        with self._lock:
+            if key[1] != self._fingerprint:
+                self._clear()
+                self._fingerprint = key[1]
+            completed_process = self._entries.get(key)
+            if completed_process is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return completed_process
+
+    def put(
+            self,
+            key: Tuple,
+            completed_process: subprocess.CompletedProcess
+    ) -> None:
+        """
+        Caches result, evicting least recently used results when cache gets too big.
+        Results bigger than the whole cache are not cached.
+
+        :param key: Key from build_key, built before running command.
+        :type key: Tuple
+        :param completed_process: Result of command.
+        :type completed_process: subprocess.CompletedProcess
+        """
+        size = len(completed_process.stdout) + len(completed_process.stderr)
+        with self._lock:
+            if size > self._max_size or key[1] != self._fingerprint or key in self._entries:
+                return
+            self._entries[key] = completed_process
+            self._size += size
+            while self._size > self._max_size:
+                self._remove_oldest()
+
+    def _clear(
+            self
+    ) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def invalidate(
+            self
+    ) -> None:
+        """
+        Drops all cached results, hit and miss counters are kept.
+        """
+        with self._lock:
+            self._clear()
+            self._fingerprint = None
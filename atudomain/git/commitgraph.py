@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+import binascii
+import bisect
+import mmap
+import os
+import struct
+
+from typing import Dict, List, Optional, Tuple
+
+
+SIGNATURE = b"CGPH"
+HASH_SIZES = {
+    1: 20,
+    2: 32,
+}
+PARENT_NONE = 0x70000000
+PARENT_EXTRA_EDGES = 0x80000000
+LAST_EDGE = 0x80000000
+
+
+class _CommitGraphLayer:
+    """
+    Single memory mapped commit-graph file. Positions of parents are global,
+    i.e. they count commits of all base layers first.
+    """
+    def __init__(
+            self,
+            path: str,
+            base_position: int
+    ):
+        self.path = path
+        self.base_position = base_position
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._data
+        if data[:4] != SIGNATURE or data[4] != 1:
+            raise ValueError(f"Unsupported commit-graph file: {path}")
+        if data[5] not in HASH_SIZES:
+            raise ValueError(f"Unsupported commit-graph hash version: {path}")
+        self.hash_size = HASH_SIZES[data[5]]
+        chunk_count = data[6]
+        chunks: Dict[bytes, int] = dict()
+        for i in range(chunk_count):
+            position = 8 + i * 12
+            chunks[data[position:position + 4]] = struct.unpack(">Q", data[position + 4:position + 12])[0]
+        for chunk_id in (b"OIDF", b"OIDL", b"CDAT"):
+            if chunk_id not in chunks:
+                raise ValueError(f"Missing {chunk_id.decode()} chunk in commit-graph file: {path}")
+        self._fanout = chunks[b"OIDF"]
+        self._names = chunks[b"OIDL"]
+        self._commit_data = chunks[b"CDAT"]
+        self._extra_edges = chunks.get(b"EDGE")
+        self.count = self._fanout_value(255)
+
+    def _fanout_value(
+            self,
+            index: int
+    ) -> int:
+        position = self._fanout + index * 4
+        return struct.unpack(">I", self._data[position:position + 4])[0]
+
+    def name(
+            self,
+            index: int
+    ) -> bytes:
+        position = self._names + index * self.hash_size
+        return self._data[position:position + self.hash_size]
+
+    def find(
+            self,
+            binary_id: bytes
+    ) -> Optional[int]:
+        first_byte = binary_id[0]
+        low = self._fanout_value(first_byte - 1) if first_byte else 0
+        high = self._fanout_value(first_byte)
+        while low < high:
+            middle = (low + high) // 2
+            name = self.name(middle)
+            if name < binary_id:
+                low = middle + 1
+            elif name > binary_id:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def commit_data(
+            self,
+            index: int
+    ) -> Tuple[bytes, List[int], int, int]:
+        """
+        :return: Root tree, parent positions, topological level and commit time of commit at index.
+        """
+        position = self._commit_data + index * (self.hash_size + 16)
+        tree = self._data[position:position + self.hash_size]
+        first_parent, second_parent, generation_word, time_word = struct.unpack(
+            ">IIII",
+            self._data[position + self.hash_size:position + self.hash_size + 16]
+        )
+        parents = list()
+        if first_parent != PARENT_NONE:
+            parents.append(first_parent)
+        if second_parent & PARENT_EXTRA_EDGES:
+            edge_position = self._extra_edges + (second_parent & 0x7fffffff) * 4
+            while True:
+                edge = struct.unpack(">I", self._data[edge_position:edge_position + 4])[0]
+                parents.append(edge & 0x7fffffff)
+                if edge & LAST_EDGE:
+                    break
+                edge_position += 4
+        elif second_parent != PARENT_NONE:
+            parents.append(second_parent)
+        generation = generation_word >> 2
+        commit_time = ((generation_word & 3) << 32) | time_word
+        return tree, parents, generation, commit_time
+
+    def close(
+            self
+    ) -> None:
+        self._data.close()
+
+
+class CommitGraphFile:
+    """
+    Reader of git commit-graph file ('objects/info/commit-graph') or split commit-graph chain
+    ('objects/info/commit-graphs/commit-graph-chain'). Gives constant time access to parents,
+    root trees, commit times and generation numbers (topological levels) of commits.
+
+    :param objects_directory: Path to git objects directory.
+    :type objects_directory: str
+    """
+    def __init__(
+            self,
+            objects_directory: str
+    ):
+        self._paths = self.find_paths(objects_directory)
+        if not self._paths:
+            raise FileNotFoundError(f"No commit-graph in {objects_directory}")
+        self._signature = self._build_signature(self._paths)
+        self._layers: List[_CommitGraphLayer] = list()
+        base_position = 0
+        for path in self._paths:
+            layer = _CommitGraphLayer(path, base_position)
+            self._layers.append(layer)
+            base_position += layer.count
+        self._count = base_position
+        self._bases = [x.base_position for x in self._layers]
+        self.hash_size = self._layers[0].hash_size
+
+    @staticmethod
+    def find_paths(
+            objects_directory: str
+    ) -> List[str]:
+        """
+        :return: Paths of commit-graph files, base layer first. Empty if repository has no commit-graph.
+        :rtype: List[str]
+        """
+        graphs_directory = os.path.join(objects_directory, "info", "commit-graphs")
+        chain = os.path.join(graphs_directory, "commit-graph-chain")
+        if os.path.isfile(chain):
+            with open(chain, "r") as f:
+                return [
+                    os.path.join(graphs_directory, f"graph-{x.strip()}.graph")
+                    for x in f
+                    if x.strip()
+                ]
+        single = os.path.join(objects_directory, "info", "commit-graph")
+        if os.path.isfile(single):
+            return [single]
+        return list()
+
+    @staticmethod
+    def _build_signature(
+            paths: List[str]
+    ) -> Tuple:
+        return tuple((x, os.stat(x).st_mtime_ns) for x in paths)
+
+    def is_current(
+            self,
+            objects_directory: str
+    ) -> bool:
+        """
+        Checks if commit-graph files on disk are the same as when they were opened.
+        """
+        try:
+            return self._build_signature(self.find_paths(objects_directory)) == self._signature
+        except OSError:
+            return False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _layer(
+            self,
+            position: int
+    ) -> Tuple[_CommitGraphLayer, int]:
+        layer = self._layers[bisect.bisect_right(self._bases, position) - 1]
+        return layer, position - layer.base_position
+
+    def lookup(
+            self,
+            commit_id: str
+    ) -> Optional[int]:
+        """
+        :param commit_id: Commit SHA.
+        :type commit_id: str
+        :return: Global position of commit in commit-graph or None if commit is not in commit-graph.
+        :rtype: Optional[int]
+        """
+        try:
+            binary_id = binascii.unhexlify(commit_id)
+        except (binascii.Error, ValueError):
+            return None
+        if len(binary_id) != self.hash_size:
+            return None
+        for layer in self._layers:
+            index = layer.find(binary_id)
+            if index is not None:
+                return layer.base_position + index
+        return None
+
+    def commit_id(
+            self,
+            position: int
+    ) -> str:
+        layer, index = self._layer(position)
+        return binascii.hexlify(layer.name(index)).decode()
+
+    def commit_data(
+            self,
+            position: int
+    ) -> Tuple[str, List[int], int, int]:
+        """
+        :return: Root tree SHA, parent positions, generation number and commit timestamp.
+        :rtype: Tuple[str, List[int], int, int]
+        """
+        layer, index = self._layer(position)
+        tree, parents, generation, commit_time = layer.commit_data(index)
+        return binascii.hexlify(tree).decode(), parents, generation, commit_time
+
+    def parents(
+            self,
+            position: int
+    ) -> List[int]:
+        return self.commit_data(position)[1]
+
+    def generation(
+            self,
+            position: int
+    ) -> int:
+        return self.commit_data(position)[2]
+
+    def commit_time(
+            self,
+            position: int
+    ) -> int:
+        return self.commit_data(position)[3]
+
+    def close(
+            self
+    ) -> None:
+        for layer in self._layers:
+            layer.close()
+        self._layers.clear()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+
+import binascii
+import csv
+import datetime
+import gzip
+import io
+import json
+import struct
+
+from atudomain.git.objects import Commit
+from atudomain.git.table import CommitTable
+from atudomain.git.table import _CommitTableBuilder
+from atudomain.git.table import _require_numpy
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_BINARY = "binary"
+
+EXTENSIONS = {
+    ".ndjson": FORMAT_NDJSON,
+    ".jsonl": FORMAT_NDJSON,
+    ".csv": FORMAT_CSV,
+    ".commits": FORMAT_BINARY,
+}
+
+FIELDS = (
+    "commit_id",
+    "tree",
+    "parents",
+    "author",
+    "author_email",
+    "author_timestamp",
+    "author_offset",
+    "committer",
+    "committer_email",
+    "committer_timestamp",
+    "committer_offset",
+    "message",
+)
+
+BINARY_MAGIC = b"AGITCOMMITS\x02"
+RECORD_IDENTITY = 1
+RECORD_COMMIT = 2
+FRAME_HEADER = struct.Struct("<BI")
+IDENTITY_HEADER = struct.Struct("<I")
+COMMIT_HEADER = struct.Struct("<IIqqhhBB")
+
+BUFFER_SIZE = 2 ** 20
+
+
+def _find_format(
+        path: str,
+        file_format: Optional[str]
+) -> str:
+    if file_format is None:
+        name = path[:-len(".gz")] if path.endswith(".gz") else path
+        for extension, extension_format in EXTENSIONS.items():
+            if name.endswith(extension):
+                return extension_format
+        raise ValueError(f"Unknown format of file: {path}")
+    if file_format not in (FORMAT_NDJSON, FORMAT_CSV, FORMAT_BINARY):
+        raise ValueError(f"Unknown format: {file_format}")
+    return file_format
+
+
+def _open(
+        path: str,
+        mode: str
+) -> BinaryIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode, buffering=BUFFER_SIZE)
+
+
+def _encode(
+        text: str
+) -> bytes:
+    return text.encode("utf-8", "surrogateescape")
+
+
+def _decode(
+        data: bytes
+) -> str:
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _get_offset(
+        date: datetime.datetime
+) -> int:
+    """
+    :return: Offset of timezone of date in minutes.
+    """
+    offset = date.utcoffset()
+    return int(offset.total_seconds()) // 60 if offset else 0
+
+
+def _to_record(
+        commit: Commit
+) -> tuple:
+    """
+    :return: Fields of commit in order of FIELDS, dates as Unix timestamps and offsets of their timezones.
+    """
+    return (
+        commit.commit_id,
+        commit.tree,
+        commit.parents,
+        commit.author,
+        commit.author_email,
+        int(commit.author_date.timestamp()),
+        _get_offset(commit.author_date),
+        commit.committer,
+        commit.committer_email,
+        int(commit.committer_date.timestamp()),
+        _get_offset(commit.committer_date),
+        commit.message
+    )
+
+
+def _write_ndjson(
+        records: Iterable[tuple],
+        stream: BinaryIO
+) -> int:
+    count = 0
+    for record in records:
+        document = dict(zip(FIELDS, record))
+        document["parents"] = list(record[2])
+        stream.write(_encode(json.dumps(document, ensure_ascii=False)))
+        stream.write(b"\n")
+        count += 1
+    return count
+
+
+def _write_csv(
+        records: Iterable[tuple],
+        stream: BinaryIO
+) -> int:
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8", errors="surrogateescape", newline="")
+    writer = csv.writer(text_stream)
+    writer.writerow(FIELDS)
+    count = 0
+    for record in records:
+        writer.writerow(record[:2] + (' '.join(record[2]),) + record[3:])
+        count += 1
+    text_stream.flush()
+    text_stream.detach()
+    return count
+
+
+def _write_binary(
+        records: Iterable[tuple],
+        stream: BinaryIO
+) -> int:
+    """
+    Writes magic and frames of type and payload length. Identity frames define names and e-mails,
+    numbered in order of appearance, commit frames refer to them. Commit frame holds author and committer
+    numbers, timestamps, timezone offsets, parent count and size of binary hashes, then binary commit id,
+    tree and parents and UTF-8 message.
+    """
+    stream.write(BINARY_MAGIC)
+    identity_ids = dict()
+    count = 0
+    for commit_id, tree, parents, author, author_email, author_timestamp, author_offset, \
+            committer, committer_email, committer_timestamp, committer_offset, message in records:
+        person_ids = list()
+        for identity in ((author, author_email), (committer, committer_email)):
+            identity_id = identity_ids.get(identity)
+            if identity_id is None:
+                identity_id = identity_ids[identity] = len(identity_ids)
+                name = _encode(identity[0])
+                payload = IDENTITY_HEADER.pack(len(name)) + name + _encode(identity[1])
+                stream.write(FRAME_HEADER.pack(RECORD_IDENTITY, len(payload)))
+                stream.write(payload)
+            person_ids.append(identity_id)
+        hashes = binascii.unhexlify(commit_id + tree + ''.join(parents))
+        message = _encode(message)
+        stream.write(FRAME_HEADER.pack(RECORD_COMMIT, COMMIT_HEADER.size + len(hashes) + len(message)))
+        stream.write(COMMIT_HEADER.pack(
+            person_ids[0],
+            person_ids[1],
+            author_timestamp,
+            committer_timestamp,
+            author_offset,
+            committer_offset,
+            len(parents),
+            len(commit_id) // 2
+        ))
+        stream.write(hashes)
+        stream.write(message)
+        count += 1
+    return count
+
+
+WRITERS = {
+    FORMAT_NDJSON: _write_ndjson,
+    FORMAT_CSV: _write_csv,
+    FORMAT_BINARY: _write_binary,
+}
+
+
+def export_commits(
+        commits: Iterable[Commit],
+        path: str,
+        file_format: Optional[str] = None
+) -> int:
+    """
+    Writes commits to file while iterating over them, so with streaming source, e.g. Git.iter_commits,
+    memory usage does not depend on history size. Dates are written as Unix timestamps with offsets
+    of their timezones in minutes, commit changes are not written.
+
+    Formats are 'ndjson', one JSON object per line, 'csv' with header row and space separated parents,
+    and 'binary', compact length-prefixed records with every author and committer stored once.
+    Files with '.gz' suffix are compressed with gzip.
+
+    :param commits: Commits, e.g. from Git.iter_commits.
+    :type commits: Iterable[Commit]
+    :param path: Path of file to write.
+    :type path: str
+    :param file_format: 'ndjson', 'csv' or 'binary', None means format from extension of path:
+        '.ndjson', '.jsonl', '.csv' or '.commits'.
+    :type file_format: str
+    :return: Number of written commits.
+    :rtype: int
+    """
+    writer = WRITERS[_find_format(path, file_format)]
+    with _open(path, "wb") as stream:
+        return writer((_to_record(x) for x in commits), stream)
+
+
+def _read_ndjson(
+        stream: BinaryIO
+) -> Iterator[tuple]:
+    for line in stream:
+        if not line.strip():
+            continue
+        document = json.loads(_decode(line))
+        yield (
+            document["commit_id"],
+            document["tree"],
+            tuple(document["parents"]),
+            document["author"],
+            document["author_email"],
+            document["author_timestamp"],
+            document["author_offset"],
+            document["committer"],
+            document["committer_email"],
+            document["committer_timestamp"],
+            document["committer_offset"],
+            document["message"]
+        )
+
+
+def _read_csv(
+        stream: BinaryIO
+) -> Iterator[tuple]:
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8", errors="surrogateescape", newline="")
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is not None and tuple(header) != FIELDS:
+        raise ValueError(f"Unknown CSV header: {header}")
+    for commit_id, tree, parents, author, author_email, author_timestamp, author_offset, \
+            committer, committer_email, committer_timestamp, committer_offset, message in reader:
+        yield (
+            commit_id,
+            tree,
+            tuple(parents.split(' ')) if parents else (),
+            author,
+            author_email,
+            int(author_timestamp),
+            int(author_offset),
+            committer,
+            committer_email,
+            int(committer_timestamp),
+            int(committer_offset),
+            message
+        )
+
+
+def _read_binary(
+        stream: BinaryIO
+) -> Iterator[tuple]:
+    if stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a binary commits file")
+    identities = list()
+    while True:
+        frame_header = stream.read(FRAME_HEADER.size)
+        if not frame_header:
+            return
+        record_type, length = FRAME_HEADER.unpack(frame_header)
+        payload = stream.read(length)
+        if len(payload) != length:
+            raise ValueError("Truncated binary commits file")
+        if record_type == RECORD_IDENTITY:
+            name_length, = IDENTITY_HEADER.unpack_from(payload)
+            name_end = IDENTITY_HEADER.size + name_length
+            identities.append((_decode(payload[IDENTITY_HEADER.size:name_end]), _decode(payload[name_end:])))
+        elif record_type == RECORD_COMMIT:
+            author_id, committer_id, author_timestamp, committer_timestamp, author_offset, committer_offset, \
+                parent_count, hash_size = COMMIT_HEADER.unpack_from(payload)
+            hashes_end = COMMIT_HEADER.size + (parent_count + 2) * hash_size
+            hashes = binascii.hexlify(payload[COMMIT_HEADER.size:hashes_end]).decode()
+            hash_size *= 2
+            author, author_email = identities[author_id]
+            committer, committer_email = identities[committer_id]
+            yield (
+                hashes[:hash_size],
+                hashes[hash_size:2 * hash_size],
+                tuple([hashes[i:i + hash_size] for i in range(2 * hash_size, len(hashes), hash_size)]),
+                author,
+                author_email,
+                author_timestamp,
+                author_offset,
+                committer,
+                committer_email,
+                committer_timestamp,
+                committer_offset,
+                _decode(payload[hashes_end:])
+            )
+
+
+READERS = {
+    FORMAT_NDJSON: _read_ndjson,
+    FORMAT_CSV: _read_csv,
+    FORMAT_BINARY: _read_binary,
+}
+
+
+def _iter_records(
+        path: str,
+        file_format: Optional[str]
+) -> Iterator[tuple]:
+    reader = READERS[_find_format(path, file_format)]
+    with _open(path, "rb") as stream:
+        yield from reader(stream)
+
+
+def _intern_date(
+        timestamp: int,
+        offset: int,
+        identities: dict
+) -> datetime.datetime:
+    key = (timestamp, offset)
+    date = identities.get(key)
+    if date is None:
+        timezone = datetime.timezone(datetime.timedelta(minutes=offset)) if offset else datetime.timezone.utc
+        date = identities[key] = datetime.datetime.fromtimestamp(timestamp, tz=timezone)
+    return date
+
+
+def _create_commit(
+        record: tuple,
+        identities: dict
+) -> Commit:
+    (
+        commit_id,
+        tree,
+        parents,
+        author,
+        author_email,
+        author_timestamp,
+        author_offset,
+        committer,
+        committer_email,
+        committer_timestamp,
+        committer_offset,
+        message
+    ) = record
+    intern = identities.setdefault
+    return Commit(
+        is_merge=len(parents) > 1,
+        commit_id=commit_id,
+        tree=tree,
+        parents=parents,
+        author=intern(author, author),
+        author_email=intern(author_email, author_email),
+        author_date=_intern_date(author_timestamp, author_offset, identities),
+        committer=intern(committer, committer),
+        committer_email=intern(committer_email, committer_email),
+        committer_date=_intern_date(committer_timestamp, committer_offset, identities),
+        message=message
+    )
+
+
+def load_commits(
+        path: str,
+        file_format: Optional[str] = None
+) -> Iterator[Commit]:
+    """
+    Reads commits written by export_commits, yielding them while reading the file.
+    Dates are in timezones of exported dates, i.e. in UTC for commits parsed from git log.
+
+    :param path: Path of exported file.
+    :type path: str
+    :param file_format: Format like in export_commits, None means format from extension of path.
+    :type file_format: str
+    :return: Iterator over Commit objects in order of export.
+    :rtype: Iterator[Commit]
+    """
+    identities = dict()
+    for record in _iter_records(path, file_format):
+        yield _create_commit(record, identities)
+        if len(identities) > 2 ** 16:
+            identities.clear()
+
+
+def load_commit_table(
+        path: str,
+        file_format: Optional[str] = None
+) -> CommitTable:
+    """
+    Reads commits written by export_commits into CommitTable, without creating Commit objects.
+    Requires 'numpy' package.
+
+    :param path: Path of exported file.
+    :type path: str
+    :param file_format: Format like in export_commits, None means format from extension of path.
+    :type file_format: str
+    :rtype: CommitTable
+    """
+    _require_numpy()
+    builder = _CommitTableBuilder()
+    for commit_id, _, parents, author, author_email, author_timestamp, author_offset, \
+            committer, committer_email, committer_timestamp, committer_offset, _ in _iter_records(path, file_format):
+        builder.add_row(
+            commit_id,
+            parents,
+            author,
+            author_email,
+            author_timestamp,
+            author_offset,
+            committer,
+            committer_email,
+            committer_timestamp,
+            committer_offset
+        )
+    return builder.build()
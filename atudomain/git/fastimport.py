@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import datetime
+import re
+
+from atudomain.git.objects import NewCommit
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+IDENT_REGEX = re.compile(r'^(.*) <(.*)> (\d+ [+-]\d{4})$')
+
+
+def parse_ident(
+        ident: str
+) -> Tuple[str, str, str]:
+    """
+    Splits output of 'git var GIT_AUTHOR_IDENT' into name, email and date in git raw format.
+    """
+    match = IDENT_REGEX.match(ident.strip())
+    if match is None:
+        raise ValueError(f"Invalid git identity: {ident}")
+    return match.group(1), match.group(2), match.group(3)
+
+
+def format_date(
+        date: datetime.datetime
+) -> str:
+    """
+    :return: Date in git raw format, e.g. '1577836800 +0100'. Naive date is treated as local time.
+    """
+    date = date.astimezone() if date.tzinfo is None else date
+    offset_minutes = int(date.utcoffset().total_seconds()) // 60
+    sign = '-' if offset_minutes < 0 else '+'
+    hours, minutes = divmod(abs(offset_minutes), 60)
+    return f"{int(date.timestamp())} {sign}{hours:02}{minutes:02}"
+
+
+def quote_path(
+        path: str
+) -> str:
+    if '\n' in path or path.startswith('"'):
+        return '"' + path.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+    return path
+
+
+def _data(
+        content: bytes
+) -> bytes:
+    return f"data {len(content)}\n".encode() + content + b"\n"
+
+
+class GitFastImportStream:
+    """
+    Renders NewCommit objects as 'git fast-import' commands. Commit at position N gets mark N + 1.
+    Branches existing in repository are continued from their tips when commit has no parents given,
+    branches first committed to by this stream start with root commit.
+
+    :param existing_refs: Full names of branches existing in repository, e.g. 'refs/heads/master'.
+    :type existing_refs: Set[str]
+    :param get_ident: Callable returning default identity for 'author' or 'committer'
+        as name, email and date in git raw format. Called once per role, only when commit misses some of them.
+    :type get_ident: Callable[[str], Tuple[str, str, str]]
+    :param default_branch: Callable returning branch used for commits without branch, called at most once.
+    :type default_branch: Callable[[], str]
+    """
+    def __init__(
+            self,
+            existing_refs: Set[str],
+            get_ident: Callable[[str], Tuple[str, str, str]],
+            default_branch: Callable[[], str]
+    ):
+        self._existing_refs = existing_refs
+        self._get_ident = get_ident
+        self._default_branch = default_branch
+        self._idents: Dict[str, Tuple[str, str, str]] = dict()
+        self._branch: Optional[str] = None
+        self._started_refs: Set[str] = set()
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        """
+        :return: Number of commits rendered so far.
+        :rtype: int
+        """
+        return self._count
+
+    def _render_ident(
+            self,
+            role: str,
+            name: Optional[str],
+            email: Optional[str],
+            date: Optional[datetime.datetime]
+    ) -> str:
+        if name is None or email is None or date is None:
+            if role not in self._idents:
+                self._idents[role] = self._get_ident(role)
+            default_name, default_email, default_date = self._idents[role]
+            name = default_name if name is None else name
+            email = default_email if email is None else email
+            date_string = default_date if date is None else format_date(date)
+        else:
+            date_string = format_date(date)
+        return f"{role} {name} <{email}> {date_string}\n"
+
+    def _render_parent(
+            self,
+            parent
+    ) -> str:
+        if isinstance(parent, int):
+            if not 0 <= parent < self._count:
+                raise ValueError(f"Parent position {parent} does not refer to earlier commit")
+            return f":{parent + 1}"
+        return parent
+
+    def render(
+            self,
+            commit: NewCommit
+    ) -> bytes:
+        """
+        :return: Commands creating commit, marked with position of commit in stream.
+        :rtype: bytes
+        """
+        branch = commit.branch
+        if branch is None:
+            if self._branch is None:
+                self._branch = self._default_branch()
+            branch = self._branch
+        ref = "refs/heads/" + branch
+        lines = list()
+        if commit.parents is None:
+            if ref not in self._started_refs and ref in self._existing_refs:
+                lines.append(f"from {ref}^0")
+        elif commit.parents:
+            lines.append(f"from {self._render_parent(commit.parents[0])}")
+            lines += [f"merge {self._render_parent(x)}" for x in commit.parents[1:]]
+        header = ""
+        if commit.parents is not None and not commit.parents \
+                and (ref in self._started_refs or ref in self._existing_refs):
+            header = f"reset {ref}\n\n"
+        message = commit.message.encode()
+        if not message.endswith(b"\n"):
+            message += b"\n"
+        chunks = [
+            (
+                f"{header}commit {ref}\nmark :{self._count + 1}\n"
+                + self._render_ident("author", commit.author, commit.author_email, commit.author_date)
+                + self._render_ident("committer", commit.committer, commit.committer_email, commit.committer_date)
+            ).encode(),
+            _data(message),
+            ''.join(x + "\n" for x in lines).encode(),
+        ]
+        for path, content in commit.files.items():
+            if content is None:
+                chunks.append(f"D {quote_path(path)}\n".encode())
+            else:
+                if isinstance(content, str):
+                    content = content.encode()
+                chunks.append(f"M 100644 inline {quote_path(path)}\n".encode())
+                chunks.append(_data(content))
+        chunks.append(b"\n")
+        self._started_refs.add(ref)
+        self._count += 1
+        return b''.join(chunks)
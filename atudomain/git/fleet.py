@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+import concurrent.futures
+import subprocess
+
+from atudomain.git.catfile import MissingObjectError
+from atudomain.git.objects import Commit
+from atudomain.git.repository import Git
+from atudomain.git.repository import LOG_FORMAT_RAW
+from atudomain.git.repository import NoCommitsError
+from atudomain.git.repository import NotARepositoryError
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+QUERY_COMMITS = "commits"
+QUERY_BRANCHES = "branches"
+QUERY_LATEST_COMMITS = "latest_commits"
+
+REPOSITORY_ERRORS = (
+    NotARepositoryError,
+    NoCommitsError,
+    MissingObjectError,
+    subprocess.CalledProcessError,
+    OSError,
+)
+
+
+class FleetResult:
+    """
+    Result of query run against single repository of GitFleet. Exactly one of value and error is set.
+    """
+    __slots__ = (
+        '_directory',
+        '_value',
+        '_error',
+    )
+
+    def __init__(
+            self,
+            directory: str,
+            value: Any,
+            error: Optional[Exception]
+    ):
+        self._directory = directory
+        self._value = value
+        self._error = error
+
+    @property
+    def directory(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._directory
+
+    @property
+    def value(self) -> Any:
+        """
+        :return: Query result, e.g. List[Commit]. None if query failed.
+        :rtype: Any
+        """
+        return self._value
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """
+        :return: Error raised for this repository, e.g. NotARepositoryError or NoCommitsError.
+        :rtype: Optional[Exception]
+        """
+        return self._error
+
+    def __repr__(self) -> str:
+        return f"FleetResult({self.directory!r}, {self.value!r}, {self.error!r})"
+
+
+def _get_commits(
+        git: Git,
+        revision_range: str
+) -> List[Commit]:
+    return git.get_commits(revision_range)
+
+
+def _get_branches(
+        git: Git,
+        include: Optional[str],
+        exclude: Optional[str]
+) -> List[str]:
+    return git.get_branches(include=include, exclude=exclude)
+
+
+def _get_latest_commits(
+        git: Git,
+        include: Optional[str],
+        exclude: Optional[str]
+) -> Dict[str, Commit]:
+    branch_refs = git.get_branch_refs(include=include, exclude=exclude)
+    if not branch_refs:
+        return dict()
+    return dict(zip(branch_refs, git.get_commits_by_id(list(branch_refs.values()))))
+
+
+QUERIES = {
+    QUERY_COMMITS: _get_commits,
+    QUERY_BRANCHES: _get_branches,
+    QUERY_LATEST_COMMITS: _get_latest_commits,
+}
+
+
+def _scan_repository(
+        directory: str,
+        executable_directory: str,
+        log_format: str,
+        query: str,
+        arguments: tuple
+) -> FleetResult:
+    """
+    Runs query against single repository. Module level function, so it can be sent to worker processes.
+    """
+    try:
+        with Git(directory, executable_directory=executable_directory, log_format=log_format) as git:
+            return FleetResult(directory, QUERIES[query](git, *arguments), None)
+    except REPOSITORY_ERRORS as error:
+        return FleetResult(directory, None, error)
+
+
+class GitFleet:
+    """
+    Runs the same query against many repositories in a pool of threads or processes.
+    Every worker handles one repository at a time, so max_workers also bounds the number of git processes
+    running at once. Results are yielded as soon as repositories are done, in order of completion.
+    Errors of single repositories do not stop the scan, they are returned in FleetResult.error.
+
+    :param directories: Paths to git repositories or bare repositories.
+    :type directories: Iterable[str]
+    :param executable_directory: Path to directory with git binary.
+    :type executable_directory: str
+    :param log_format: Output format requested from git log, 'raw' or 'machine'.
+    :type log_format: str
+    :param max_workers: Number of repositories processed at the same time.
+    :type max_workers: int
+    :param executor: 'thread' or 'process'. Processes also parse git output in parallel.
+    :type executor: str
+    """
+    def __init__(
+            self,
+            directories: Iterable[str],
+            executable_directory="",
+            log_format=LOG_FORMAT_RAW,
+            max_workers=4,
+            executor=EXECUTOR_THREAD
+    ):
+        if executor not in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor: {executor}")
+        self._directories = list(directories)
+        self._executable_directory = executable_directory
+        self._log_format = Git._check_log_format(log_format)
+        self._max_workers = max_workers
+        self._executor = executor
+
+    @property
+    def directories(self) -> List[str]:
+        """
+        :rtype: List[str]
+        """
+        return self._directories
+
+    def _build_executor(
+            self
+    ) -> concurrent.futures.Executor:
+        if self._executor == EXECUTOR_PROCESS:
+            return concurrent.futures.ProcessPoolExecutor(max_workers=self._max_workers)
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers)
+
+    def _scan(
+            self,
+            query: str,
+            arguments: tuple
+    ) -> Iterator[FleetResult]:
+        executor = self._build_executor()
+        futures = [
+            executor.submit(
+                _scan_repository,
+                directory,
+                self._executable_directory,
+                self._log_format,
+                query,
+                arguments
+            )
+            for directory in self._directories
+        ]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def get_commits(
+            self,
+            revision_range=""
+    ) -> Iterator[FleetResult]:
+        """
+        Runs Git.get_commits in every repository.
+
+        :param revision_range: Any revision range that could be used with git log command.
+        :type revision_range: str
+        :return: Iterator over results with List[Commit] values, in order of completion.
+        :rtype: Iterator[FleetResult]
+        """
+        return self._scan(QUERY_COMMITS, (revision_range,))
+
+    def get_branches(
+            self,
+            include=None,
+            exclude=None
+    ) -> Iterator[FleetResult]:
+        """
+        Runs Git.get_branches in every repository.
+
+        :param include: Regex (re module) to include branch names in list. None means all.
+        :type include: str
+        :param exclude: Regex (re module) to exclude branch names from list.
+        :type exclude: str
+        :return: Iterator over results with List[str] values, in order of completion.
+        :rtype: Iterator[FleetResult]
+        """
+        return self._scan(QUERY_BRANCHES, (include, exclude))
+
+    def get_latest_commits(
+            self,
+            include=None,
+            exclude=None
+    ) -> Iterator[FleetResult]:
+        """
+        Gets tip commit of every branch in every repository.
+
+        :param include: Regex (re module) to include branch names. None means all.
+        :type include: str
+        :param exclude: Regex (re module) to exclude branch names.
+        :type exclude: str
+        :return: Iterator over results with Dict[str, Commit] values (branch name to tip commit),
+            in order of completion.
+        :rtype: Iterator[FleetResult]
+        """
+        return self._scan(QUERY_LATEST_COMMITS, (include, exclude))
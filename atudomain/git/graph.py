@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+
+import array
+import binascii
+import heapq
+import struct
+import sys
+
+from atudomain.git.objects import Commit
+from typing import Dict, Iterable, List, Optional
+
+
+SIGNATURE = b"AGCG"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxII")
+
+
+class CommitGraph:
+    """
+    In-memory commit DAG built from parsed commits. SHAs are mapped to dense integer ids and parents
+    and children are kept in compressed adjacency arrays, so graph queries do not touch Commit objects.
+    Parents missing from the commits given (e.g. at the edge of revision range) become nodes
+    without parents and commit time 0.
+
+    :param commits: Commits to index, in any order.
+    :type commits: Iterable[Commit]
+    """
+    def __init__(
+            self,
+            commits: Iterable[Commit] = ()
+    ):
+        self._commit_ids: List[str] = list()
+        self._index: Dict[str, int] = dict()
+        parent_lists = list()
+        commit_times = dict()
+        for commit in commits:
+            position = self._add(commit.commit_id)
+            commit_times[position] = int(commit.committer_date.timestamp())
+            parent_lists.append((position, [self._add(x) for x in commit.parents]))
+        count = len(self._commit_ids)
+        self._commit_times = array.array('q', [0]) * count
+        for position, commit_time in commit_times.items():
+            self._commit_times[position] = commit_time
+        parents_by_position: List[List[int]] = [[] for _ in range(count)]
+        for position, parents in parent_lists:
+            parents_by_position[position] = parents
+        self._parent_offsets, self._parents = self._compress(parents_by_position)
+        self._build_derived()
+
+    def _add(
+            self,
+            commit_id: str
+    ) -> int:
+        position = self._index.get(commit_id)
+        if position is None:
+            position = self._index[commit_id] = len(self._commit_ids)
+            self._commit_ids.append(commit_id)
+        return position
+
+    @staticmethod
+    def _compress(
+            lists: List[List[int]]
+    ):
+        offsets = array.array('I', [0])
+        values = array.array('I')
+        for x in lists:
+            values.extend(x)
+            offsets.append(len(values))
+        return offsets, values
+
+    def _build_derived(
+            self
+    ) -> None:
+        """
+        Builds children adjacency and generation numbers (1 for root commits,
+        otherwise 1 + maximum of generation numbers of parents).
+        """
+        count = len(self._commit_ids)
+        children_by_position: List[List[int]] = [[] for _ in range(count)]
+        for position in range(count):
+            for parent in self._parents[self._parent_offsets[position]:self._parent_offsets[position + 1]]:
+                children_by_position[parent].append(position)
+        self._child_offsets, self._children = self._compress(children_by_position)
+        self._generations = array.array('I', [0]) * count
+        pending_parents = array.array('I', [
+            self._parent_offsets[x + 1] - self._parent_offsets[x] for x in range(count)
+        ])
+        stack = [x for x in range(count) if pending_parents[x] == 0]
+        while stack:
+            position = stack.pop()
+            generation = 1
+            for parent in self._parents_of(position):
+                generation = max(generation, self._generations[parent] + 1)
+            self._generations[position] = generation
+            for child in self._children_of(position):
+                pending_parents[child] -= 1
+                if pending_parents[child] == 0:
+                    stack.append(child)
+
+    def _parents_of(
+            self,
+            position: int
+    ) -> array.array:
+        return self._parents[self._parent_offsets[position]:self._parent_offsets[position + 1]]
+
+    def _children_of(
+            self,
+            position: int
+    ) -> array.array:
+        return self._children[self._child_offsets[position]:self._child_offsets[position + 1]]
+
+    def _position(
+            self,
+            commit_id: str
+    ) -> int:
+        position = self._index.get(commit_id)
+        if position is None:
+            raise KeyError(commit_id)
+        return position
+
+    def __len__(self) -> int:
+        return len(self._commit_ids)
+
+    def __contains__(self, commit_id) -> bool:
+        return commit_id in self._index
+
+    @property
+    def commit_ids(self) -> List[str]:
+        """
+        :return: SHAs of all nodes, list index is dense id of node.
+        :rtype: List[str]
+        """
+        return self._commit_ids
+
+    def parents(
+            self,
+            commit_id: str
+    ) -> List[str]:
+        """
+        :rtype: List[str]
+        """
+        return [self._commit_ids[x] for x in self._parents_of(self._position(commit_id))]
+
+    def children(
+            self,
+            commit_id: str
+    ) -> List[str]:
+        """
+        :rtype: List[str]
+        """
+        return [self._commit_ids[x] for x in self._children_of(self._position(commit_id))]
+
+    def generation(
+            self,
+            commit_id: str
+    ) -> int:
+        """
+        :return: 1 for root commits, otherwise 1 + maximum of generation numbers of parents.
+        :rtype: int
+        """
+        return self._generations[self._position(commit_id)]
+
+    def topological_order(
+            self
+    ) -> List[str]:
+        """
+        Orders all commits children first, like 'git log --date-order': commit is listed
+        only after all its children, newer commits first otherwise.
+
+        :rtype: List[str]
+        """
+        count = len(self._commit_ids)
+        pending_children = array.array('I', [
+            self._child_offsets[x + 1] - self._child_offsets[x] for x in range(count)
+        ])
+        commit_times = self._commit_times
+        heap = [(-commit_times[x], x) for x in range(count) if pending_children[x] == 0]
+        heapq.heapify(heap)
+        order = list()
+        while heap:
+            _, position = heapq.heappop(heap)
+            order.append(self._commit_ids[position])
+            for parent in self._parents_of(position):
+                pending_children[parent] -= 1
+                if pending_children[parent] == 0:
+                    heapq.heappush(heap, (-commit_times[parent], parent))
+        return order
+
+    def _mark_ancestors(
+            self,
+            positions: Iterable[int],
+            min_generation=0
+    ) -> bytearray:
+        """
+        :return: Flags of commits reachable from positions (including them), skipping
+            commits with generation number lower than min_generation.
+        """
+        marks = bytearray(len(self._commit_ids))
+        stack = list(positions)
+        for position in stack:
+            marks[position] = 1
+        generations = self._generations
+        while stack:
+            position = stack.pop()
+            for parent in self._parents_of(position):
+                if not marks[parent] and generations[parent] >= min_generation:
+                    marks[parent] = 1
+                    stack.append(parent)
+        return marks
+
+    def is_ancestor(
+            self,
+            ancestor: str,
+            descendant: str
+    ) -> bool:
+        """
+        Walks parents of descendant, skipping commits with lower generation number than ancestor.
+
+        :return: True if ancestor is an ancestor of descendant or the same commit.
+        :rtype: bool
+        """
+        ancestor_position = self._position(ancestor)
+        marks = self._mark_ancestors(
+            [self._position(descendant)],
+            min_generation=self._generations[ancestor_position]
+        )
+        return bool(marks[ancestor_position])
+
+    def merge_bases(
+            self,
+            first: str,
+            second: str
+    ) -> List[str]:
+        """
+        :return: Best common ancestors of two commits, i.e. common ancestors which are not
+            ancestors of other common ancestors, highest generation number first.
+        :rtype: List[str]
+        """
+        first_marks = self._mark_ancestors([self._position(first)])
+        second_marks = self._mark_ancestors([self._position(second)])
+        candidates = [x for x in range(len(self._commit_ids)) if first_marks[x] and second_marks[x]]
+        if not candidates:
+            return list()
+        stale = self._mark_ancestors(
+            [parent for x in candidates for parent in self._parents_of(x)],
+            min_generation=min(self._generations[x] for x in candidates)
+        )
+        bases = [x for x in candidates if not stale[x]]
+        bases.sort(key=lambda x: (-self._generations[x], -self._commit_times[x]))
+        return [self._commit_ids[x] for x in bases]
+
+    def merge_base(
+            self,
+            first: str,
+            second: str
+    ) -> Optional[str]:
+        """
+        :return: SHA of best common ancestor or None if commits have no common history.
+        :rtype: Optional[str]
+        """
+        bases = self.merge_bases(first, second)
+        return bases[0] if bases else None
+
+    def first_parent_chain(
+            self,
+            commit_id: str
+    ) -> List[str]:
+        """
+        :return: commit_id followed by its first parent, first parent of that parent and so on,
+            like 'git log --first-parent'.
+        :rtype: List[str]
+        """
+        position = self._position(commit_id)
+        chain = [position]
+        while self._parent_offsets[position + 1] > self._parent_offsets[position]:
+            position = self._parents[self._parent_offsets[position]]
+            chain.append(position)
+        return [self._commit_ids[x] for x in chain]
+
+    def difference(
+            self,
+            include: str,
+            exclude: str
+    ) -> List[str]:
+        """
+        Finds commits reachable from include and not reachable from exclude, like 'git log exclude..include'.
+
+        :return: SHAs of commits in topological order, children first.
+        :rtype: List[str]
+        """
+        excluded = self._mark_ancestors([self._position(exclude)])
+        included = self._mark_ancestors([self._position(include)])
+        return [x for x in self.topological_order() if included[self._index[x]] and not excluded[self._index[x]]]
+
+    @staticmethod
+    def _to_little_endian(
+            values: array.array
+    ) -> bytes:
+        if sys.byteorder == "big":
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def _from_little_endian(
+            typecode: str,
+            data: bytes
+    ) -> array.array:
+        values = array.array(typecode)
+        values.frombytes(data)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def save(
+            self,
+            path: str
+    ) -> None:
+        """
+        Writes graph to binary file: header, binary SHAs, commit times, parent offsets and parents.
+        Children and generation numbers are rebuilt on load.
+
+        :param path: Path to file.
+        :type path: str
+        """
+        hash_size = len(self._commit_ids[0]) // 2 if self._commit_ids else 20
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(SIGNATURE, VERSION, hash_size, len(self._commit_ids), len(self._parents)))
+            f.write(binascii.unhexlify(''.join(self._commit_ids)))
+            f.write(self._to_little_endian(self._commit_times))
+            f.write(self._to_little_endian(self._parent_offsets))
+            f.write(self._to_little_endian(self._parents))
+
+    @classmethod
+    def load(
+            cls,
+            path: str
+    ) -> "CommitGraph":
+        """
+        Reads graph written by save.
+
+        :param path: Path to file.
+        :type path: str
+        :rtype: CommitGraph
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        signature, version, hash_size, count, edge_count = HEADER.unpack_from(data)
+        if signature != SIGNATURE or version != VERSION:
+            raise ValueError(f"Unsupported commit graph file: {path}")
+        position = HEADER.size
+        hexlified = binascii.hexlify(data[position:position + count * hash_size]).decode()
+        position += count * hash_size
+        graph = cls()
+        graph._commit_ids = [hexlified[i:i + hash_size * 2] for i in range(0, len(hexlified), hash_size * 2)]
+        graph._index = {x: i for i, x in enumerate(graph._commit_ids)}
+        graph._commit_times = cls._from_little_endian('q', data[position:position + count * 8])
+        position += count * 8
+        offsets_size = (count + 1) * graph._parent_offsets.itemsize
+        graph._parent_offsets = cls._from_little_endian('I', data[position:position + offsets_size])
+        position += offsets_size
+        graph._parents = cls._from_little_endian(
+            'I',
+            data[position:position + edge_count * graph._parents.itemsize]
+        )
+        graph._build_derived()
+        return graph
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+from atudomain.git.objects import Commit
+from atudomain.git.objects import FileChange
+from typing import Dict, Iterable, List, Tuple
+
+
+class FileHistoryIndex:
+    """
+    Index from file paths to commits which changed them, built from commits with changes,
+    i.e. from Git.get_commits(changes='numstat') or Git.get_commits(changes='name-status').
+    Renamed files are indexed under both old and new path.
+
+    :param commits: Commits with changes, newest first like from git log.
+    :type commits: Iterable[Commit]
+    """
+    def __init__(
+            self,
+            commits: Iterable[Commit]
+    ):
+        self._commits: List[Commit] = list()
+        self._paths: Dict[str, List[Tuple[int, FileChange]]] = dict()
+        for position, commit in enumerate(commits):
+            if commit.changes is None:
+                raise ValueError(f"Commit {commit.commit_id} was parsed without changes")
+            self._commits.append(commit)
+            for change in commit.changes:
+                self._paths.setdefault(change.path, []).append((position, change))
+                if change.old_path is not None and change.old_path != change.path:
+                    self._paths.setdefault(change.old_path, []).append((position, change))
+
+    @property
+    def paths(self) -> List[str]:
+        """
+        :return: All paths changed by indexed commits, including paths before renames.
+        :rtype: List[str]
+        """
+        return list(self._paths)
+
+    def get_changes(
+            self,
+            path: str
+    ) -> List[Tuple[Commit, FileChange]]:
+        """
+        :return: Commits which changed path with their change of path, newest first.
+        :rtype: List[Tuple[Commit, FileChange]]
+        """
+        return [(self._commits[position], change) for position, change in self._paths.get(path, [])]
+
+    def get_history(
+            self,
+            path: str,
+            follow_renames=True
+    ) -> List[Commit]:
+        """
+        Finds commits which changed file, like 'git log --follow -- path'.
+
+        :param path: File path relative to repository root.
+        :type path: str
+        :param follow_renames: True if commits older than rename of file should be searched under old path.
+        :type follow_renames: bool
+        :return: Commits newest first.
+        :rtype: List[Commit]
+        """
+        history = list()
+        last_position = -1
+        while path is not None:
+            next_path = None
+            for position, change in self._paths.get(path, []):
+                if position <= last_position:
+                    continue
+                history.append(self._commits[position])
+                if follow_renames and change.path == path and change.old_path is not None \
+                        and change.status != 'C':
+                    next_path = change.old_path
+                    last_position = position
+                    break
+            path = next_path
+        return history
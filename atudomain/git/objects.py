@@ -1,21 +1,39 @@
 #!/usr/bin/env python3
 
+import abc
 import datetime
 
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 
 class Commit:
     """
     Represents git repository commit as extracted from 'git log --pretty=raw'.
     Stores data as properties and has additional methods for getting dates as strings.
+    Uses __slots__ and keeps only the full message, subject and body are derived from it on access.
+    Parameters is_merge, message_subject and message_body are accepted for compatibility
+    and derived from parents and message.
     """
+    __slots__ = (
+        '_commit_id',
+        '_tree',
+        '_parents',
+        '_author',
+        '_author_email',
+        '_author_date',
+        '_committer',
+        '_committer_email',
+        '_committer_date',
+        '_message',
+        '_changes',
+    )
+
     def __init__(
             self,
             is_merge: bool,
             commit_id: str,
             tree: str,
-            parents: List[str],
+            parents: Sequence[str],
             author: str,
             author_email: str,
             author_date: datetime.datetime,
@@ -23,13 +41,13 @@ class Commit:
             committer_email: str,
             committer_date: datetime.datetime,
             message: str,
-            message_subject: str,
-            message_body: str
+            message_subject=None,
+            message_body=None,
+            changes=None
     ):
-        self._is_merge = is_merge
         self._commit_id = commit_id
         self._tree = tree
-        self._parents = parents
+        self._parents = parents if type(parents) is tuple else tuple(parents)
         self._author = author
         self._author_email = author_email
         self._author_date = author_date
@@ -37,15 +55,14 @@ class Commit:
         self._committer_email = committer_email
         self._committer_date = committer_date
         self._message = message
-        self._message_subject = message_subject
-        self._message_body = message_body
+        self._changes = changes
 
     @property
     def is_merge(self) -> bool:
         """
         :rtype: bool
         """
-        return self._is_merge
+        return len(self._parents) > 1
 
     @property
     def commit_id(self) -> str:
@@ -62,9 +79,9 @@ class Commit:
         return self._tree
 
     @property
-    def parents(self) -> List[str]:
+    def parents(self) -> Tuple[str, ...]:
         """
-        :rtype: List[str]
+        :rtype: Tuple[str, ...]
         """
         return self._parents
 
@@ -101,7 +118,7 @@ class Commit:
         """
         :rtype: str
         """
-        return self._committer
+        return self._committer_email
 
     @property
     def committer_date(self) -> datetime.datetime:
@@ -122,14 +139,26 @@ class Commit:
         """
         :rtype: str
         """
-        return self._message_subject
+        return self._message.split('\n', 1)[0].lstrip()
 
     @property
     def message_body(self) -> str:
         """
         :rtype: str
         """
-        return self._message_body
+        split = self._message.split('\n', 1)
+        if len(split) < 2:
+            return ''
+        return split[1].lstrip()
+
+    @property
+    def changes(self) -> Optional[Tuple["FileChange", ...]]:
+        """
+        :return: Files changed by commit, None if changes were not requested.
+            Merge commits have no changes, like in 'git log --numstat' output.
+        :rtype: Optional[Tuple[FileChange, ...]]
+        """
+        return self._changes
 
     def get_author_date_string(
             self,
@@ -143,7 +172,7 @@ class Commit:
         :return: Converted date.
         :rtype: str
         """
-        return self._author_date.strftime(
+        return self.author_date.strftime(
             date_format
         )
 
@@ -159,17 +188,607 @@ class Commit:
         :return: Converted date.
         :rtype: str
         """
-        return self._committer_date.strftime(
+        return self.committer_date.strftime(
             date_format
         )
 
     def __eq__(self, other) -> bool:
-        if isinstance(other, self.__class__):
+        if isinstance(other, Commit):
             if self.commit_id == other.commit_id:
                 return True
             return False
         else:
-            return NotImplementedError()
+            return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+
+class LazyCommit(Commit, metaclass=abc.ABCMeta):
+    """
+    Commit which keeps a reference to its raw record in a buffer shared by many commits
+    and decodes fields only when their properties are accessed for the first time.
+    Decoded values are cached. Subclasses implement decoding of particular output format.
+    """
+    __slots__ = (
+        '_buffer',
+        '_start',
+        '_end',
+        '_author_timestamp',
+        '_committer_timestamp',
+    )
+
+    def __init__(
+            self,
+            buffer: str,
+            start: int,
+            end: int
+    ):
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self._changes = None
+
+    @abc.abstractmethod
+    def _decode_headers(self) -> None:
+        """
+        Sets _commit_id, _tree and _parents.
+        """
+
+    @abc.abstractmethod
+    def _decode_author(self) -> None:
+        """
+        Sets _author, _author_email and _author_timestamp.
+        """
+
+    @abc.abstractmethod
+    def _decode_committer(self) -> None:
+        """
+        Sets _committer, _committer_email and _committer_timestamp.
+        """
+
+    @abc.abstractmethod
+    def _decode_message(self) -> None:
+        """
+        Sets _message.
+        """
+
+    @property
+    def is_merge(self) -> bool:
+        """
+        :rtype: bool
+        """
+        return len(self.parents) > 1
+
+    @property
+    def commit_id(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._commit_id
+        except AttributeError:
+            self._decode_headers()
+            return self._commit_id
+
+    @property
+    def tree(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._tree
+        except AttributeError:
+            self._decode_headers()
+            return self._tree
+
+    @property
+    def parents(self) -> Tuple[str, ...]:
+        """
+        :rtype: Tuple[str, ...]
+        """
+        try:
+            return self._parents
+        except AttributeError:
+            self._decode_headers()
+            return self._parents
+
+    @property
+    def author(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._author
+        except AttributeError:
+            self._decode_author()
+            return self._author
+
+    @property
+    def author_email(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._author_email
+        except AttributeError:
+            self._decode_author()
+            return self._author_email
+
+    @property
+    def author_date(self) -> datetime.datetime:
+        """
+        :rtype: datetime.datetime
+        """
+        try:
+            return self._author_date
+        except AttributeError:
+            try:
+                timestamp = self._author_timestamp
+            except AttributeError:
+                self._decode_author()
+                timestamp = self._author_timestamp
+            self._author_date = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+            return self._author_date
+
+    @property
+    def committer(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._committer
+        except AttributeError:
+            self._decode_committer()
+            return self._committer
+
+    @property
+    def committer_email(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._committer_email
+        except AttributeError:
+            self._decode_committer()
+            return self._committer_email
+
+    @property
+    def committer_date(self) -> datetime.datetime:
+        """
+        :rtype: datetime.datetime
+        """
+        try:
+            return self._committer_date
+        except AttributeError:
+            try:
+                timestamp = self._committer_timestamp
+            except AttributeError:
+                self._decode_committer()
+                timestamp = self._committer_timestamp
+            self._committer_date = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+            return self._committer_date
+
+    @property
+    def message(self) -> str:
+        """
+        :rtype: str
+        """
+        try:
+            return self._message
+        except AttributeError:
+            self._decode_message()
+            return self._message
+
+    @property
+    def message_subject(self) -> str:
+        """
+        :rtype: str
+        """
+        return self.message.split('\n', 1)[0].lstrip()
+
+    @property
+    def message_body(self) -> str:
+        """
+        :rtype: str
+        """
+        split = self.message.split('\n', 1)
+        if len(split) < 2:
+            return ''
+        return split[1].lstrip()
+
+
+class FileChange:
+    """
+    Represents single file changed by commit as reported by 'git log --numstat' or 'git log --name-status'.
+    Line counts are known only with numstat and are None for binary files,
+    status is known only with name-status. Renamed and copied files have old_path.
+    """
+    __slots__ = (
+        '_path',
+        '_old_path',
+        '_status',
+        '_added',
+        '_deleted',
+    )
+
+    def __init__(
+            self,
+            path: str,
+            old_path: Optional[str] = None,
+            status: Optional[str] = None,
+            added: Optional[int] = None,
+            deleted: Optional[int] = None
+    ):
+        self._path = path
+        self._old_path = old_path
+        self._status = status
+        self._added = added
+        self._deleted = deleted
+
+    @property
+    def path(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def old_path(self) -> Optional[str]:
+        """
+        :return: Path before rename or copy, None otherwise.
+        :rtype: Optional[str]
+        """
+        return self._old_path
+
+    @property
+    def status(self) -> Optional[str]:
+        """
+        :return: Status letter, e.g. 'A', 'M', 'D', 'R' or 'C', without similarity score.
+        :rtype: Optional[str]
+        """
+        return self._status
+
+    @property
+    def added(self) -> Optional[int]:
+        """
+        :rtype: Optional[int]
+        """
+        return self._added
+
+    @property
+    def deleted(self) -> Optional[int]:
+        """
+        :rtype: Optional[int]
+        """
+        return self._deleted
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FileChange):
+            return all(getattr(self, x) == getattr(other, x) for x in self.__slots__)
+        return NotImplemented
 
     def __ne__(self, other) -> bool:
         return not self == other
+
+    def __repr__(self) -> str:
+        return (
+            f"FileChange({self.path!r}, old_path={self.old_path!r}, status={self.status!r}, "
+            f"added={self.added!r}, deleted={self.deleted!r})"
+        )
+
+
+class ObjectInfo:
+    """
+    Represents git object header as reported by 'git cat-file --batch-check'.
+    """
+    def __init__(
+            self,
+            object_id: str,
+            object_type: str,
+            size: int
+    ):
+        self._object_id = object_id
+        self._object_type = object_type
+        self._size = size
+
+    @property
+    def object_id(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._object_id
+
+    @property
+    def object_type(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._object_type
+
+    @property
+    def size(self) -> int:
+        """
+        :rtype: int
+        """
+        return self._size
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, self.__class__):
+            return (self.object_id, self.object_type, self.size) == (other.object_id, other.object_type, other.size)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return f"ObjectInfo({self.object_id!r}, {self.object_type!r}, {self.size!r})"
+
+
+class BranchDetails:
+    """
+    Represents branch with its tip commit metadata as reported by 'git for-each-ref'.
+    Names use the same convention as Git.get_branches, e.g. 'master' or 'remotes/origin/master'.
+    Ahead and behind counts are relative to upstream and None when they were not requested
+    or upstream branch is gone.
+    """
+    __slots__ = (
+        '_name',
+        '_commit_id',
+        '_committer_date',
+        '_author',
+        '_author_email',
+        '_upstream',
+        '_ahead',
+        '_behind',
+    )
+
+    def __init__(
+            self,
+            name: str,
+            commit_id: str,
+            committer_date: datetime.datetime,
+            author: str,
+            author_email: str,
+            upstream: Optional[str],
+            ahead: Optional[int],
+            behind: Optional[int]
+    ):
+        self._name = name
+        self._commit_id = commit_id
+        self._committer_date = committer_date
+        self._author = author
+        self._author_email = author_email
+        self._upstream = upstream
+        self._ahead = ahead
+        self._behind = behind
+
+    @property
+    def name(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def commit_id(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._commit_id
+
+    @property
+    def committer_date(self) -> datetime.datetime:
+        """
+        :rtype: datetime.datetime
+        """
+        return self._committer_date
+
+    @property
+    def author(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._author
+
+    @property
+    def author_email(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._author_email
+
+    @property
+    def upstream(self) -> Optional[str]:
+        """
+        :return: Name of upstream branch or None if branch has no upstream.
+        :rtype: Optional[str]
+        """
+        return self._upstream
+
+    @property
+    def ahead(self) -> Optional[int]:
+        """
+        :return: Number of commits on branch which are not on upstream.
+        :rtype: Optional[int]
+        """
+        return self._ahead
+
+    @property
+    def behind(self) -> Optional[int]:
+        """
+        :return: Number of commits on upstream which are not on branch.
+        :rtype: Optional[int]
+        """
+        return self._behind
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BranchDetails):
+            return all(getattr(self, x) == getattr(other, x) for x in self.__slots__)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return f"BranchDetails({self.name!r}, {self.commit_id!r}, upstream={self.upstream!r})"
+
+
+class NewCommit:
+    """
+    Describes commit to be created by Git.create_commits. Files map paths to new contents,
+    None contents delete files, other files are kept as in first parent. Parents are SHAs
+    or other revisions of existing commits, or integer positions of commits created earlier
+    by the same call. None parents continue the branch, empty parents create root commit.
+    Missing identities and dates are taken from git configuration and current time,
+    like with 'git commit'.
+    """
+    __slots__ = (
+        '_message',
+        '_files',
+        '_branch',
+        '_parents',
+        '_author',
+        '_author_email',
+        '_author_date',
+        '_committer',
+        '_committer_email',
+        '_committer_date',
+    )
+
+    def __init__(
+            self,
+            message: str,
+            files: Optional[Dict[str, Optional[Union[str, bytes]]]] = None,
+            branch: Optional[str] = None,
+            parents: Optional[Sequence[Union[str, int]]] = None,
+            author: Optional[str] = None,
+            author_email: Optional[str] = None,
+            author_date: Optional[datetime.datetime] = None,
+            committer: Optional[str] = None,
+            committer_email: Optional[str] = None,
+            committer_date: Optional[datetime.datetime] = None
+    ):
+        self._message = message
+        self._files = files if files is not None else dict()
+        self._branch = branch
+        self._parents = parents
+        self._author = author
+        self._author_email = author_email
+        self._author_date = author_date
+        self._committer = committer
+        self._committer_email = committer_email
+        self._committer_date = committer_date
+
+    @property
+    def message(self) -> str:
+        """
+        :rtype: str
+        """
+        return self._message
+
+    @property
+    def files(self) -> Dict[str, Optional[Union[str, bytes]]]:
+        """
+        :return: Paths mapped to new contents, str is encoded as UTF-8, None deletes file.
+        :rtype: Dict[str, Optional[Union[str, bytes]]]
+        """
+        return self._files
+
+    @property
+    def branch(self) -> Optional[str]:
+        """
+        :return: Name of branch to commit to, e.g. 'master', None means current branch.
+        :rtype: Optional[str]
+        """
+        return self._branch
+
+    @property
+    def parents(self) -> Optional[Sequence[Union[str, int]]]:
+        """
+        :rtype: Optional[Sequence[Union[str, int]]]
+        """
+        return self._parents
+
+    @property
+    def author(self) -> Optional[str]:
+        """
+        :rtype: Optional[str]
+        """
+        return self._author
+
+    @property
+    def author_email(self) -> Optional[str]:
+        """
+        :rtype: Optional[str]
+        """
+        return self._author_email
+
+    @property
+    def author_date(self) -> Optional[datetime.datetime]:
+        """
+        :return: Author date, naive datetime is treated as local time.
+        :rtype: Optional[datetime.datetime]
+        """
+        return self._author_date
+
+    @property
+    def committer(self) -> Optional[str]:
+        """
+        :rtype: Optional[str]
+        """
+        return self._committer
+
+    @property
+    def committer_email(self) -> Optional[str]:
+        """
+        :rtype: Optional[str]
+        """
+        return self._committer_email
+
+    @property
+    def committer_date(self) -> Optional[datetime.datetime]:
+        """
+        :return: Committer date, naive datetime is treated as local time.
+        :rtype: Optional[datetime.datetime]
+        """
+        return self._committer_date
+
+    def __repr__(self) -> str:
+        return f"NewCommit({self.message!r}, branch={self.branch!r}, parents={self.parents!r})"
+
+
+class CommitPage:
+    """
+    Represents one page of commits returned by Git.get_commits_page.
+    """
+    __slots__ = (
+        '_commits',
+        '_next_cursor',
+    )
+
+    def __init__(
+            self,
+            commits: List[Commit],
+            next_cursor: Optional[str]
+    ):
+        self._commits = commits
+        self._next_cursor = next_cursor
+
+    @property
+    def commits(self) -> List[Commit]:
+        """
+        :rtype: List[Commit]
+        """
+        return self._commits
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """
+        :return: Cursor of next page or None if this is the last page.
+        :rtype: Optional[str]
+        """
+        return self._next_cursor
+
+    def __repr__(self) -> str:
+        return f"CommitPage({len(self.commits)} commits, next_cursor={self.next_cursor!r})"
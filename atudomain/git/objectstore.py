@@ -0,0 +1,779 @@
+#!/usr/bin/env python3
+
+import binascii
+import collections
+import heapq
+import mmap
+import os
+import re
+import struct
+import zlib
+
+from atudomain.git.catfile import MissingObjectError
+from atudomain.git.objects import ObjectInfo
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+OBJECT_TYPES = {
+    1: "commit",
+    2: "tree",
+    3: "blob",
+    4: "tag",
+}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+# Number of uninteresting commits walked by limit_list of git after only uninteresting commits
+# remain queued, for histories with commit dates older than dates of their parents.
+LIMIT_SLOP = 5
+
+# Rule "{}" reads files directly in git directory, so like git it applies only to pseudo-refs
+# such as HEAD or FETCH_HEAD, not to names like 'config' or 'index'.
+PSEUDO_REF_REGEX = re.compile(r"[A-Z_]+")
+
+REF_PREFIXES = [
+    "{}",
+    "refs/{}",
+    "refs/tags/{}",
+    "refs/heads/{}",
+    "refs/remotes/{}",
+    "refs/remotes/{}/HEAD",
+]
+
+
+def find_git_directory(
+        directory: str
+) -> Optional[str]:
+    """
+    Finds git directory of a working tree or bare repository without running git.
+
+    :param directory: Path to git repository or bare repository.
+    :type directory: str
+    :return: Path to git directory or None if directory is not a repository.
+    :rtype: Optional[str]
+    """
+    dot_git = os.path.join(directory, ".git")
+    if os.path.isfile(dot_git):
+        with open(dot_git, "r") as f:
+            content = f.read().strip()
+        if content.startswith("gitdir: "):
+            dot_git = os.path.join(directory, content[len("gitdir: "):])
+    for candidate in (dot_git, directory):
+        if os.path.isfile(os.path.join(candidate, "HEAD")) \
+                and os.path.isdir(os.path.join(candidate, "objects")):
+            return candidate
+    return None
+
+
+def _read_varint(
+        data: bytes,
+        position: int
+) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def apply_delta(
+        base: bytes,
+        delta: bytes
+) -> bytes:
+    """
+    Applies git pack delta to base object data.
+
+    :param base: Data of delta base object.
+    :type base: bytes
+    :param delta: Inflated delta instructions.
+    :type delta: bytes
+    :return: Data of resulting object.
+    :rtype: bytes
+    """
+    base_size, position = _read_varint(delta, 0)
+    if base_size != len(base):
+        raise ValueError("Delta base size mismatch")
+    result_size, position = _read_varint(delta, position)
+    result = bytearray()
+    delta_size = len(delta)
+    while position < delta_size:
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            offset = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    offset |= delta[position] << (8 * i)
+                    position += 1
+            size = 0
+            for i in range(3):
+                if opcode & (0x10 << i):
+                    size |= delta[position] << (8 * i)
+                    position += 1
+            if size == 0:
+                size = 0x10000
+            result += base[offset:offset + size]
+        elif opcode:
+            result += delta[position:position + opcode]
+            position += opcode
+        else:
+            raise ValueError("Invalid delta opcode")
+    if len(result) != result_size:
+        raise ValueError("Delta result size mismatch")
+    return bytes(result)
+
+
+class _DeltaBaseCache:
+    """
+    Least recently used cache of resolved pack entries, bounded by total size of their data.
+    """
+    def __init__(
+            self,
+            max_bytes: int
+    ):
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._entries: "collections.OrderedDict[Tuple[str, int], Tuple[str, bytes]]" = collections.OrderedDict()
+
+    def get(
+            self,
+            key: Tuple[str, int]
+    ) -> Optional[Tuple[str, bytes]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(
+            self,
+            key: Tuple[str, int],
+            entry: Tuple[str, bytes]
+    ) -> None:
+        if len(entry[1]) > self._max_bytes or key in self._entries:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry[1])
+        while self._bytes > self._max_bytes:
+            _, (_, data) = self._entries.popitem(last=False)
+            self._bytes -= len(data)
+
+    def clear(
+            self
+    ) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+
+class _Pack:
+    """
+    Memory mapped pack file with its version 1 or 2 index.
+    """
+    def __init__(
+            self,
+            idx_path: str
+    ):
+        self.name = idx_path[:-len(".idx")]
+        with open(idx_path, "rb") as f:
+            self._idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.name + ".pack", "rb") as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._pack[:4] != b"PACK":
+            raise ValueError(f"Not a pack file: {self.name}.pack")
+        if self._idx[:4] == b"\377tOc":
+            if struct.unpack(">I", self._idx[4:8])[0] != 2:
+                raise ValueError(f"Unsupported pack index version: {idx_path}")
+            self._version = 2
+            self._fanout_offset = 8
+        else:
+            self._version = 1
+            self._fanout_offset = 0
+        self._count = self._fanout(255)
+        names_offset = self._fanout_offset + 256 * 4
+        if self._version == 2:
+            self._names_offset = names_offset
+            self._offsets_offset = names_offset + self._count * 24
+            self._large_offsets_offset = self._offsets_offset + self._count * 4
+        else:
+            self._names_offset = names_offset + 4
+
+    def _fanout(
+            self,
+            index: int
+    ) -> int:
+        position = self._fanout_offset + index * 4
+        return struct.unpack(">I", self._idx[position:position + 4])[0]
+
+    def _name(
+            self,
+            index: int
+    ) -> bytes:
+        if self._version == 2:
+            position = self._names_offset + index * 20
+        else:
+            position = self._names_offset + index * 24
+        return self._idx[position:position + 20]
+
+    def _offset(
+            self,
+            index: int
+    ) -> int:
+        if self._version == 1:
+            position = self._fanout_offset + 256 * 4 + index * 24
+            return struct.unpack(">I", self._idx[position:position + 4])[0]
+        position = self._offsets_offset + index * 4
+        offset = struct.unpack(">I", self._idx[position:position + 4])[0]
+        if offset & 0x80000000:
+            position = self._large_offsets_offset + (offset & 0x7fffffff) * 8
+            offset = struct.unpack(">Q", self._idx[position:position + 8])[0]
+        return offset
+
+    def find_offset(
+            self,
+            binary_id: bytes
+    ) -> Optional[int]:
+        """
+        Binary search in the part of sorted name table selected by the fanout table.
+        """
+        first_byte = binary_id[0]
+        low = self._fanout(first_byte - 1) if first_byte else 0
+        high = self._fanout(first_byte)
+        while low < high:
+            middle = (low + high) // 2
+            name = self._name(middle)
+            if name < binary_id:
+                low = middle + 1
+            elif name > binary_id:
+                high = middle
+            else:
+                return self._offset(middle)
+        return None
+
+    def read_entry_header(
+            self,
+            offset: int
+    ) -> Tuple[int, int, int, Optional[object]]:
+        """
+        Reads type and size of pack entry, position of its compressed data and delta base
+        (pack offset for OFS_DELTA, binary object id for REF_DELTA).
+        """
+        pack = self._pack
+        entry_offset = offset
+        byte = pack[offset]
+        offset += 1
+        entry_type = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = pack[offset]
+            offset += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        base = None
+        if entry_type == OFS_DELTA:
+            byte = pack[offset]
+            offset += 1
+            distance = byte & 0x7f
+            while byte & 0x80:
+                byte = pack[offset]
+                offset += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7f)
+            base = entry_offset - distance
+        elif entry_type == REF_DELTA:
+            base = pack[offset:offset + 20]
+            offset += 20
+        return entry_type, size, offset, base
+
+    def inflate(
+            self,
+            position: int,
+            size: int,
+            limit=None
+    ) -> bytes:
+        """
+        Decompresses entry data starting at position. If limit is given, stops after limit bytes.
+        """
+        decompressor = zlib.decompressobj()
+        parts = list()
+        produced = 0
+        chunk_size = max(size // 2, 4096)
+        while not decompressor.eof:
+            chunk = self._pack[position:position + chunk_size]
+            if not chunk:
+                raise ValueError(f"Truncated pack file: {self.name}.pack")
+            position += len(chunk)
+            part = decompressor.decompress(chunk)
+            parts.append(part)
+            produced += len(part)
+            if limit is not None and produced >= limit:
+                break
+        return b"".join(parts)
+
+    def close(
+            self
+    ) -> None:
+        self._idx.close()
+        self._pack.close()
+
+
+class GitObjectStore:
+    """
+    Reads objects directly from '.git/objects' without running git binary.
+    Supports loose objects, packs (memory mapped, with OFS and REF deltas) and alternates.
+
+    :param git_directory: Path to git directory, e.g. 'repo/.git' or bare repository.
+    :type git_directory: str
+    :param delta_base_cache_size: Maximum number of bytes kept in cache of resolved delta bases.
+    :type delta_base_cache_size: int
+    """
+    def __init__(
+            self,
+            git_directory: str,
+            delta_base_cache_size=32 * 2 ** 20
+    ):
+        self._git_directory = git_directory
+        self._object_directories = self._find_object_directories(
+            os.path.join(git_directory, "objects")
+        )
+        self._packs: Dict[str, _Pack] = dict()
+        self._delta_base_cache = _DeltaBaseCache(delta_base_cache_size)
+        self._scan_packs()
+
+    @staticmethod
+    def _find_object_directories(
+            objects_directory: str
+    ) -> List[str]:
+        directories = list()
+        pending = [objects_directory]
+        while pending:
+            directory = os.path.abspath(pending.pop(0))
+            if directory in directories or not os.path.isdir(directory):
+                continue
+            directories.append(directory)
+            alternates = os.path.join(directory, "info", "alternates")
+            if os.path.isfile(alternates):
+                with open(alternates, "r") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith("#"):
+                            pending.append(os.path.join(directory, line))
+        return directories
+
+    def _scan_packs(
+            self
+    ) -> bool:
+        found = False
+        for directory in self._object_directories:
+            pack_directory = os.path.join(directory, "pack")
+            if not os.path.isdir(pack_directory):
+                continue
+            for file_name in sorted(os.listdir(pack_directory)):
+                if not file_name.endswith(".idx"):
+                    continue
+                idx_path = os.path.join(pack_directory, file_name)
+                if idx_path in self._packs \
+                        or not os.path.isfile(idx_path[:-len(".idx")] + ".pack"):
+                    continue
+                self._packs[idx_path] = _Pack(idx_path)
+                found = True
+        return found
+
+    def _find_loose(
+            self,
+            object_id: str
+    ) -> Optional[str]:
+        for directory in self._object_directories:
+            path = os.path.join(directory, object_id[:2], object_id[2:])
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _find_packed(
+            self,
+            binary_id: bytes
+    ) -> Optional[Tuple[_Pack, int]]:
+        for pack in self._packs.values():
+            offset = pack.find_offset(binary_id)
+            if offset is not None:
+                return pack, offset
+        return None
+
+    @staticmethod
+    def _split_loose(
+            raw: bytes
+    ) -> Tuple[str, int, bytes]:
+        header, _, data = raw.partition(b"\0")
+        object_type, size = header.decode().split(" ")
+        return object_type, int(size), data
+
+    def _read_packed(
+            self,
+            pack: _Pack,
+            offset: int
+    ) -> Tuple[str, bytes]:
+        deltas = list()
+        while True:
+            cached = self._delta_base_cache.get((pack.name, offset))
+            if cached is not None:
+                object_type, data = cached
+                break
+            entry_type, size, position, base = pack.read_entry_header(offset)
+            if entry_type == OFS_DELTA:
+                deltas.append((pack, offset, pack.inflate(position, size)))
+                offset = base
+            elif entry_type == REF_DELTA:
+                deltas.append((pack, offset, pack.inflate(position, size)))
+                location = self._find_packed(base)
+                if location is None:
+                    object_type, data = self._read_binary(base)
+                    break
+                pack, offset = location
+            elif entry_type in OBJECT_TYPES:
+                object_type, data = OBJECT_TYPES[entry_type], pack.inflate(position, size)
+                if deltas:
+                    self._delta_base_cache.put((pack.name, offset), (object_type, data))
+                break
+            else:
+                raise ValueError(f"Unknown pack entry type {entry_type} in {pack.name}.pack")
+        while deltas:
+            pack, offset, delta = deltas.pop()
+            data = apply_delta(data, delta)
+            if deltas:
+                self._delta_base_cache.put((pack.name, offset), (object_type, data))
+        return object_type, data
+
+    def _packed_info(
+            self,
+            pack: _Pack,
+            offset: int
+    ) -> Tuple[str, int]:
+        size = None
+        while True:
+            cached = self._delta_base_cache.get((pack.name, offset))
+            if cached is not None:
+                object_type, data = cached
+                return object_type, len(data) if size is None else size
+            entry_type, entry_size, position, base = pack.read_entry_header(offset)
+            if entry_type in OBJECT_TYPES:
+                return OBJECT_TYPES[entry_type], entry_size if size is None else size
+            if entry_type not in (OFS_DELTA, REF_DELTA):
+                raise ValueError(f"Unknown pack entry type {entry_type} in {pack.name}.pack")
+            if size is None:
+                delta_header = pack.inflate(position, entry_size, limit=20)
+                _, delta_position = _read_varint(delta_header, 0)
+                size, _ = _read_varint(delta_header, delta_position)
+            if entry_type == OFS_DELTA:
+                offset = base
+                continue
+            location = self._find_packed(base)
+            if location is None:
+                return self._binary_info(base)[0], size
+            pack, offset = location
+
+    def _locate(
+            self,
+            object_id: str
+    ):
+        if len(object_id) != 40:
+            raise MissingObjectError(object_id)
+        try:
+            binary_id = binascii.unhexlify(object_id)
+        except binascii.Error:
+            raise MissingObjectError(object_id)
+        location = self._find_packed(binary_id)
+        if location is not None:
+            return location
+        path = self._find_loose(object_id)
+        if path is not None:
+            return path
+        if self._scan_packs():
+            location = self._find_packed(binary_id)
+            if location is not None:
+                return location
+        raise MissingObjectError(object_id)
+
+    def _read_binary(
+            self,
+            binary_id: bytes
+    ) -> Tuple[str, bytes]:
+        object_info, data = self.read_object(binascii.hexlify(binary_id).decode())
+        return object_info.object_type, data
+
+    def _binary_info(
+            self,
+            binary_id: bytes
+    ) -> Tuple[str, int]:
+        object_info = self._object_info(binascii.hexlify(binary_id).decode())
+        return object_info.object_type, object_info.size
+
+    def _object_info(
+            self,
+            object_id: str
+    ) -> ObjectInfo:
+        location = self._locate(object_id)
+        if isinstance(location, str):
+            decompressor = zlib.decompressobj()
+            with open(location, "rb") as f:
+                header = decompressor.decompress(f.read(4096), 64)
+            object_type, size = header[:header.index(b"\0")].decode().split(" ")
+            return ObjectInfo(object_id, object_type, int(size))
+        object_type, size = self._packed_info(*location)
+        return ObjectInfo(object_id, object_type, size)
+
+    def read_object(
+            self,
+            object_id: str
+    ) -> Tuple[ObjectInfo, bytes]:
+        """
+        Reads object by its full SHA.
+
+        :param object_id: Full 40 characters object SHA.
+        :type object_id: str
+        :return: Object header and raw object contents.
+        :rtype: Tuple[ObjectInfo, bytes]
+        """
+        object_id = object_id.lower()
+        location = self._locate(object_id)
+        if isinstance(location, str):
+            with open(location, "rb") as f:
+                object_type, size, data = self._split_loose(zlib.decompress(f.read()))
+        else:
+            object_type, data = self._read_packed(*location)
+        return ObjectInfo(object_id, object_type, len(data)), data
+
+    def object_info(
+            self,
+            object_ids: Iterable[str]
+    ) -> List[Optional[ObjectInfo]]:
+        """
+        Reads object types and sizes. Deltified objects are not reconstructed.
+
+        :param object_ids: Full 40 characters object SHAs.
+        :type object_ids: Iterable[str]
+        :return: ObjectInfo for every object, None if object does not exist.
+        :rtype: List[Optional[ObjectInfo]]
+        """
+        infos = list()
+        for object_id in object_ids:
+            try:
+                infos.append(self._object_info(object_id.lower()))
+            except MissingObjectError:
+                infos.append(None)
+        return infos
+
+    def _read_ref(
+            self,
+            ref: str
+    ) -> Optional[str]:
+        for _ in range(10):
+            path = os.path.join(self._git_directory, ref)
+            value = None
+            if os.path.isfile(path):
+                with open(path, "r") as f:
+                    value = f.read().strip()
+            else:
+                packed_refs = os.path.join(self._git_directory, "packed-refs")
+                if os.path.isfile(packed_refs):
+                    with open(packed_refs, "r") as f:
+                        for line in f:
+                            if line.rstrip("\n").endswith(" " + ref) and not line.startswith(("#", "^")):
+                                value = line.split(" ", 1)[0]
+                                break
+            if value is None:
+                return None
+            if not value.startswith("ref: "):
+                return value
+            ref = value[len("ref: "):]
+        return None
+
+    def _peel(
+            self,
+            object_id: str
+    ) -> str:
+        object_info, data = self.read_object(object_id)
+        while object_info.object_type == "tag":
+            object_id = data[len(b"object "):data.index(b"\n")].decode()
+            object_info, data = self.read_object(object_id)
+        if object_info.object_type != "commit":
+            raise ValueError(f"{object_id} is a {object_info.object_type}, not a commit")
+        return object_id
+
+    def resolve(
+            self,
+            revision: str
+    ) -> str:
+        """
+        Resolves revision to commit SHA. Supports full SHAs, 'HEAD', ref names
+        with git lookup rules and '^', '^N', '~N' suffixes.
+
+        :param revision: Revision to resolve.
+        :type revision: str
+        :return: Commit SHA.
+        :rtype: str
+        """
+        match = re.fullmatch(r"(.+?)((?:[~^]\d*)*)", revision)
+        if match is None:
+            raise MissingObjectError(revision)
+        name, suffixes = match.groups()
+        if re.fullmatch(r"[0-9a-fA-F]{40}", name):
+            object_id = name.lower()
+        else:
+            object_id = None
+            for prefix in REF_PREFIXES:
+                if prefix == "{}" and not PSEUDO_REF_REGEX.fullmatch(name):
+                    continue
+                object_id = self._read_ref(prefix.format(name))
+                if object_id is not None:
+                    break
+            if object_id is None:
+                raise MissingObjectError(revision)
+        object_id = self._peel(object_id)
+        for operator, count in re.findall(r"([~^])(\d*)", suffixes):
+            count = int(count) if count else 1
+            if operator == "~":
+                for _ in range(count):
+                    parents = self._commit_header(object_id)[0]
+                    if not parents:
+                        raise MissingObjectError(revision)
+                    object_id = parents[0]
+            elif count:
+                parents = self._commit_header(object_id)[0]
+                if len(parents) < count:
+                    raise MissingObjectError(revision)
+                object_id = parents[count - 1]
+        return object_id
+
+    def _commit_header(
+            self,
+            commit_id: str
+    ) -> Tuple[List[str], int, bytes]:
+        object_info, data = self.read_object(commit_id)
+        if object_info.object_type != "commit":
+            raise ValueError(f"{commit_id} is a {object_info.object_type}, not a commit")
+        parents = list()
+        timestamp = 0
+        for line in data[:data.find(b"\n\n")].split(b"\n"):
+            if line.startswith(b"parent "):
+                parents.append(line[len(b"parent "):].decode())
+            elif line.startswith(b"committer "):
+                timestamp = int(line.rsplit(b" ", 2)[1])
+        return parents, timestamp, data
+
+    def _limit_range(
+            self,
+            include: str,
+            exclude: str
+    ) -> List[Tuple[str, bytes]]:
+        """
+        Finds commits of 'exclude..include' like git limit_list. Commits reachable from exclude are painted
+        uninteresting in the same date-ordered queue and, when only uninteresting commits remain queued,
+        the walk goes on for LIMIT_SLOP more uninteresting commits, like git, so that commits with older
+        dates than their descendants can still paint commits already found. Only history down to
+        the common part is decoded.
+
+        :return: Commits reachable from include only, newest committer date first.
+        """
+        uninteresting = {exclude}
+        parents_of: Dict[str, Tuple[str, ...]] = dict()
+        queued = set()
+        queue = list()
+        counter = 0
+        interesting_count = 0
+        for commit_id in (include, exclude):
+            if commit_id in queued:
+                continue
+            parents, timestamp, data = self._commit_header(commit_id)
+            heapq.heappush(queue, (-timestamp, counter, commit_id, parents, data))
+            counter += 1
+            queued.add(commit_id)
+            if commit_id not in uninteresting:
+                interesting_count += 1
+
+        def mark_uninteresting(commit_id: str) -> None:
+            nonlocal interesting_count
+            pending = [commit_id]
+            while pending:
+                commit_id = pending.pop()
+                if commit_id in uninteresting:
+                    continue
+                uninteresting.add(commit_id)
+                if commit_id in queued:
+                    interesting_count -= 1
+                pending.extend(parents_of.get(commit_id, ()))
+
+        candidates = list()
+        slop = LIMIT_SLOP
+        while queue:
+            _, _, commit_id, parents, data = heapq.heappop(queue)
+            queued.remove(commit_id)
+            parents_of[commit_id] = parents
+            if commit_id not in uninteresting:
+                interesting_count -= 1
+                candidates.append((commit_id, data))
+            for parent in parents:
+                if parent in parents_of or parent in queued:
+                    continue
+                parent_parents, parent_timestamp, parent_data = self._commit_header(parent)
+                heapq.heappush(queue, (-parent_timestamp, counter, parent, parent_parents, parent_data))
+                counter += 1
+                queued.add(parent)
+                if parent not in uninteresting:
+                    interesting_count += 1
+            if commit_id in uninteresting:
+                for parent in parents:
+                    mark_uninteresting(parent)
+                if interesting_count:
+                    slop = LIMIT_SLOP
+                else:
+                    slop -= 1
+                    if not slop:
+                        break
+        return [x for x in candidates if x[0] not in uninteresting]
+
+    def walk_commits(
+            self,
+            revision_range=""
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Walks history like 'git log', newest committer date first.
+        Supports empty range (HEAD), single revision and 'A..B' ranges.
+
+        :param revision_range: Revision range.
+        :type revision_range: str
+        :return: Iterator over pairs of commit SHA and raw commit object.
+        :rtype: Iterator[Tuple[str, bytes]]
+        """
+        if ".." in revision_range:
+            exclude, include = revision_range.split("..", 1)
+            yield from self._limit_range(self.resolve(include or "HEAD"), self.resolve(exclude or "HEAD"))
+            return
+        start = self.resolve(revision_range or "HEAD")
+        counter = 0
+        queue = list()
+        seen = {start}
+        parents, timestamp, data = self._commit_header(start)
+        heapq.heappush(queue, (-timestamp, counter, start, parents, data))
+        while queue:
+            _, _, commit_id, parents, data = heapq.heappop(queue)
+            yield commit_id, data
+            for parent in parents:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                counter += 1
+                parent_parents, parent_timestamp, parent_data = self._commit_header(parent)
+                heapq.heappush(queue, (-parent_timestamp, counter, parent, parent_parents, parent_data))
+
+    def close(
+            self
+    ) -> None:
+        """
+        Unmaps pack files and clears delta base cache.
+        """
+        for pack in self._packs.values():
+            pack.close()
+        self._packs.clear()
+        self._delta_base_cache.clear()
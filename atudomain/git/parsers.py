@@ -1,10 +1,166 @@
 #!/usr/bin/env python3
 
+import codecs
+import concurrent.futures
 import datetime
+import io
 import re
 
+from atudomain.git.objects import BranchDetails
 from atudomain.git.objects import Commit
-from typing import List, Tuple
+from atudomain.git.objects import FileChange
+from atudomain.git.objects import LazyCommit
+from atudomain.git.refs import branch_name
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+PARALLEL_CHUNK_SIZE = 4 * 2 ** 20
+
+# Interning tables of streaming parsers are cleared when they grow over this size,
+# so that memory used by streams does not depend on history size.
+STREAM_IDENTITIES_LIMIT = 2 ** 16
+
+CHANGES_NUMSTAT = "numstat"
+CHANGES_NAME_STATUS = "name-status"
+
+DEFAULT_ENCODING = "utf-8"
+
+
+def _split_person_line_lazy(
+        person_line: str
+) -> Tuple[str, str, int]:
+    name_email, _, date_source = person_line.rpartition('> ')
+    name, _, email = name_email.partition(' <')
+    return name, email, int(date_source.split(' ')[0])
+
+
+class _LazyRawCommit(LazyCommit):
+    """
+    LazyCommit over a record of 'git log --pretty=raw' output.
+    """
+    __slots__ = (
+        '_author_line',
+        '_committer_line',
+    )
+
+    def _header_end(self) -> int:
+        header_end = self._buffer.find('\n\n', self._start, self._end)
+        return self._end if header_end == -1 else header_end
+
+    def _decode_headers(self) -> None:
+        lines = self._buffer[self._start:self._header_end()].split('\n')
+        tree = None
+        parents = list()
+        author_line = None
+        committer_line = None
+        for line in lines[1:]:
+            keyword, _, value = line.partition(' ')
+            if keyword == 'parent':
+                parents.append(value)
+            elif keyword == 'tree':
+                if tree is None:
+                    tree = value
+            elif keyword == 'author':
+                if author_line is None:
+                    author_line = value
+            elif keyword == 'committer':
+                if committer_line is None:
+                    committer_line = value
+        self._commit_id = lines[0][len('commit '):].split(' ', 1)[0]
+        self._tree = tree
+        self._parents = tuple(parents)
+        self._author_line = author_line
+        self._committer_line = committer_line
+
+    def _decode_author(self) -> None:
+        try:
+            author_line = self._author_line
+        except AttributeError:
+            self._decode_headers()
+            author_line = self._author_line
+        self._author, self._author_email, self._author_timestamp = _split_person_line_lazy(author_line)
+
+    def _decode_committer(self) -> None:
+        try:
+            committer_line = self._committer_line
+        except AttributeError:
+            self._decode_headers()
+            committer_line = self._committer_line
+        self._committer, self._committer_email, self._committer_timestamp = _split_person_line_lazy(committer_line)
+
+    def _decode_message(self) -> None:
+        lines = self._buffer[self._header_end():self._end].split('\n')
+        self._message = '\n'.join([x[4:] for x in lines if x.startswith('    ')]).strip()
+
+
+class _LazyMachineCommit(LazyCommit):
+    """
+    LazyCommit over a record of 'git log -z' output with GitMachineLogParser.FORMAT.
+    All fields except dates are decoded by one split of the record.
+    """
+    __slots__ = ()
+
+    def _decode_fields(self) -> None:
+        (
+            self._commit_id,
+            self._tree,
+            parents,
+            self._author,
+            self._author_email,
+            author_timestamp,
+            self._committer,
+            self._committer_email,
+            committer_timestamp,
+            message
+        ) = self._buffer[self._start:self._end].split('\x1e', 9)
+        self._parents = tuple(parents.split(' ')) if parents else ()
+        self._author_timestamp = int(author_timestamp)
+        self._committer_timestamp = int(committer_timestamp)
+        self._message = message.strip()
+
+    _decode_headers = _decode_fields
+    _decode_author = _decode_fields
+    _decode_committer = _decode_fields
+    _decode_message = _decode_fields
+
+
+def _create_record(
+        commit_id: str,
+        tree: str,
+        parents: List[str],
+        author_line: str,
+        committer_line: str,
+        message_lines: List[str],
+        identities: dict
+) -> tuple:
+    """
+    Same as GitLogParser._create_commit, but returns a plain tuple which is cheap to send between processes.
+    Timestamps are kept as integers, repeated strings are shared, so that pickle writes them once.
+    """
+    author, author_email, author_timestamp = _split_person_line_lazy(author_line)
+    committer, committer_email, committer_timestamp = _split_person_line_lazy(committer_line)
+    intern = identities.setdefault
+    return (
+        intern(commit_id, commit_id),
+        tree,
+        tuple([intern(x, x) for x in parents]),
+        intern(author, author),
+        intern(author_email, author_email),
+        author_timestamp,
+        intern(committer, committer),
+        intern(committer_email, committer_email),
+        committer_timestamp,
+        '\n'.join(message_lines).strip()
+    )
+
+
+def _parse_raw_chunk(
+        raw_log_chunk: str
+) -> List[tuple]:
+    """
+    Runs in worker processes of GitLogParser parallel mode.
+    """
+    return list(GitLogParser()._parse_lines(raw_log_chunk.split('\n'), _create_record))
 
 
 class GitBranchParser:
@@ -28,6 +184,94 @@ class GitBranchParser:
         return branches
 
 
+class GitBranchDetailsParser:
+    """
+    Parses 'git for-each-ref' output with FORMAT, or TRACKING_FORMAT when ahead/behind counts are needed.
+    Fields are separated by NUL characters, refs by new lines.
+    """
+    FIELDS = [
+        '%(refname)',
+        '%(symref)',
+        '%(objectname)',
+        '%(committerdate:unix)',
+        '%(authorname)',
+        '%(authoremail)',
+        '%(upstream)',
+    ]
+    FORMAT = '%00'.join(FIELDS)
+    TRACKING_FORMAT = '%00'.join(FIELDS + ['%(upstream:track,nobracket)'])
+
+    @staticmethod
+    def _parse_track(
+            track: str
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        :return: Numbers of commits ahead and behind upstream, None for upstream which is gone.
+        """
+        if track == 'gone':
+            return None, None
+        ahead = 0
+        behind = 0
+        for part in track.split(', '):
+            keyword, _, count = part.partition(' ')
+            if keyword == 'ahead':
+                ahead = int(count)
+            elif keyword == 'behind':
+                behind = int(count)
+        return ahead, behind
+
+    def extract_branch_details(
+            self,
+            for_each_ref_string: str,
+            include_search=None,
+            exclude_search=None
+    ) -> List[BranchDetails]:
+        """
+        :param for_each_ref_string: Output of 'git for-each-ref' with FORMAT or TRACKING_FORMAT.
+        :type for_each_ref_string: str
+        :param include_search: Search function of compiled regex to include branch names. None means all.
+        :param exclude_search: Search function of compiled regex to exclude branch names.
+        :return: Details of branches, without symbolic refs such as 'remotes/origin/HEAD'.
+        :rtype: List[BranchDetails]
+        """
+        identities = dict()
+        branches = list()
+        for line in for_each_ref_string.split('\n'):
+            if not line:
+                continue
+            fields = line.split('\0')
+            ref_name, symref, commit_id, timestamp, author, author_email, upstream = fields[:7]
+            name = branch_name(ref_name)
+            if name is None or symref:
+                continue
+            if include_search is not None and not include_search(name):
+                continue
+            if exclude_search is not None and exclude_search(name):
+                continue
+            ahead: Optional[int] = None
+            behind: Optional[int] = None
+            if len(fields) > 7:
+                ahead, behind = self._parse_track(fields[7]) if upstream else (None, None)
+            timestamp = int(timestamp) if timestamp else 0
+            date = identities.get(timestamp)
+            if date is None:
+                date = identities[timestamp] = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+            author_email = author_email[1:-1] if author_email.startswith('<') else author_email
+            branches.append(
+                BranchDetails(
+                    name=name,
+                    commit_id=commit_id,
+                    committer_date=date,
+                    author=identities.setdefault(author, author),
+                    author_email=identities.setdefault(author_email, author_email),
+                    upstream=branch_name(upstream) or upstream or None,
+                    ahead=ahead,
+                    behind=behind
+                )
+            )
+        return branches
+
+
 class GitLogParser:
     @staticmethod
     def _split_person_line(
@@ -116,53 +360,701 @@ class GitLogParser:
             split.append('')
         return split
 
-    def extract_commits(
+    def _build_commit(
+            self,
+            commit_string: str
+    ) -> Commit:
+        commit_id = self._extract_commit_id(commit_string)
+
+        tree = self._extract_tree(commit_string)
+
+        parents = self._extract_parents(commit_string)
+
+        is_merge = True if len(parents) > 1 else False
+
+        author_line = self._extract_author_line(commit_string)
+
+        author, author_email, author_date = self._split_person_line(
+            person_line=author_line
+        )
+
+        committer_line = self._extract_committer_line(commit_string)
+
+        committer, committer_email, committer_date = self._split_person_line(
+            person_line=committer_line
+        )
+
+        message = self._extract_message(commit_string)
+
+        message_subject, message_body = self._split_message(message)
+
+        return Commit(
+            is_merge=is_merge,
+            commit_id=commit_id,
+            tree=tree,
+            parents=parents,
+            author=author,
+            author_email=author_email,
+            author_date=author_date,
+            committer=committer,
+            committer_email=committer_email,
+            committer_date=committer_date,
+            message=message,
+            message_subject=message_subject,
+            message_body=message_body
+        )
+
+    @staticmethod
+    def _split_person_line_fast(
+            person_line: str,
+            identities: dict
+    ) -> Tuple[str, str, datetime.datetime]:
+        """
+        Splits person line without regular expressions. Names, emails and dates are interned
+        through identities table, so that commits of one parse share equal values.
+        """
+        name_email, _, date_source = person_line.rpartition('> ')
+        name, _, email = name_email.partition(' <')
+        timestamp = int(date_source.split(' ')[0])
+        date = identities.get(timestamp)
+        if date is None:
+            date = identities[timestamp] = datetime.datetime.fromtimestamp(
+                timestamp,
+                tz=datetime.timezone.utc
+            )
+        return identities.setdefault(name, name), identities.setdefault(email, email), date
+
+    def _create_commit(
+            self,
+            commit_id: str,
+            tree: str,
+            parents: List[str],
+            author_line: str,
+            committer_line: str,
+            message_lines: List[str],
+            identities: dict,
+            changes=None
+    ) -> Commit:
+        author, author_email, author_date = self._split_person_line_fast(
+            person_line=author_line,
+            identities=identities
+        )
+        committer, committer_email, committer_date = self._split_person_line_fast(
+            person_line=committer_line,
+            identities=identities
+        )
+        return Commit(
+            is_merge=len(parents) > 1,
+            commit_id=identities.setdefault(commit_id, commit_id),
+            tree=tree,
+            parents=tuple([identities.setdefault(x, x) for x in parents]),
+            author=author,
+            author_email=author_email,
+            author_date=author_date,
+            committer=committer,
+            committer_email=committer_email,
+            committer_date=committer_date,
+            message='\n'.join(message_lines).strip(),
+            changes=changes
+        )
+
+    def _parse_lines(
+            self,
+            raw_log_lines: Iterable[str],
+            create_commit=None,
+            identities_limit: Optional[int] = None
+    ) -> Iterator[Commit]:
+        """
+        Single pass state machine over 'git log --pretty=raw' lines without line terminators.
+        Message lines are recognized by their 4 space indentation, other lines are dispatched
+        on their header keyword. Unknown headers and their continuation lines are skipped.
+        Commits are built by create_commit, _create_commit by default. Interning table is cleared
+        when it grows over identities_limit, None means it is kept for the whole parse.
+        """
+        create_commit = create_commit or self._create_commit
+        identities = dict()
+        commit_id = None
+        tree = None
+        parents = None
+        author_line = None
+        committer_line = None
+        message_lines = None
+        for line in raw_log_lines:
+            if line.startswith('    '):
+                if message_lines is not None:
+                    message_lines.append(line[4:])
+                continue
+            keyword, _, value = line.partition(' ')
+            if keyword == 'commit':
+                if commit_id is not None:
+                    yield create_commit(
+                        commit_id, tree, parents, author_line, committer_line, message_lines, identities
+                    )
+                    if identities_limit is not None and len(identities) > identities_limit:
+                        identities.clear()
+                commit_id = value.split(' ', 1)[0]
+                tree = None
+                parents = list()
+                author_line = None
+                committer_line = None
+                message_lines = list()
+            elif keyword == 'parent':
+                parents.append(value)
+            elif keyword == 'tree':
+                if tree is None:
+                    tree = value
+            elif keyword == 'author':
+                if author_line is None:
+                    author_line = value
+            elif keyword == 'committer':
+                if committer_line is None:
+                    committer_line = value
+        if commit_id is not None:
+            yield create_commit(
+                commit_id, tree, parents, author_line, committer_line, message_lines, identities
+            )
+
+    def _extract_commits_regex(
             self,
             raw_log_string: str
     ) -> List[Commit]:
-        commits = list()
-        for commit_string in self._extract_commit_strings(raw_log_string):
+        """
+        Previous parser engine running separate regex scans for every field.
+        Kept as a reference for tests and benchmarks of the line based engine.
+        """
+        return [
+            self._build_commit(commit_string)
+            for commit_string in self._extract_commit_strings(raw_log_string)
+        ]
 
-            commit_id = self._extract_commit_id(commit_string)
+    @staticmethod
+    def _split_chunks(
+            raw_log_string: str,
+            chunk_size: int
+    ) -> List[str]:
+        """
+        Cuts raw log into chunks of at least chunk_size characters, only at commit boundaries.
+        """
+        chunks = list()
+        start = 0
+        while start < len(raw_log_string):
+            end = raw_log_string.find('\ncommit ', start + chunk_size)
+            if end == -1:
+                chunks.append(raw_log_string[start:])
+                break
+            chunks.append(raw_log_string[start:end])
+            start = end + 1
+        return chunks
 
-            tree = self._extract_tree(commit_string)
+    @staticmethod
+    def _commit_from_record(
+            record: tuple,
+            identities: dict
+    ) -> Commit:
+        (
+            commit_id,
+            tree,
+            parents,
+            author,
+            author_email,
+            author_timestamp,
+            committer,
+            committer_email,
+            committer_timestamp,
+            message
+        ) = record
+        intern = identities.setdefault
+        author_date = identities.get(author_timestamp)
+        if author_date is None:
+            author_date = identities[author_timestamp] = datetime.datetime.fromtimestamp(
+                author_timestamp,
+                tz=datetime.timezone.utc
+            )
+        committer_date = identities.get(committer_timestamp)
+        if committer_date is None:
+            committer_date = identities[committer_timestamp] = datetime.datetime.fromtimestamp(
+                committer_timestamp,
+                tz=datetime.timezone.utc
+            )
+        return Commit(
+            len(parents) > 1,
+            commit_id,
+            tree,
+            tuple([intern(x, x) for x in parents]),
+            intern(author, author),
+            intern(author_email, author_email),
+            author_date,
+            intern(committer, committer),
+            intern(committer_email, committer_email),
+            committer_date,
+            message
+        )
+
+    def _extract_commits_parallel(
+            self,
+            raw_log_string: str,
+            processes: int,
+            chunk_size: int
+    ) -> List[Commit]:
+        chunks = self._split_chunks(raw_log_string, chunk_size)
+        identities = dict()
+        commits = list()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as executor:
+            for records in executor.map(_parse_raw_chunk, chunks):
+                commits += [self._commit_from_record(x, identities) for x in records]
+        return commits
+
+    def extract_commits(
+            self,
+            raw_log_string: str,
+            processes=1,
+            chunk_size=PARALLEL_CHUNK_SIZE
+    ) -> List[Commit]:
+        """
+        Parses 'git log --pretty=raw' output.
 
-            parents = self._extract_parents(commit_string)
+        :param raw_log_string: Output of 'git log --pretty=raw'.
+        :type raw_log_string: str
+        :param processes: Number of worker processes. With more than one, log longer than chunk_size
+            is cut into chunks at commit boundaries, which are parsed in parallel into tuples
+            and turned into Commit objects in original order.
+        :type processes: int
+        :param chunk_size: Minimal number of characters parsed by one worker task.
+        :type chunk_size: int
+        :return: List of parsed Commit objects.
+        :rtype: List[Commit]
+        """
+        if processes > 1 and len(raw_log_string) > chunk_size:
+            return self._extract_commits_parallel(raw_log_string, processes, chunk_size)
+        return list(self._parse_lines(raw_log_string.split('\n')))
 
-            is_merge = True if len(parents) > 1 else False
+    @staticmethod
+    def _extract_changes(
+            changes_string: str,
+            changes_format: str,
+            identities: dict
+    ) -> Tuple[FileChange, ...]:
+        tokens = changes_string.split('\0')
+        changes = list()
+        intern = identities.setdefault
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            index += 1
+            if not token:
+                continue
+            added = None
+            deleted = None
+            status = None
+            old_path = None
+            if changes_format == CHANGES_NUMSTAT:
+                added, deleted, path = token.split('\t', 2)
+                added = int(added) if added != '-' else None
+                deleted = int(deleted) if deleted != '-' else None
+                is_rename = not path
+            else:
+                status = token[0]
+                is_rename = status in ('R', 'C')
+                if not is_rename:
+                    path = tokens[index]
+                    index += 1
+            if is_rename:
+                old_path = intern(tokens[index], tokens[index])
+                path = tokens[index + 1]
+                index += 2
+            changes.append(FileChange(intern(path, path), old_path, status, added, deleted))
+        return tuple(changes)
 
-            author_line = self._extract_author_line(commit_string)
+    def extract_commits_with_changes(
+            self,
+            raw_log_string: str,
+            changes_format: str
+    ) -> List[Commit]:
+        """
+        Parses 'git log --pretty=raw -z' output with '--numstat' or '--name-status'. Each record is
+        commit header and message followed by NUL terminated file change entries.
 
-            author, author_email, author_date = self._split_person_line(
-                person_line=author_line
+        :param raw_log_string: Output of 'git log --pretty=raw -z --numstat' or '--name-status'.
+        :type raw_log_string: str
+        :param changes_format: 'numstat' or 'name-status'.
+        :type changes_format: str
+        :return: List of Commit objects with changes.
+        :rtype: List[Commit]
+        """
+        if changes_format not in (CHANGES_NUMSTAT, CHANGES_NAME_STATUS):
+            raise ValueError(f"Unknown changes format: {changes_format}")
+        identities = dict()
+        commit_strings = list()
+        changes_list = list()
+        find = raw_log_string.find
+        startswith = raw_log_string.startswith
+        length = len(raw_log_string)
+        position = 0
+        while position < length:
+            if raw_log_string[position] == '\0':
+                position += 1
+                continue
+            header_end = find('\n\n', position)
+            end = length if header_end == -1 else header_end + 2
+            while startswith('    ', end):
+                line_end = find('\n', end)
+                end = length if line_end == -1 else line_end + 1
+            commit_strings.append(raw_log_string[position:end])
+            if startswith('\n', end):
+                changes_end = find('\0\0', end)
+                changes_end = length if changes_end == -1 else changes_end
+                changes_list.append(
+                    self._extract_changes(raw_log_string[end + 1:changes_end], changes_format, identities)
+                )
+                position = changes_end
+            else:
+                changes_list.append(tuple())
+                position = end
+        changes_iterator = iter(changes_list)
+        return list(
+            self._parse_lines(
+                '\n'.join(commit_strings).split('\n'),
+                lambda *arguments: self._create_commit(*arguments, changes=next(changes_iterator))
             )
+        )
 
-            committer_line = self._extract_committer_line(commit_string)
+    @staticmethod
+    def _find_codec(
+            encoding: bytes,
+            codecs_by_encoding: dict
+    ) -> str:
+        """
+        :return: Name of Python codec for encoding header value, default encoding if it is unknown.
+        """
+        codec = codecs_by_encoding.get(encoding)
+        if codec is None:
+            try:
+                codec = codecs.lookup(encoding.decode("ascii", "replace")).name
+            except LookupError:
+                codec = DEFAULT_ENCODING
+            codecs_by_encoding[encoding] = codec
+        return codec
 
-            committer, committer_email, committer_date = self._split_person_line(
-                person_line=committer_line
+    def _parse_byte_lines(
+            self,
+            raw_log_lines: Iterable[bytes]
+    ) -> Iterator[Commit]:
+        """
+        Same state machine as _parse_lines over lines of bytes. Header values and message stay bytes
+        until commit is complete and only then are decoded, with encoding from 'encoding' header
+        of commit. Undecodable bytes are replaced.
+        """
+        identities = dict()
+        codecs_by_encoding = dict()
+        commit_id = None
+        tree = None
+        parents = None
+        author_line = None
+        committer_line = None
+        encoding = None
+        message_lines = None
+        for line in raw_log_lines:
+            if line.startswith(b'    '):
+                if message_lines is not None:
+                    message_lines.append(line[4:])
+                continue
+            keyword, _, value = line.partition(b' ')
+            if keyword == b'commit':
+                if commit_id is not None:
+                    yield self._create_commit_from_bytes(
+                        commit_id, tree, parents, author_line, committer_line, encoding, message_lines,
+                        identities, codecs_by_encoding
+                    )
+                commit_id = value.split(b' ', 1)[0]
+                tree = None
+                parents = list()
+                author_line = None
+                committer_line = None
+                encoding = None
+                message_lines = list()
+            elif keyword == b'parent':
+                parents.append(value)
+            elif keyword == b'tree':
+                if tree is None:
+                    tree = value
+            elif keyword == b'author':
+                if author_line is None:
+                    author_line = value
+            elif keyword == b'committer':
+                if committer_line is None:
+                    committer_line = value
+            elif keyword == b'encoding':
+                if encoding is None:
+                    encoding = value
+        if commit_id is not None:
+            yield self._create_commit_from_bytes(
+                commit_id, tree, parents, author_line, committer_line, encoding, message_lines,
+                identities, codecs_by_encoding
             )
 
-            message = self._extract_message(commit_string)
-
-            message_subject, message_body = self._split_message(message)
-
-            commit = Commit(
-                is_merge=is_merge,
-                commit_id=commit_id,
-                tree=tree,
-                parents=parents,
-                author=author,
-                author_email=author_email,
-                author_date=author_date,
-                committer=committer,
-                committer_email=committer_email,
-                committer_date=committer_date,
-                message=message,
-                message_subject=message_subject,
-                message_body=message_body
+    def _create_commit_from_bytes(
+            self,
+            commit_id: bytes,
+            tree: bytes,
+            parents: List[bytes],
+            author_line: bytes,
+            committer_line: bytes,
+            encoding: Optional[bytes],
+            message_lines: List[bytes],
+            identities: dict,
+            codecs_by_encoding: dict
+    ) -> Commit:
+        codec = DEFAULT_ENCODING if encoding is None else self._find_codec(encoding, codecs_by_encoding)
+        return self._create_commit(
+            commit_id.decode(),
+            tree.decode(),
+            [x.decode() for x in parents],
+            author_line.decode(codec, 'replace'),
+            committer_line.decode(codec, 'replace'),
+            [b'\n'.join(message_lines).decode(codec, 'replace')],
+            identities
+        )
+
+    def extract_commits_from_bytes(
+            self,
+            raw_log_bytes: bytes
+    ) -> List[Commit]:
+        """
+        Parses 'git log --pretty=raw --encoding=none' output read as bytes. Output is not decoded
+        as a whole, only fields of commits are, with encoding given by 'encoding' header of each commit
+        (UTF-8 by default). Undecodable bytes are replaced instead of failing the whole parse.
+        Lines are read one by one, so that no list of all lines is built.
+
+        :param raw_log_bytes: Output of 'git log --pretty=raw --encoding=none'.
+        :type raw_log_bytes: bytes
+        :return: List of parsed Commit objects.
+        :rtype: List[Commit]
+        """
+        return list(self._parse_byte_lines(line.rstrip(b'\n') for line in io.BytesIO(raw_log_bytes)))
+
+    @staticmethod
+    def extract_lazy_commits(
+            raw_log_string: str
+    ) -> List[LazyCommit]:
+        """
+        Only finds boundaries of commits in 'git log --pretty=raw' output. Returned commits
+        share raw_log_string and decode their fields when they are accessed.
+
+        :param raw_log_string: Output of 'git log --pretty=raw'.
+        :type raw_log_string: str
+        :return: List of LazyCommit objects.
+        :rtype: List[LazyCommit]
+        """
+        commits = list()
+        if not raw_log_string.startswith('commit '):
+            return commits
+        find = raw_log_string.find
+        start = 0
+        end = find('\ncommit ')
+        while end != -1:
+            commits.append(_LazyRawCommit(raw_log_string, start, end))
+            start = end + 1
+            end = find('\ncommit ', start)
+        commits.append(_LazyRawCommit(raw_log_string, start, len(raw_log_string)))
+        return commits
+
+    def iter_commits(
+            self,
+            raw_log_lines: Iterable[str]
+    ) -> Iterator[Commit]:
+        """
+        Parses 'git log --pretty=raw' output line by line and yields Commit objects
+        as soon as each of them is complete. Only one commit is kept in memory at a time
+        and interning table of names, emails and dates is bounded by STREAM_IDENTITIES_LIMIT.
+
+        :param raw_log_lines: Lines of 'git log --pretty=raw' output, e.g. a pipe opened in text mode.
+        :type raw_log_lines: Iterable[str]
+        :return: Iterator over parsed Commit objects.
+        :rtype: Iterator[Commit]
+        """
+        return self._parse_lines(
+            (line.rstrip('\n') for line in raw_log_lines),
+            identities_limit=STREAM_IDENTITIES_LIMIT
+        )
+
+
+class GitMachineLogParser:
+    """
+    Parses output of 'git log -z' with FORMAT, where fields are separated with
+    record separator (0x1e) and commits are terminated with NUL. Needs no regular expressions.
+    """
+    FORMAT = '%x1e'.join(['%H', '%T', '%P', '%an', '%ae', '%at', '%cn', '%ce', '%ct', '%B'])
+
+    @staticmethod
+    def _intern_date(
+            timestamp: str,
+            identities: dict
+    ) -> datetime.datetime:
+        timestamp = int(timestamp)
+        date = identities.get(timestamp)
+        if date is None:
+            date = identities[timestamp] = datetime.datetime.fromtimestamp(
+                timestamp,
+                tz=datetime.timezone.utc
             )
+        return date
 
-            commits.append(commit)
+    def _build_commit(
+            self,
+            commit_string: str,
+            identities: dict
+    ) -> Commit:
+        (
+            commit_id,
+            tree,
+            parents,
+            author,
+            author_email,
+            author_timestamp,
+            committer,
+            committer_email,
+            committer_timestamp,
+            message
+        ) = commit_string.split('\x1e', 9)
+        intern = identities.setdefault
+        parents = tuple([intern(x, x) for x in parents.split(' ')]) if parents else ()
+        return Commit(
+            is_merge=len(parents) > 1,
+            commit_id=intern(commit_id, commit_id),
+            tree=tree,
+            parents=parents,
+            author=intern(author, author),
+            author_email=intern(author_email, author_email),
+            author_date=self._intern_date(author_timestamp, identities),
+            committer=intern(committer, committer),
+            committer_email=intern(committer_email, committer_email),
+            committer_date=self._intern_date(committer_timestamp, identities),
+            message=message.strip()
+        )
 
+    def extract_commits(
+            self,
+            raw_log_string: str
+    ) -> List[Commit]:
+        identities = dict()
+        return [
+            self._build_commit(commit_string, identities)
+            for commit_string in raw_log_string.split('\0')
+            if commit_string
+        ]
+
+    @staticmethod
+    def extract_lazy_commits(
+            raw_log_string: str
+    ) -> List[LazyCommit]:
+        """
+        Only finds boundaries of commits in 'git log -z' output. Returned commits
+        share raw_log_string and decode their fields when they are accessed.
+
+        :param raw_log_string: Output of 'git log -z' with FORMAT.
+        :type raw_log_string: str
+        :return: List of LazyCommit objects.
+        :rtype: List[LazyCommit]
+        """
+        commits = list()
+        find = raw_log_string.find
+        start = 0
+        end = find('\0')
+        while end != -1:
+            if end > start:
+                commits.append(_LazyMachineCommit(raw_log_string, start, end))
+            start = end + 1
+            end = find('\0', start)
+        if start < len(raw_log_string):
+            commits.append(_LazyMachineCommit(raw_log_string, start, len(raw_log_string)))
         return commits
+
+    def iter_commits(
+            self,
+            raw_log_chunks: Iterable[str]
+    ) -> Iterator[Commit]:
+        """
+        Yields Commit objects from chunks of output read from a pipe.
+        Chunks do not have to be aligned with commit boundaries. Interning table
+        is bounded by STREAM_IDENTITIES_LIMIT, like in GitLogParser.iter_commits.
+
+        :param raw_log_chunks: Consecutive pieces of 'git log -z' output.
+        :type raw_log_chunks: Iterable[str]
+        :return: Iterator over parsed Commit objects.
+        :rtype: Iterator[Commit]
+        """
+        identities = dict()
+        rest = ''
+        for chunk in raw_log_chunks:
+            commit_strings = (rest + chunk).split('\0')
+            rest = commit_strings.pop()
+            for commit_string in commit_strings:
+                if commit_string:
+                    yield self._build_commit(commit_string, identities)
+                    if len(identities) > STREAM_IDENTITIES_LIMIT:
+                        identities.clear()
+        if rest:
+            yield self._build_commit(rest, identities)
+
+
+class GitObjectParser:
+    """
+    Parses raw git objects as printed by 'git cat-file commit'.
+    """
+    def extract_commit(
+            self,
+            commit_id: str,
+            commit_object: str,
+            identities=None
+    ) -> Commit:
+        """
+        :param commit_id: SHA of commit object.
+        :type commit_id: str
+        :param commit_object: Decoded commit object.
+        :type commit_object: str
+        :param identities: Optional table for interning names, emails and dates shared by many calls.
+        :type identities: dict
+        :return: Parsed commit.
+        :rtype: Commit
+        """
+        if identities is None:
+            identities = dict()
+        headers, _, message = commit_object.partition('\n\n')
+        tree = None
+        parents = list()
+        author_line = None
+        committer_line = None
+        for line in headers.split('\n'):
+            keyword, _, value = line.partition(' ')
+            if keyword == 'parent':
+                parents.append(value)
+            elif keyword == 'tree':
+                if tree is None:
+                    tree = value
+            elif keyword == 'author':
+                if author_line is None:
+                    author_line = value
+            elif keyword == 'committer':
+                if committer_line is None:
+                    committer_line = value
+        author, author_email, author_date = GitLogParser._split_person_line_fast(
+            person_line=author_line,
+            identities=identities
+        )
+        committer, committer_email, committer_date = GitLogParser._split_person_line_fast(
+            person_line=committer_line,
+            identities=identities
+        )
+        return Commit(
+            is_merge=len(parents) > 1,
+            commit_id=identities.setdefault(commit_id, commit_id),
+            tree=tree,
+            parents=tuple([identities.setdefault(x, x) for x in parents]),
+            author=author,
+            author_email=author_email,
+            author_date=author_date,
+            committer=committer,
+            committer_email=committer_email,
+            committer_date=committer_date,
+            message=message.strip()
+        )
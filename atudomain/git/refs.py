@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+import os
+
+from typing import Dict, List, Optional, Tuple
+
+
+SYMBOLIC_REF_PREFIX = "ref: "
+BRANCH_PREFIXES = (
+    ("refs/heads/", ""),
+    ("refs/remotes/", "remotes/"),
+)
+
+
+def branch_name(
+        ref_name: str
+) -> Optional[str]:
+    """
+    Converts full ref name to branch name as listed by 'git branch --all',
+    e.g. 'refs/remotes/origin/master' to 'remotes/origin/master'.
+
+    :return: Branch name or None if ref is not a local or remote-tracking branch.
+    :rtype: Optional[str]
+    """
+    for ref_prefix, name_prefix in BRANCH_PREFIXES:
+        if ref_name.startswith(ref_prefix):
+            return name_prefix + ref_name[len(ref_prefix):]
+    return None
+
+
+def find_common_directory(
+        git_directory: str
+) -> str:
+    """
+    :return: Directory with refs and objects shared by worktrees, i.e. git directory
+        of main worktree for git directory of linked worktree, otherwise git_directory.
+    :rtype: str
+    """
+    commondir_path = os.path.join(git_directory, "commondir")
+    if os.path.isfile(commondir_path):
+        with open(commondir_path, "r") as f:
+            return os.path.join(git_directory, f.read().strip())
+    return git_directory
+
+
+class GitRefStore:
+    """
+    Reads refs directly from 'packed-refs' and loose files under 'refs' directory, without running git.
+    Loose refs override packed ones and symbolic refs are resolved. Refs are loaded once and kept
+    until modification time of 'packed-refs' or of any directory under 'refs' changes. Git updates refs
+    by renaming lock files, which changes modification time of directory holding the ref.
+
+    :param git_directory: Path to git directory (or worktree git directory with 'commondir' file).
+    :type git_directory: str
+    """
+    def __init__(
+            self,
+            git_directory: str
+    ):
+        self._common_directory = find_common_directory(git_directory)
+        self._signature: Optional[Tuple] = None
+        self._refs: Dict[str, str] = dict()
+        self._symbolic_refs: Dict[str, str] = dict()
+
+    @staticmethod
+    def _stat(
+            path: str
+    ) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _is_current(
+            self
+    ) -> bool:
+        if self._signature is None:
+            return False
+        return all(self._stat(path) == mtime for path, mtime in self._signature)
+
+    def _read_packed_refs(
+            self,
+            refs: Dict[str, str]
+    ) -> None:
+        try:
+            with open(os.path.join(self._common_directory, "packed-refs"), "r") as f:
+                for line in f:
+                    if line.startswith(("#", "^")):
+                        continue
+                    object_id, _, name = line.rstrip("\n").partition(" ")
+                    if name:
+                        refs[name] = object_id
+        except FileNotFoundError:
+            pass
+
+    def _read_loose_refs(
+            self,
+            refs: Dict[str, str],
+            signature: List[Tuple[str, Optional[int]]]
+    ) -> None:
+        stack = [(os.path.join(self._common_directory, "refs"), "refs/")]
+        while stack:
+            path, prefix = stack.pop()
+            signature.append((path, self._stat(path)))
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, prefix + entry.name + "/"))
+                elif not entry.name.endswith(".lock"):
+                    try:
+                        with open(entry.path, "r") as f:
+                            value = f.read().strip()
+                    except OSError:
+                        continue
+                    if value:
+                        refs[prefix + entry.name] = value
+
+    def _load(
+            self
+    ) -> None:
+        packed_refs_path = os.path.join(self._common_directory, "packed-refs")
+        signature = [(packed_refs_path, self._stat(packed_refs_path))]
+        raw_refs: Dict[str, str] = dict()
+        self._read_packed_refs(raw_refs)
+        self._read_loose_refs(raw_refs, signature)
+        refs = dict()
+        symbolic_refs = dict()
+        for name, value in raw_refs.items():
+            if value.startswith(SYMBOLIC_REF_PREFIX):
+                symbolic_refs[name] = value[len(SYMBOLIC_REF_PREFIX):]
+                for _ in range(10):
+                    value = raw_refs.get(value[len(SYMBOLIC_REF_PREFIX):], "")
+                    if not value.startswith(SYMBOLIC_REF_PREFIX):
+                        break
+                if not value or value.startswith(SYMBOLIC_REF_PREFIX):
+                    continue
+            refs[name] = value
+        self._refs = dict(sorted(refs.items()))
+        self._symbolic_refs = symbolic_refs
+        self._signature = tuple(signature)
+
+    def get_refs(
+            self
+    ) -> Dict[str, str]:
+        """
+        :return: Full ref names (e.g. 'refs/heads/master') mapped to SHAs they point to, sorted by name.
+            Symbolic refs are resolved, dangling ones are skipped. Annotated tags map to tag object SHAs.
+        :rtype: Dict[str, str]
+        """
+        if not self._is_current():
+            self._load()
+        return self._refs
+
+    def get_symbolic_refs(
+            self
+    ) -> Dict[str, str]:
+        """
+        :return: Full names of symbolic refs under 'refs' mapped to full names of refs they point to.
+        :rtype: Dict[str, str]
+        """
+        if not self._is_current():
+            self._load()
+        return self._symbolic_refs
+
+    def get_branches(
+            self
+    ) -> Dict[str, str]:
+        """
+        :return: Branch names as listed by 'git branch --all' (e.g. 'master', 'remotes/origin/master')
+            mapped to SHAs of their tip commits. Symbolic refs, such as 'remotes/origin/HEAD', are skipped.
+        :rtype: Dict[str, str]
+        """
+        refs = self.get_refs()
+        symbolic_refs = self._symbolic_refs
+        branches = dict()
+        for name, object_id in refs.items():
+            if name not in symbolic_refs:
+                name = branch_name(name)
+                if name is not None:
+                    branches[name] = object_id
+        return branches
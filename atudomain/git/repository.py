@@ -1,13 +1,62 @@
 #!/usr/bin/env python3
 
+import datetime
+import heapq
+import os
 import re
+import resource
 import subprocess
+import tempfile
+import time
 
+from atudomain.git.cache import GitCommitCache
+from atudomain.git.cache import build_cache_path
+from atudomain.git.catfile import GitCatFile
+from atudomain.git.catfile import MissingObjectError
+from atudomain.git.commandcache import DEFAULT_MAX_SIZE
+from atudomain.git.commandcache import GitCommandCache
+from atudomain.git.commandcache import is_cacheable
+from atudomain.git.commandcache import is_read_only
+from atudomain.git.commitgraph import CommitGraphFile
+from atudomain.git.fastimport import GitFastImportStream
+from atudomain.git.fastimport import parse_ident
 from atudomain.git.objects import Commit
+from atudomain.git.objects import CommitPage
+from atudomain.git.objects import NewCommit
+from atudomain.git.objects import ObjectInfo
+from atudomain.git.objectstore import GitObjectStore
+from atudomain.git.objectstore import find_git_directory
+from atudomain.git.objects import BranchDetails
+from atudomain.git.parsers import CHANGES_NAME_STATUS
+from atudomain.git.parsers import CHANGES_NUMSTAT
+from atudomain.git.parsers import GitBranchDetailsParser
 from atudomain.git.parsers import GitBranchParser
 from atudomain.git.parsers import GitLogParser
+from atudomain.git.parsers import GitMachineLogParser
+from atudomain.git.parsers import GitObjectParser
+from atudomain.git.parsers import STREAM_IDENTITIES_LIMIT
+from atudomain.git.refs import GitRefStore
+from atudomain.git.table import CommitTable
+from atudomain.git.tracing import CommandEvent
+from atudomain.git.tracing import GitTracer
+from atudomain.git.tracing import ParseEvent
+from atudomain.git.tracing import TracedCompletedProcess
+from atudomain.git.tracing import TracedPopen
+from atudomain.git.tracing import decode_output
 
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+LOG_FORMAT_RAW = "raw"
+LOG_FORMAT_MACHINE = "machine"
+
+BACKEND_GIT = "git"
+BACKEND_PYTHON = "python"
+
+GENERATION_INFINITY = float("inf")
+
+CURSOR_REVISION_REGEX = re.compile(r'^\^?[0-9a-f]{40,64}$')
+PLAIN_REVISION_REGEX = re.compile(r'^(?![-^])[^\s]*$')
 
 
 class Git:
@@ -19,85 +68,1235 @@ class Git:
     :type directory: str
     :param executable_directory: Path to directory with git binary.
     :type executable_directory: str
+    :param log_format: Default output format requested from git log, 'raw' or 'machine'.
+        The 'machine' format uses NUL and 0x1e separators and is parsed without regular expressions.
+    :type log_format: str
+    :param backend: Backend used for reading commits and objects, 'git' runs git binary,
+        'python' reads '.git/objects' directly. Other operations always run git binary.
+    :type backend: str
+    :param commit_cache: True if commits returned by get_commits should be cached on disk, so that
+        repeated calls only parse commits added since previous call. Works with 'git' backend.
+    :type commit_cache: bool
+    :param commit_cache_directory: Directory for commit cache database, git directory by default.
+        Setting it enables commit cache.
+    :type commit_cache_directory: str
+    :param tracer: Receives events with timings of git commands run by _run and of parsing their output,
+        e.g. TracingAggregator. None disables instrumentation.
+    :type tracer: GitTracer
+    :param command_cache: True if results of read-only git commands (e.g. log, branch, for-each-ref)
+        should be cached in memory until refs, HEAD or config change. Other commands run
+        through this object, e.g. commit or checkout, drop cached results.
+    :type command_cache: bool
+    :param command_cache_max_size: Maximum total length of outputs kept by command cache.
+    :type command_cache_max_size: int
     """
     def __init__(
             self,
             directory: str,
-            executable_directory=""
+            executable_directory="",
+            log_format=LOG_FORMAT_RAW,
+            backend=BACKEND_GIT,
+            commit_cache=False,
+            commit_cache_directory=None,
+            tracer: Optional[GitTracer] = None,
+            command_cache=False,
+            command_cache_max_size=DEFAULT_MAX_SIZE
     ):
+        if backend not in (BACKEND_GIT, BACKEND_PYTHON):
+            raise ValueError(f"Unknown backend: {backend}")
+        self._tracer = tracer
         self._executable_directory = executable_directory
+        self._log_format = self._check_log_format(log_format)
+        self._backend = backend
+        self._object_store = None
+        self._commit_cache = None
+        self._commit_cache_enabled = commit_cache or commit_cache_directory is not None
+        self._commit_cache_directory = commit_cache_directory
+        self._objects_directory = None
+        self._commit_graph = None
+        self._ref_store = None
+        self._command_cache = None
         self._directory = None
         self._build_directory(
             directory=directory
         )
+        if command_cache:
+            self._command_cache = GitCommandCache(self._get_git_directory(), command_cache_max_size)
         self._git_log_parser = GitLogParser()
+        self._git_machine_log_parser = GitMachineLogParser()
         self._git_branch_parser = GitBranchParser()
+        self._git_branch_details_parser = GitBranchDetailsParser()
+        self._git_object_parser = GitObjectParser()
+        self._git_cat_file = GitCatFile(
+            start_process=self._start_cat_file
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(
+            self
+    ) -> None:
+        """
+        Stops background git processes started by this object, e.g. 'git cat-file --batch'.
+        The object can still be used afterwards, processes are started again when needed.
+        """
+        self._git_cat_file.close()
+        if self._object_store is not None:
+            self._object_store.close()
+        if self._commit_cache is not None:
+            self._commit_cache.close()
+            self._commit_cache = None
+        if self._commit_graph is not None:
+            self._commit_graph.close()
+            self._commit_graph = None
 
     def _build_directory(
             self,
             directory: str
     ) -> None:
         self._directory = directory
-        if self._run(["rev-parse", "--git-dir"], check=False).returncode != 0:
+        if self._backend == BACKEND_PYTHON:
+            git_directory = find_git_directory(directory)
+            if git_directory is None:
+                raise NotARepositoryError(directory)
+            self._object_store = GitObjectStore(git_directory)
+        elif self._run(["rev-parse", "--git-dir"], check=False).returncode != 0:
             raise NotARepositoryError(directory)
 
+    @property
+    def command_cache(self) -> Optional[GitCommandCache]:
+        """
+        :return: Cache of read-only command results with hit and miss counters, None if disabled.
+        :rtype: Optional[GitCommandCache]
+        """
+        return self._command_cache
+
+    @property
+    def git_directory(self) -> str:
+        """
+        :return: Absolute path to git directory of repository.
+        :rtype: str
+        """
+        return self._get_git_directory()
+
+    def _get_git_directory(
+            self
+    ) -> str:
+        """
+        :return: Absolute path to git directory.
+        """
+        if self._object_store is not None:
+            git_directory = self._object_store._git_directory
+        else:
+            git_directory = self._run(["rev-parse", "--git-dir"]).stdout.strip()
+        return os.path.abspath(os.path.join(self._directory, git_directory))
+
     def _run(
             self,
             command: List[str],
-            check=True
+            check=True,
+            text=True
     ) -> subprocess.CompletedProcess:
         """
-        Runs commands and gets their output.
+        Runs commands and gets their output. With command cache, results of read-only commands
+        are taken from cache and other commands drop cached results.
 
         :param command: Command to run.
         :type command: List[str]
         :param check: True if exception should be raised when command return code is not 0.
         :type check: bool
+        :param text: True if output should be decoded to str, False for bytes.
+        :type text: bool
         :return: Result of subprocess.run() execution.
         :rtype: subprocess.CompletedProcess
         """
-        path = None
-        env = None
-        if self._executable_directory != "":
-            path = self._executable_directory + ":PATH"
-        if path:
-            env = {"PATH": path}
+        if self._command_cache is None:
+            return self._run_process(command, check, text)
+        if not is_read_only(command):
+            try:
+                return self._run_process(command, check, text)
+            finally:
+                self._command_cache.invalidate()
+        if not is_cacheable(command):
+            return self._run_process(command, check, text)
+        key = self._command_cache.build_key(command, text)
+        completed_process = self._command_cache.get(key)
+        if completed_process is None:
+            completed_process = self._run_process(command, False, text)
+            self._command_cache.put(key, completed_process)
+        if check and completed_process.returncode != 0:
+            print(completed_process.stderr)
+            completed_process.check_returncode()
+        return completed_process
+
+    def _run_process(
+            self,
+            command: List[str],
+            check: bool,
+            text: bool
+    ) -> subprocess.CompletedProcess:
+        if self._tracer is not None:
+            return self._run_traced(command, check, text)
         try:
             return subprocess.run(
                 ["git"] + command,
                 check=check,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                universal_newlines=True,
+                universal_newlines=text,
                 shell=False,
-                env=env,
+                env=self._build_env(),
                 cwd=self._directory
             )
         except subprocess.CalledProcessError as error:
             print(error.stderr)
             raise
 
+    def _run_traced(
+            self,
+            command: List[str],
+            check: bool,
+            text: bool
+    ) -> TracedCompletedProcess:
+        """
+        Runs command with binary pipes, so that lengths of outputs are known in bytes,
+        and decodes outputs like subprocess in text mode.
+        """
+        start_time_ns = int(time.time() * 1e9)
+        start = time.perf_counter()
+        start_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        binary_process = subprocess.run(
+            ["git"] + command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=False,
+            env=self._build_env(),
+            cwd=self._directory
+        )
+        wall_time = time.perf_counter() - start
+        end_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        completed_process = TracedCompletedProcess(
+            binary_process.args,
+            binary_process.returncode,
+            decode_output(binary_process.stdout) if text else binary_process.stdout,
+            decode_output(binary_process.stderr) if text else binary_process.stderr,
+            len(binary_process.stdout),
+            len(binary_process.stderr)
+        )
+        self._tracer.on_command(
+            CommandEvent(
+                command=command,
+                start_time_ns=start_time_ns,
+                wall_time=wall_time,
+                cpu_time=(end_usage.ru_utime - start_usage.ru_utime) + (end_usage.ru_stime - start_usage.ru_stime),
+                stdout_bytes=completed_process.stdout_bytes,
+                stderr_bytes=completed_process.stderr_bytes,
+                returncode=completed_process.returncode
+            )
+        )
+        if check and completed_process.returncode != 0:
+            print(completed_process.stderr)
+            completed_process.check_returncode()
+        return completed_process
+
+    def _parse(
+            self,
+            parser: str,
+            parse,
+            completed_process: subprocess.CompletedProcess,
+            *arguments
+    ):
+        """
+        Runs parse(completed_process.stdout, *arguments) and reports its time to tracer.
+        Parser name is only used for reporting.
+        """
+        output = completed_process.stdout
+        if self._tracer is None:
+            return parse(output, *arguments)
+        start_time_ns = int(time.time() * 1e9)
+        start = time.perf_counter()
+        records = parse(output, *arguments)
+        self._tracer.on_parse(
+            ParseEvent(
+                parser=parser,
+                start_time_ns=start_time_ns,
+                wall_time=time.perf_counter() - start,
+                input_size=getattr(completed_process, "stdout_bytes", len(output)),
+                record_count=len(records)
+            )
+        )
+        return records
+
+    def _popen(
+            self,
+            command: List[str],
+            text=True,
+            stdin=None,
+            stderr=subprocess.PIPE
+    ) -> subprocess.Popen:
+        """
+        Starts command without waiting for it, so that its output can be read as it is produced.
+
+        :param command: Command to run.
+        :type command: List[str]
+        :param text: True if pipes should be opened in text mode, False for binary pipes.
+        :type text: bool
+        :param stdin: Standard input of the process, e.g. subprocess.PIPE.
+        :param stderr: Standard error of the process.
+        :return: Started process with stdout pipe.
+        :rtype: subprocess.Popen
+        """
+        if self._tracer is not None:
+            return TracedPopen(
+                self._tracer,
+                command,
+                ["git"] + command,
+                text=text,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                shell=False,
+                env=self._build_env(),
+                cwd=self._directory
+            )
+        return subprocess.Popen(
+            ["git"] + command,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            universal_newlines=text,
+            shell=False,
+            env=self._build_env(),
+            cwd=self._directory
+        )
+
+    def _start_cat_file(
+            self,
+            command: List[str]
+    ) -> subprocess.Popen:
+        return self._popen(
+            command,
+            text=False,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def _build_env(
+            self
+    ):
+        return self._build_executable_env(self._executable_directory)
+
+    @staticmethod
+    def _build_executable_env(
+            executable_directory: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        Shared with AsyncGit.
+        """
+        path = None
+        env = None
+        if executable_directory != "":
+            path = executable_directory + ":PATH"
+        if path:
+            env = {"PATH": path}
+        return env
+
+    @staticmethod
+    def _check_log_format(
+            log_format: str
+    ) -> str:
+        if log_format not in (LOG_FORMAT_RAW, LOG_FORMAT_MACHINE):
+            raise ValueError(f"Unknown log format: {log_format}")
+        return log_format
+
+    @staticmethod
+    def _build_log_command(
+            revisions: List[str],
+            log_format: str,
+            options: Sequence[str] = (),
+            paths: Sequence[str] = ()
+    ) -> List[str]:
+        command = ["log"] + revisions
+        if log_format == LOG_FORMAT_MACHINE:
+            command += ["-z", "--format=" + GitMachineLogParser.FORMAT]
+        else:
+            command.append("--pretty=raw")
+        command += options
+        if paths:
+            command += ["--"] + list(paths)
+        return command
+
+    @staticmethod
+    def _build_revisions(
+            revision_range: Union[str, Sequence[str]]
+    ) -> List[str]:
+        if isinstance(revision_range, str):
+            return [revision_range] if revision_range else []
+        return list(revision_range)
+
+    @staticmethod
+    def _format_date(
+            date: Union[str, datetime.datetime]
+    ) -> str:
+        return date.isoformat() if isinstance(date, datetime.datetime) else date
+
+    def _build_query_options(
+            self,
+            max_count: Optional[int],
+            skip: Optional[int],
+            since: Optional[Union[str, datetime.datetime]],
+            until: Optional[Union[str, datetime.datetime]],
+            author: Optional[str],
+            grep: Optional[str],
+            first_parent: bool,
+            no_merges: bool
+    ) -> List[str]:
+        """
+        :return: Options of git log limiting commits, empty if there are no limits.
+        """
+        options = list()
+        if max_count is not None:
+            options.append(f"--max-count={int(max_count)}")
+        if skip:
+            options.append(f"--skip={int(skip)}")
+        if since is not None:
+            options.append("--since=" + self._format_date(since))
+        if until is not None:
+            options.append("--until=" + self._format_date(until))
+        if author is not None:
+            options.append("--author=" + author)
+        if grep is not None:
+            options.append("--grep=" + grep)
+        if first_parent:
+            options.append("--first-parent")
+        if no_merges:
+            options.append("--no-merges")
+        return options
+
     def get_commits(
             self,
-            revision_range=""
+            revision_range="",
+            log_format=None,
+            lazy=False,
+            processes=1,
+            changes=None,
+            binary=False,
+            max_count: Optional[int] = None,
+            skip: Optional[int] = None,
+            since: Optional[Union[str, datetime.datetime]] = None,
+            until: Optional[Union[str, datetime.datetime]] = None,
+            author: Optional[str] = None,
+            grep: Optional[str] = None,
+            first_parent=False,
+            no_merges=False,
+            paths: Optional[Sequence[str]] = None
     ) -> List[Commit]:
         """
         Extracts commits from git 'log --pretty=raw' command, creates Commit objects from them
         and appends them to a list.
 
-        :param revision_range: Any revision range that could be used with git log command.
-        :type revision_range: str
+        Query parameters (max_count, skip, since, until, author, grep, first_parent, no_merges and paths)
+        are passed to git log, so commits are filtered by git and only matching commits are parsed.
+        Commits matching query are always read with git log, also with commit cache or 'python' backend.
+
+        :param revision_range: Any revision range that could be used with git log command,
+            or list of revisions and ranges, e.g. ['feature', 'release', '^master'].
+        :type revision_range: Union[str, Sequence[str]]
+        :param log_format: Output format requested from git log, 'raw' or 'machine'. None means instance default.
+        :type log_format: str
+        :param lazy: True if LazyCommit objects should be returned, which decode their fields on first access.
+            Applies to commits parsed from git log output, i.e. not with commit cache or 'python' backend.
+        :type lazy: bool
+        :param processes: Number of processes parsing large 'raw' git log output in parallel.
+            Applies to commits parsed from git log output, like lazy.
+        :type processes: int
+        :param changes: 'numstat' or 'name-status' to get files changed by every commit in Commit.changes
+            from the same git log command, with rename detection. Commits are then always parsed
+            from 'raw' git log output, other options are ignored.
+        :type changes: str
+        :param binary: True if 'raw' git log output should be read as bytes, without re-encoding by git,
+            and only fields of commits decoded, with encoding from 'encoding' header of every commit.
+            Undecodable bytes are replaced. Uses less memory than decoding the whole output.
+            Applies to commits parsed from git log output, lazy, processes and log_format are ignored.
+        :type binary: bool
+        :param max_count: Maximum number of commits.
+        :type max_count: int
+        :param skip: Number of commits to skip before returning commits.
+        :type skip: int
+        :param since: Only commits newer than date, datetime or any date understood by git, e.g. '2 weeks ago'.
+        :type since: Union[str, datetime.datetime]
+        :param until: Only commits older than date, like since.
+        :type until: Union[str, datetime.datetime]
+        :param author: Regex (git) matching author name or email.
+        :type author: str
+        :param grep: Regex (git) matching commit message.
+        :type grep: str
+        :param first_parent: True if only first parents of merge commits should be followed.
+        :type first_parent: bool
+        :param no_merges: True if merge commits should be skipped.
+        :type no_merges: bool
+        :param paths: Pathspecs, only commits changing matching files are returned.
+        :type paths: Sequence[str]
         :return: List of Commit objects extracted.
         :rtype: List[Commit]
         """
-        if revision_range:
-            command = ["log", revision_range, "--pretty=raw"]
+        revisions = self._build_revisions(revision_range)
+        options = self._build_query_options(
+            max_count, skip, since, until, author, grep, first_parent, no_merges
+        )
+        paths = list(paths or ())
+        if changes is not None:
+            return self._get_commits_with_changes(revisions, changes, options, paths)
+        log_format = self._check_log_format(log_format or self._log_format)
+        if binary:
+            return self._get_commits_from_bytes(revisions, options, paths)
+        if options or paths or not isinstance(revision_range, str):
+            return self._get_commits(revisions, log_format, lazy, processes, options, paths)
+        if self._object_store is not None:
+            return list(self._iter_store_commits(revision_range))
+        if self._commit_cache_enabled and self._is_cacheable_range(revision_range):
+            return self._get_cached_commits(revision_range, log_format)
+        return self._get_commits(revisions, log_format, lazy, processes)
+
+    def _get_commits(
+            self,
+            revisions: List[str],
+            log_format: str,
+            lazy=False,
+            processes=1,
+            options: Sequence[str] = (),
+            paths: Sequence[str] = ()
+    ) -> List[Commit]:
+        command = self._build_log_command(revisions, log_format, options, paths)
+        completed_process = self._run(command, check=False)
+        if completed_process.returncode == 128:
+            raise NoCommitsError(completed_process.stderr)
+        if lazy and log_format == LOG_FORMAT_MACHINE:
+            return self._parse(
+                "GitMachineLogParser.extract_lazy_commits",
+                self._git_machine_log_parser.extract_lazy_commits,
+                completed_process
+            )
+        if lazy:
+            return self._parse(
+                "GitLogParser.extract_lazy_commits",
+                self._git_log_parser.extract_lazy_commits,
+                completed_process
+            )
+        if log_format == LOG_FORMAT_MACHINE:
+            return self._parse(
+                "GitMachineLogParser.extract_commits",
+                self._git_machine_log_parser.extract_commits,
+                completed_process
+            )
+        return self._parse(
+            "GitLogParser.extract_commits",
+            self._git_log_parser.extract_commits,
+            completed_process,
+            processes
+        )
+
+    def _parse_cursor(
+            self,
+            cursor: str
+    ) -> List[str]:
+        revisions = cursor.split(",")
+        if not all(CURSOR_REVISION_REGEX.match(x) for x in revisions):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return revisions
+
+    def _find_walk_frontier(
+            self,
+            revisions: List[str],
+            last_commit_id: str,
+            first_parent: bool,
+            paths: Sequence[str]
+    ) -> List[str]:
+        """
+        Repeats walk of git log over revisions with 'git rev-list --parents --sparse', which prints every
+        walked commit with parents followed by git, until last_commit_id. Only commits of the page are walked.
+
+        :return: Commits where walk continues, i.e. start commits and parents which were not walked yet,
+            and excluded revisions, so that git log of them gives commits after last_commit_id.
+        """
+        command = ["rev-list", "--parents", "--sparse"]
+        if first_parent:
+            command.append("--first-parent")
+        command += revisions
+        if paths:
+            command += ["--"] + list(paths)
+        walked = set()
+        parents = list()
+        process = self._popen(command)
+        try:
+            for line in process.stdout:
+                commit_id, *commit_parents = line.split()
+                walked.add(commit_id)
+                parents += commit_parents[:1] if first_parent else commit_parents
+                if commit_id == last_commit_id:
+                    break
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+        included = [x for x in revisions if not x.startswith("^")]
+        excluded = [x for x in revisions if x.startswith("^")]
+        frontier = [x for x in dict.fromkeys(included + parents) if x not in walked]
+        return frontier + excluded if frontier else []
+
+    def get_commits_page(
+            self,
+            revision_range: Union[str, Sequence[str]] = "",
+            cursor: Optional[str] = None,
+            page_size=50,
+            log_format=None,
+            since: Optional[Union[str, datetime.datetime]] = None,
+            until: Optional[Union[str, datetime.datetime]] = None,
+            author: Optional[str] = None,
+            grep: Optional[str] = None,
+            first_parent=False,
+            no_merges=False,
+            paths: Optional[Sequence[str]] = None
+    ) -> CommitPage:
+        """
+        Gets one page of commits for paging through history, e.g. in web UI. First page resolves
+        revisions to SHAs. Cursor keeps commits where walk of git stops after the page, with excluded
+        revisions, so following pages continue from there and show the same history even if branches move
+        in the meantime. Every page walks and parses only its own commits, so its cost does not depend
+        on the number of previous pages. Commits with dates older than dates of their parents
+        can be repeated on following pages.
+
+        :param revision_range: Revisions like in get_commits, used for the first page only.
+        :type revision_range: Union[str, Sequence[str]]
+        :param cursor: Cursor from previous page, None for the first page. Other parameters have to be
+            the same as for the first page.
+        :type cursor: str
+        :param page_size: Maximum number of commits in page.
+        :type page_size: int
+        :param log_format: Output format requested from git log, like in get_commits.
+        :type log_format: str
+        :param since: Like in get_commits.
+        :param until: Like in get_commits.
+        :param author: Like in get_commits.
+        :param grep: Like in get_commits.
+        :param first_parent: Like in get_commits.
+        :param no_merges: Like in get_commits.
+        :param paths: Like in get_commits.
+        :return: Page with commits and cursor of next page.
+        :rtype: CommitPage
+        """
+        if cursor is None:
+            revisions = self._build_revisions(revision_range) or ["HEAD"]
+            completed_process = self._run(["rev-parse", "--revs-only"] + revisions, check=False)
+            if completed_process.returncode != 0:
+                raise NoCommitsError(completed_process.stderr)
+            revisions = completed_process.stdout.split()
         else:
-            command = ["log", "--pretty=raw"]
+            revisions = self._parse_cursor(cursor)
+        commits = self.get_commits(
+            revisions,
+            log_format=log_format,
+            max_count=page_size + 1,
+            since=since,
+            until=until,
+            author=author,
+            grep=grep,
+            first_parent=first_parent,
+            no_merges=no_merges,
+            paths=paths
+        )
+        next_cursor = None
+        if len(commits) > page_size:
+            commits = commits[:page_size]
+            frontier = self._find_walk_frontier(revisions, commits[-1].commit_id, first_parent, paths or ())
+            next_cursor = ",".join(frontier) or None
+        return CommitPage(commits, next_cursor)
+
+    def get_commit_table(
+            self,
+            revision_range: Union[str, Sequence[str]] = "",
+            since: Optional[Union[str, datetime.datetime]] = None,
+            until: Optional[Union[str, datetime.datetime]] = None,
+            author: Optional[str] = None,
+            first_parent=False,
+            no_merges=False,
+            paths: Optional[Sequence[str]] = None
+    ) -> CommitTable:
+        """
+        Gets metadata of commits as columnar CommitTable for analytics over long histories.
+        Rows are built from 'raw' git log output directly, without creating Commit objects.
+        Requires 'numpy' package, which can be installed with 'atudomain-git[numpy]'.
+
+        :param revision_range: Revisions like in get_commits.
+        :type revision_range: Union[str, Sequence[str]]
+        :param since: Like in get_commits.
+        :param until: Like in get_commits.
+        :param author: Like in get_commits.
+        :param first_parent: Like in get_commits.
+        :param no_merges: Like in get_commits.
+        :param paths: Like in get_commits.
+        :return: Table with one row per commit, newest first like git log.
+        :rtype: CommitTable
+        """
+        options = self._build_query_options(None, None, since, until, author, None, first_parent, no_merges)
+        command = self._build_log_command(
+            self._build_revisions(revision_range),
+            LOG_FORMAT_RAW,
+            options,
+            paths or ()
+        )
         completed_process = self._run(command, check=False)
         if completed_process.returncode == 128:
             raise NoCommitsError(completed_process.stderr)
-        return self._git_log_parser.extract_commits(completed_process.stdout)
+        return self._parse("CommitTable.from_raw_log", CommitTable.from_raw_log, completed_process)
+
+    def _get_commits_from_bytes(
+            self,
+            revisions: List[str],
+            options: Sequence[str] = (),
+            paths: Sequence[str] = ()
+    ) -> List[Commit]:
+        command = self._build_log_command(revisions, LOG_FORMAT_RAW, ["--encoding=none"] + list(options), paths)
+        completed_process = self._run(command, check=False, text=False)
+        if completed_process.returncode == 128:
+            raise NoCommitsError(completed_process.stderr.decode(errors="replace"))
+        return self._parse(
+            "GitLogParser.extract_commits_from_bytes",
+            self._git_log_parser.extract_commits_from_bytes,
+            completed_process
+        )
+
+    def _get_commits_with_changes(
+            self,
+            revisions: List[str],
+            changes: str,
+            options: Sequence[str] = (),
+            paths: Sequence[str] = ()
+    ) -> List[Commit]:
+        if changes not in (CHANGES_NUMSTAT, CHANGES_NAME_STATUS):
+            raise ValueError(f"Unknown changes format: {changes}")
+        command = self._build_log_command(
+            revisions,
+            LOG_FORMAT_RAW,
+            ["-z", "-M", "--" + changes] + list(options),
+            paths
+        )
+        completed_process = self._run(command, check=False)
+        if completed_process.returncode == 128:
+            raise NoCommitsError(completed_process.stderr)
+        return self._parse(
+            "GitLogParser.extract_commits_with_changes",
+            self._git_log_parser.extract_commits_with_changes,
+            completed_process,
+            changes
+        )
+
+    def _rev_parse(
+            self,
+            revision: str
+    ) -> str:
+        completed_process = self._run(["rev-parse", "--verify", "--quiet", revision + "^{commit}"], check=False)
+        if completed_process.returncode != 0:
+            raise NoCommitsError(f"unknown revision: {revision}")
+        return completed_process.stdout.strip()
+
+    def _is_ancestor(
+            self,
+            ancestor: str,
+            descendant: str
+    ) -> bool:
+        return self._run(["merge-base", "--is-ancestor", ancestor, descendant], check=False).returncode == 0
+
+    def _get_commit_cache(
+            self
+    ) -> GitCommitCache:
+        if self._commit_cache is None:
+            self._commit_cache = GitCommitCache(
+                build_cache_path(self._get_git_directory(), self._commit_cache_directory)
+            )
+        return self._commit_cache
+
+    @staticmethod
+    def _is_cacheable_range(
+            revision_range: str
+    ) -> bool:
+        """
+        :return: True if revision_range is empty, one revision or 'A..B', which commit cache resolves
+            to tips. Options like '--all', symmetric differences, negations and suffixes like '^@' or '^!'
+            select commits differently, so they are read with git log.
+        """
+        if "..." in revision_range:
+            return False
+        for revision in revision_range.split("..", 1):
+            if not PLAIN_REVISION_REGEX.match(revision) or revision.endswith(("^@", "^!")) or "^-" in revision:
+                return False
+        return True
+
+    def _get_cached_commits(
+            self,
+            revision_range: str,
+            log_format: str
+    ) -> List[Commit]:
+        """
+        Resolves tips of revision_range and compares them with tips stored by previous call.
+        Unchanged tips return cached commits, a fast-forward of included tip parses only
+        commits between old and new tip, any other change parses whole range again.
+        New commits are put before cached ones only if they form a chain on top of old tip or all of them
+        are newer than every cached commit, otherwise git log could interleave them by committer date,
+        e.g. after merge of older side branch, and whole range is parsed again.
+        """
+        if ".." in revision_range:
+            exclude, include = revision_range.split("..", 1)
+            exclude_tip = self._rev_parse(exclude or "HEAD")
+        else:
+            include = revision_range
+            exclude_tip = ""
+        include_tip = self._rev_parse(include or "HEAD")
+        exclude_revisions = ["^" + exclude_tip] if exclude_tip else []
+        commit_cache = self._get_commit_cache()
+        cached = commit_cache.load_revision(revision_range)
+        if cached is not None:
+            cached_include_tip, cached_exclude_tip, cached_commit_ids = cached
+            if cached_exclude_tip == exclude_tip:
+                cached_commits = commit_cache.get_commits(cached_commit_ids)
+                if cached_commits is not None and cached_include_tip == include_tip:
+                    return cached_commits
+                if cached_commits is not None and self._is_ancestor(cached_include_tip, include_tip):
+                    new_commits = self._get_commits(
+                        [include_tip, "^" + cached_include_tip] + exclude_revisions,
+                        log_format
+                    )
+                    if not cached_commits or all(len(x.parents) == 1 for x in new_commits) or (
+                            min(x.committer_date for x in new_commits)
+                            > max(x.committer_date for x in cached_commits)
+                    ):
+                        commits = new_commits + cached_commits
+                        commit_cache.store_revision(
+                            revision_range,
+                            include_tip,
+                            exclude_tip,
+                            [x.commit_id for x in commits],
+                            new_commits
+                        )
+                        return commits
+        commits = self._get_commits([include_tip] + exclude_revisions, log_format)
+        commit_cache.store_revision(
+            revision_range,
+            include_tip,
+            exclude_tip,
+            [x.commit_id for x in commits],
+            commits
+        )
+        return commits
+
+    def iter_commits(
+            self,
+            revision_range="",
+            log_format=None
+    ) -> Iterator[Commit]:
+        """
+        Streams commits from git 'log --pretty=raw' command, yielding Commit objects
+        while git is still writing its output. Memory usage does not depend on history size,
+        so commit cache, which needs all commits of range, is not used.
+        If the iteration is stopped early, the git process is terminated.
+
+        :param revision_range: Any revision range that could be used with git log command,
+            or list of revisions and ranges, like in get_commits.
+        :type revision_range: Union[str, Sequence[str]]
+        :param log_format: Output format requested from git log, 'raw' or 'machine'. None means instance default.
+        :type log_format: str
+        :return: Iterator over Commit objects extracted.
+        :rtype: Iterator[Commit]
+        """
+        log_format = self._check_log_format(log_format or self._log_format)
+        if self._object_store is not None and isinstance(revision_range, str):
+            yield from self._iter_store_commits(revision_range)
+            return
+        process = self._popen(self._build_log_command(self._build_revisions(revision_range), log_format))
+        try:
+            if log_format == LOG_FORMAT_MACHINE:
+                yield from self._git_machine_log_parser.iter_commits(
+                    iter(lambda: process.stdout.read(65536), '')
+                )
+            else:
+                yield from self._git_log_parser.iter_commits(process.stdout)
+            stderr = process.stderr.read()
+            if process.wait() == 128:
+                raise NoCommitsError(stderr)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+
+    def _iter_store_commits(
+            self,
+            revision_range: str
+    ) -> Iterator[Commit]:
+        identities = dict()
+        try:
+            for commit_id, data in self._object_store.walk_commits(revision_range):
+                yield self._git_object_parser.extract_commit(
+                    commit_id=commit_id,
+                    commit_object=data.decode(errors="replace"),
+                    identities=identities
+                )
+                if len(identities) > STREAM_IDENTITIES_LIMIT:
+                    identities.clear()
+        except MissingObjectError as error:
+            raise NoCommitsError(f"unknown revision: {error}")
+
+    def _read_objects(
+            self,
+            object_ids: List[str]
+    ) -> List[Tuple[Optional[ObjectInfo], Optional[bytes]]]:
+        if self._object_store is None:
+            return self._git_cat_file.read_objects(object_ids)
+        objects = list()
+        for object_id in object_ids:
+            try:
+                objects.append(self._object_store.read_object(self._resolve_in_store(object_id)))
+            except MissingObjectError:
+                objects.append((None, None))
+        return objects
+
+    def _resolve_in_store(
+            self,
+            object_id: str
+    ) -> str:
+        if re.fullmatch(r"[0-9a-fA-F]{40}", object_id):
+            return object_id
+        return self._object_store.resolve(object_id)
+
+    def read_object(
+            self,
+            object_id: str
+    ) -> Tuple[ObjectInfo, bytes]:
+        """
+        Reads object through long-running 'git cat-file --batch' process.
+
+        :param object_id: Object SHA or any name accepted by git cat-file, e.g. 'HEAD:README.md'.
+            With 'python' backend only SHAs and commit revisions are supported.
+        :type object_id: str
+        :return: Object header and raw object contents.
+        :rtype: Tuple[ObjectInfo, bytes]
+        """
+        object_info, data = self._read_objects([object_id])[0]
+        if object_info is None:
+            raise MissingObjectError(object_id)
+        return object_info, data
+
+    def object_info(
+            self,
+            object_ids: Iterable[str]
+    ) -> List[Optional[ObjectInfo]]:
+        """
+        Reads object types and sizes through long-running 'git cat-file --batch-check' process.
+
+        :param object_ids: Object SHAs or any names accepted by git cat-file.
+            With 'python' backend only SHAs and commit revisions are supported.
+        :type object_ids: Iterable[str]
+        :return: ObjectInfo for every object, None if object does not exist.
+        :rtype: List[Optional[ObjectInfo]]
+        """
+        if self._object_store is None:
+            return self._git_cat_file.object_info(object_ids)
+        infos = list()
+        for object_id in object_ids:
+            try:
+                object_id = self._resolve_in_store(object_id)
+            except MissingObjectError:
+                infos.append(None)
+                continue
+            infos.extend(self._object_store.object_info([object_id]))
+        return infos
+
+    def get_commit(
+            self,
+            commit_id: str
+    ) -> Commit:
+        """
+        Reads single commit through long-running 'git cat-file --batch' process,
+        without starting new git process.
+
+        :param commit_id: Commit SHA or any revision, e.g. 'HEAD'.
+        :type commit_id: str
+        :return: Commit object.
+        :rtype: Commit
+        """
+        return self.get_commits_by_id([commit_id])[0]
+
+    def get_commits_by_id(
+            self,
+            commit_ids: Iterable[str]
+    ) -> List[Commit]:
+        """
+        Reads many commits at once, pipelining requests through long-running 'git cat-file --batch' process.
+
+        :param commit_ids: Commit SHAs or any revisions, e.g. 'HEAD'.
+        :type commit_ids: Iterable[str]
+        :return: Commit objects in order of commit_ids.
+        :rtype: List[Commit]
+        """
+        commit_ids = list(commit_ids)
+        commits = list()
+        identities = dict()
+        for commit_id, (object_info, data) in zip(commit_ids, self._read_objects(commit_ids)):
+            if object_info is None:
+                raise MissingObjectError(commit_id)
+            if object_info.object_type != "commit":
+                raise ValueError(f"{commit_id} is a {object_info.object_type}, not a commit")
+            commits.append(
+                self._git_object_parser.extract_commit(
+                    commit_id=object_info.object_id,
+                    commit_object=data.decode(errors="replace"),
+                    identities=identities
+                )
+            )
+        return commits
+
+    def _resolve(
+            self,
+            revision: str
+    ) -> str:
+        if self._object_store is not None:
+            try:
+                return self._object_store.resolve(revision)
+            except MissingObjectError:
+                raise NoCommitsError(f"unknown revision: {revision}")
+        return self._rev_parse(revision)
+
+    def _get_objects_directory(
+            self
+    ) -> str:
+        if self._objects_directory is None and self._object_store is not None:
+            self._objects_directory = os.path.join(os.path.abspath(self._object_store._git_directory), "objects")
+        if self._objects_directory is None:
+            objects_directory = self._run(["rev-parse", "--git-path", "objects"]).stdout.strip()
+            self._objects_directory = os.path.abspath(os.path.join(self._directory, objects_directory))
+        return self._objects_directory
+
+    def _get_commit_graph(
+            self
+    ) -> Optional[CommitGraphFile]:
+        objects_directory = self._get_objects_directory()
+        if self._commit_graph is not None and not self._commit_graph.is_current(objects_directory):
+            self._commit_graph.close()
+            self._commit_graph = None
+        if self._commit_graph is None and CommitGraphFile.find_paths(objects_directory):
+            self._commit_graph = CommitGraphFile(objects_directory)
+        return self._commit_graph
+
+    def _read_commit_node(
+            self,
+            commit_id: str,
+            commit_graph: CommitGraphFile,
+            nodes: Dict[str, Tuple[List[str], float, int]]
+    ) -> Tuple[List[str], float, int]:
+        """
+        Gets parents, generation number and commit timestamp of commit. Uses commit-graph when commit
+        is there, otherwise reads commit object and treats its generation number as infinite.
+        """
+        node = nodes.get(commit_id)
+        if node is not None:
+            return node
+        position = commit_graph.lookup(commit_id)
+        if position is not None:
+            _, parent_positions, generation, commit_time = commit_graph.commit_data(position)
+            parents = [commit_graph.commit_id(x) for x in parent_positions]
+            node = (parents, generation or GENERATION_INFINITY, commit_time)
+        else:
+            object_info, data = self._read_objects([commit_id])[0]
+            if object_info is None:
+                raise MissingObjectError(commit_id)
+            parents = list()
+            commit_time = 0
+            for line in data[:data.find(b"\n\n")].split(b"\n"):
+                if line.startswith(b"parent "):
+                    parents.append(line[len(b"parent "):].decode())
+                elif line.startswith(b"committer "):
+                    commit_time = int(line.rsplit(b" ", 2)[1])
+            node = (parents, GENERATION_INFINITY, commit_time)
+        nodes[commit_id] = node
+        return node
+
+    def is_ancestor(
+            self,
+            ancestor: str,
+            descendant: str
+    ) -> bool:
+        """
+        Checks if ancestor is reachable from descendant. Uses commit-graph and its generation numbers
+        to stop walking early, falls back to 'git merge-base --is-ancestor' without commit-graph.
+
+        :param ancestor: Commit SHA or revision.
+        :type ancestor: str
+        :param descendant: Commit SHA or revision.
+        :type descendant: str
+        :return: True if ancestor is an ancestor of descendant or the same commit.
+        :rtype: bool
+        """
+        commit_graph = self._get_commit_graph()
+        if commit_graph is None and self._object_store is None:
+            return self._is_ancestor(ancestor, descendant)
+        ancestor = self._resolve(ancestor)
+        descendant = self._resolve(descendant)
+        if commit_graph is None:
+            return not self._object_store._limit_range(ancestor, descendant)
+        nodes = dict()
+        ancestor_generation = self._read_commit_node(ancestor, commit_graph, nodes)[1]
+        pending = [descendant]
+        seen = {descendant}
+        while pending:
+            commit_id = pending.pop()
+            if commit_id == ancestor:
+                return True
+            parents, generation, _ = self._read_commit_node(commit_id, commit_graph, nodes)
+            if generation <= ancestor_generation != GENERATION_INFINITY:
+                continue
+            for parent in parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    pending.append(parent)
+        return False
+
+    def merge_base(
+            self,
+            first: str,
+            second: str
+    ) -> Optional[str]:
+        """
+        Finds best common ancestor of two commits like 'git merge-base'. Uses commit-graph
+        and falls back to 'git merge-base' without commit-graph.
+
+        :param first: Commit SHA or revision.
+        :type first: str
+        :param second: Commit SHA or revision.
+        :type second: str
+        :return: SHA of merge base or None if commits have no common history.
+        :rtype: Optional[str]
+        """
+        commit_graph = self._get_commit_graph()
+        if commit_graph is None:
+            completed_process = self._run(["merge-base", first, second], check=False)
+            if completed_process.returncode == 128:
+                raise NoCommitsError(completed_process.stderr)
+            return completed_process.stdout.strip() or None
+        first = self._resolve(first)
+        second = self._resolve(second)
+        if first == second:
+            return first
+        first_flag, second_flag, stale_flag = 1, 2, 4
+        nodes = dict()
+        flags = {first: first_flag, second: second_flag}
+        queue = list()
+        counter = 0
+        # Numbers of queue entries per commit and of entries of commits which are not stale,
+        # like queue_has_nonstale in git, so that the loop condition does not scan the queue.
+        queued: Dict[str, int] = dict()
+        nonstale_count = 0
+        for commit_id in (first, second):
+            _, generation, commit_time = self._read_commit_node(commit_id, commit_graph, nodes)
+            heapq.heappush(queue, (-generation, -commit_time, counter, commit_id))
+            counter += 1
+            queued[commit_id] = 1
+            nonstale_count += 1
+        bases = list()
+        while nonstale_count:
+            _, _, _, commit_id = heapq.heappop(queue)
+            queued[commit_id] -= 1
+            commit_flags = flags[commit_id]
+            if not commit_flags & stale_flag:
+                nonstale_count -= 1
+            if commit_flags & (first_flag | second_flag) == first_flag | second_flag:
+                if commit_id not in bases:
+                    bases.append(commit_id)
+                commit_flags |= stale_flag
+            parents, _, _ = self._read_commit_node(commit_id, commit_graph, nodes)
+            for parent in parents:
+                parent_flags = flags.get(parent, 0)
+                if parent_flags & commit_flags == commit_flags:
+                    continue
+                flags[parent] = parent_flags | commit_flags
+                if commit_flags & stale_flag and not parent_flags & stale_flag:
+                    nonstale_count -= queued.get(parent, 0)
+                _, generation, commit_time = self._read_commit_node(parent, commit_graph, nodes)
+                heapq.heappush(queue, (-generation, -commit_time, counter, parent))
+                counter += 1
+                queued[parent] = queued.get(parent, 0) + 1
+                if not flags[parent] & stale_flag:
+                    nonstale_count += 1
+        # Like git, bases reached from other bases are dropped and the newest of the remaining ones,
+        # by commit date and then by order in which they were found, is returned.
+        bases = [x for x in bases if not flags[x] & stale_flag]
+        bases = [
+            x for x in bases
+            if not any(y != x and self.is_ancestor(x, y) for y in bases)
+        ]
+        bases.sort(key=lambda x: -nodes[x][2])
+        return bases[0] if bases else None
+
+    def walk_commit_ids(
+            self,
+            revision="HEAD",
+            since=None,
+            min_generation=None
+    ) -> Iterator[str]:
+        """
+        Walks history from revision newest commit first, like 'git rev-list', without parsing commits.
+        Uses commit-graph and falls back to 'git rev-list' without commit-graph.
+
+        :param revision: Commit SHA or revision to start from.
+        :type revision: str
+        :param since: Skip commits older than this date and do not walk their parents.
+        :type since: datetime.datetime
+        :param min_generation: Skip commits with lower generation number and do not walk their parents.
+            Requires commit-graph. Commits missing from commit-graph have infinite generation number.
+        :type min_generation: int
+        :return: Iterator over commit SHAs.
+        :rtype: Iterator[str]
+        """
+        since_timestamp = since.timestamp() if isinstance(since, datetime.datetime) else since
+        commit_graph = self._get_commit_graph()
+        if commit_graph is None:
+            if min_generation is not None:
+                raise ValueError("Generation numbers require commit-graph")
+            command = ["rev-list", revision]
+            if since_timestamp is not None:
+                command.append(f"--since={int(since_timestamp)}")
+            completed_process = self._run(command, check=False)
+            if completed_process.returncode == 128:
+                raise NoCommitsError(completed_process.stderr)
+            yield from completed_process.stdout.split()
+            return
+        start = self._resolve(revision)
+        nodes = dict()
+        _, _, commit_time = self._read_commit_node(start, commit_graph, nodes)
+        queue = [(-commit_time, 0, start)]
+        seen = {start}
+        counter = 1
+        while queue:
+            _, _, commit_id = heapq.heappop(queue)
+            parents, generation, commit_time = self._read_commit_node(commit_id, commit_graph, nodes)
+            if since_timestamp is not None and commit_time < since_timestamp:
+                continue
+            if min_generation is not None and generation < min_generation:
+                continue
+            yield commit_id
+            for parent in parents:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                parent_commit_time = self._read_commit_node(parent, commit_graph, nodes)[2]
+                heapq.heappush(queue, (-parent_commit_time, counter, parent))
+                counter += 1
 
     def get_branches(
             self,
@@ -107,6 +1306,7 @@ class Git:
         """
         Extracts branch names from 'git branch --all' command and appends them to a list.
         Skips redundant information such as current branch pointer ('*') or relations ('->').
+        With 'python' backend branch names are read from ref files without running git.
 
         :param include: Regex (re module) to include branch names in list. None means all.
         :type include: str
@@ -115,15 +1315,109 @@ class Git:
         :return: List of branch names.
         :rtype: List[str]
         """
-        branches = self._git_branch_parser.extract_branches(
-            self._run(["branch", "--all"]).stdout
-        )
-        if include is not None:
-            branches = [x for x in branches if re.search(include, x)]
-        if exclude is not None:
-            branches = [x for x in branches if not re.search(exclude, x)]
+        if self._object_store is not None:
+            branches = list(self._get_ref_store().get_branches())
+        else:
+            branches = self._parse(
+                "GitBranchParser.extract_branches",
+                self._git_branch_parser.extract_branches,
+                self._run(["branch", "--all"])
+            )
+        return self._filter_branches(branches, include, exclude)
+
+    @classmethod
+    def _filter_branches(
+            cls,
+            branches: List[str],
+            include: Optional[str],
+            exclude: Optional[str]
+    ) -> List[str]:
+        """
+        Shared with AsyncGit.
+        """
+        include_search, exclude_search = cls._compile_branch_filters(include, exclude)
+        if include_search is not None:
+            branches = [x for x in branches if include_search(x)]
+        if exclude_search is not None:
+            branches = [x for x in branches if not exclude_search(x)]
         return branches
 
+    @staticmethod
+    def _compile_branch_filters(
+            include: Optional[str],
+            exclude: Optional[str]
+    ) -> Tuple[Optional[Callable], Optional[Callable]]:
+        return (
+            re.compile(include).search if include is not None else None,
+            re.compile(exclude).search if exclude is not None else None
+        )
+
+    def get_branch_details(
+            self,
+            include=None,
+            exclude=None,
+            ahead_behind=False
+    ) -> List[BranchDetails]:
+        """
+        Gets branches with tip commit metadata from a single 'git for-each-ref' command.
+
+        :param include: Regex (re module) to include branch names. None means all.
+        :type include: str
+        :param exclude: Regex (re module) to exclude branch names.
+        :type exclude: str
+        :param ahead_behind: True if numbers of commits ahead of and behind upstream should be counted.
+            Git walks history for every branch with upstream, so it is off by default.
+        :type ahead_behind: bool
+        :return: Details of branches with the same names and order as from get_branches.
+        :rtype: List[BranchDetails]
+        """
+        include_search, exclude_search = self._compile_branch_filters(include, exclude)
+        if ahead_behind:
+            branch_format = GitBranchDetailsParser.TRACKING_FORMAT
+        else:
+            branch_format = GitBranchDetailsParser.FORMAT
+        return self._parse(
+            "GitBranchDetailsParser.extract_branch_details",
+            self._git_branch_details_parser.extract_branch_details,
+            self._run(["for-each-ref", "--format=" + branch_format, "refs/heads", "refs/remotes"]),
+            include_search,
+            exclude_search
+        )
+
+    def _get_ref_store(
+            self
+    ) -> GitRefStore:
+        if self._ref_store is None:
+            self._ref_store = GitRefStore(self._get_git_directory())
+        return self._ref_store
+
+    def get_branch_refs(
+            self,
+            include=None,
+            exclude=None
+    ) -> Dict[str, str]:
+        """
+        Reads branches directly from 'packed-refs' and 'refs' directory, without running 'git branch'.
+        Refs are cached and read again only when files holding them change.
+
+        :param include: Regex (re module) to include branch names. None means all.
+        :type include: str
+        :param exclude: Regex (re module) to exclude branch names.
+        :type exclude: str
+        :return: Branch names, the same as from get_branches, mapped to SHAs of their tip commits.
+        :rtype: Dict[str, str]
+        """
+        branches = self._get_ref_store().get_branches()
+        if include is None and exclude is None:
+            return dict(branches)
+        include_search, exclude_search = self._compile_branch_filters(include, exclude)
+        return {
+            name: object_id
+            for name, object_id in branches.items()
+            if (include_search is None or include_search(name))
+            and (exclude_search is None or not exclude_search(name))
+        }
+
     def add_files(
             self,
             pathspec: str
@@ -148,6 +1442,75 @@ class Git:
         """
         self._run(["commit", "-m", message])
 
+    def _get_ident(
+            self,
+            role: str
+    ) -> Tuple[str, str, str]:
+        return parse_ident(self._run(["var", f"GIT_{role.upper()}_IDENT"]).stdout)
+
+    def _get_current_branch(
+            self
+    ) -> str:
+        completed_process = self._run(["symbolic-ref", "--quiet", "--short", "HEAD"], check=False)
+        if completed_process.returncode != 0:
+            raise ValueError("HEAD is detached, branch of new commits has to be given")
+        return completed_process.stdout.strip()
+
+    def create_commits(
+            self,
+            commits: Iterable[NewCommit],
+            force=False
+    ) -> List[str]:
+        """
+        Creates commits by streaming them into single 'git fast-import' process, without touching
+        index or working tree, so it is much faster than add_files and commit for many commits.
+        Branches are updated only when all commits were imported. Working tree of checked out branch
+        is not updated, use e.g. 'git reset --hard' afterwards if needed.
+
+        :param commits: Descriptions of commits, parents have to be described before their children.
+        :type commits: Iterable[NewCommit]
+        :param force: True if branches should be updated even if their old tips are lost.
+        :type force: bool
+        :return: SHAs of created commits in order of commits.
+        :rtype: List[str]
+        """
+        existing_refs = set(
+            self._run(["for-each-ref", "--format=%(refname)", "refs/heads/"]).stdout.splitlines()
+        )
+        stream = GitFastImportStream(
+            existing_refs=existing_refs,
+            get_ident=self._get_ident,
+            default_branch=self._get_current_branch
+        )
+        marks_descriptor, marks_path = tempfile.mkstemp(prefix="atudomain-git-marks-")
+        os.close(marks_descriptor)
+        command = ["fast-import", "--quiet", "--done", f"--export-marks={marks_path}"]
+        if force:
+            command.append("--force")
+        process = self._popen(command, text=False, stdin=subprocess.PIPE)
+        try:
+            try:
+                for commit in commits:
+                    process.stdin.write(stream.render(commit))
+            except BrokenPipeError:
+                pass
+            stdout, stderr = process.communicate(b"done\n")
+            if self._command_cache is not None:
+                self._command_cache.invalidate()
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args, stdout, stderr)
+            with open(marks_path, "r") as f:
+                marks = dict(x.split() for x in f.read().splitlines())
+            return [marks[f":{x + 1}"] for x in range(stream.count)]
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            for pipe in (process.stdin, process.stdout, process.stderr):
+                if not pipe.closed:
+                    pipe.close()
+            os.remove(marks_path)
+
     def pull(
             self
     ):
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+
+import array
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+
+from atudomain.git.objects import Commit
+from atudomain.git.repository import Git
+from atudomain.git.repository import NoCommitsError
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+FIELDS = ("subject", "body", "author", "email")
+FIELD_ALIASES = {
+    "subject": (0,),
+    "body": (1,),
+    "message": (0, 1),
+    "author": (2,),
+    "email": (3,),
+}
+
+# Letters and digits of any script, i.e. \w without underscore, which joins parts of compound words.
+TOKEN_REGEX = re.compile(r'[^\W_]+(?:[-_.@+/#:][^\W_]+)*')
+PART_REGEX = re.compile(r'[^\W_]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    tips TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY,
+    repository_id INTEGER NOT NULL,
+    commit_id TEXT NOT NULL,
+    committer_timestamp INTEGER NOT NULL,
+    UNIQUE (repository_id, commit_id)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    field INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    segment INTEGER NOT NULL,
+    documents BLOB NOT NULL,
+    PRIMARY KEY (field, term, segment)
+) WITHOUT ROWID;
+"""
+
+
+def _find_tokens(
+        text: str
+) -> List[str]:
+    return TOKEN_REGEX.findall(unicodedata.normalize('NFC', text).lower())
+
+
+def tokenize(
+        text: str
+) -> Set[str]:
+    """
+    Splits text into lowercase terms of letters and digits of any script, in NFC normalization form.
+    Compound words, such as 'CVE-2021-3156', 'PROJ_12' or e-mail addresses, are indexed as a whole
+    and as their alphanumeric parts.
+
+    :rtype: Set[str]
+    """
+    terms = set()
+    for token in _find_tokens(text):
+        terms.add(token)
+        if not token.isalnum():
+            terms.update(PART_REGEX.findall(token))
+    return terms
+
+
+def _pack(
+        documents: array.array
+) -> bytes:
+    if sys.byteorder == "big":
+        documents = array.array(documents.typecode, documents)
+        documents.byteswap()
+    return documents.tobytes()
+
+
+def _unpack(
+        data: bytes
+) -> array.array:
+    documents = array.array('I')
+    documents.frombytes(data)
+    if sys.byteorder == "big":
+        documents.byteswap()
+    return documents
+
+
+class CommitSearchIndex:
+    """
+    Persistent inverted index of commit subjects, bodies, author names and e-mails of many repositories,
+    stored in SQLite database. Every indexed commit gets integer document id and every term of every field
+    keeps postings list, i.e. array of document ids. Each batch of added commits writes new postings
+    segments, optimize merges them.
+
+    Queries are whitespace separated terms, all of which have to match. Term can be limited to field
+    with 'subject:', 'body:', 'message:', 'author:' or 'email:' prefix, end with '*' to match
+    all terms with given prefix, or start with '-' to exclude matching commits. Terms joined with 'OR'
+    match if any of them matches, 'OR' binds stronger than implicit 'AND',
+    e.g. 'author:anna fix* -typo CVE-2021-3156 OR PROJ-12'.
+
+    :param path: Path to index database, created if needed.
+    :type path: str
+    """
+    def __init__(
+            self,
+            path: str
+    ):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+
+    def close(
+            self
+    ) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_repository_id(
+            self,
+            repository: str
+    ) -> int:
+        self._connection.execute(
+            "INSERT OR IGNORE INTO repositories (name, tips) VALUES (?, '')",
+            (repository,)
+        )
+        return self._connection.execute(
+            "SELECT id FROM repositories WHERE name = ?",
+            (repository,)
+        ).fetchone()[0]
+
+    def add_commits(
+            self,
+            commits: Iterable[Commit],
+            repository=""
+    ) -> int:
+        """
+        Indexes commits, skipping commits already indexed for repository.
+
+        :param commits: Commits, e.g. from Git.get_commits or GitLogParser.
+        :type commits: Iterable[Commit]
+        :param repository: Name of repository which commits belong to.
+        :type repository: str
+        :return: Number of newly indexed commits.
+        :rtype: int
+        """
+        postings: Dict[Tuple[int, str], array.array] = dict()
+        count = 0
+        segment = None
+        with self._connection:
+            repository_id = self._get_repository_id(repository)
+            for commit in commits:
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO commits (repository_id, commit_id, committer_timestamp) VALUES (?, ?, ?)",
+                    (repository_id, commit.commit_id, int(commit.committer_date.timestamp()))
+                )
+                if cursor.rowcount != 1:
+                    continue
+                document = cursor.lastrowid
+                if segment is None:
+                    segment = document
+                count += 1
+                texts = (commit.message_subject, commit.message_body, commit.author, commit.author_email)
+                for field, text in enumerate(texts):
+                    for term in tokenize(text):
+                        documents = postings.get((field, term))
+                        if documents is None:
+                            documents = postings[(field, term)] = array.array('I')
+                        documents.append(document)
+            self._connection.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                ((field, term, segment, _pack(documents)) for (field, term), documents in postings.items())
+            )
+        return count
+
+    def update(
+            self,
+            git: Git,
+            repository: Optional[str] = None
+    ) -> int:
+        """
+        Indexes commits of all branches of repository which were added since previous update.
+        Tips of branches are remembered, so only new history is read from git log.
+
+        :param git: Repository to index.
+        :type git: Git
+        :param repository: Name of repository in index, absolute path of git directory by default.
+        :type repository: str
+        :return: Number of newly indexed commits.
+        :rtype: int
+        """
+        if repository is None:
+            repository = git.git_directory
+        row = self._connection.execute("SELECT tips FROM repositories WHERE name = ?", (repository,)).fetchone()
+        old_tips = row[0].split() if row is not None else []
+        tips = sorted(set(git.get_branch_refs().values()))
+        new_tips = [x for x in tips if x not in old_tips]
+        count = 0
+        if new_tips:
+            try:
+                commits = git.get_commits(new_tips + ['^' + x for x in old_tips])
+            except NoCommitsError:
+                commits = git.get_commits(new_tips)
+            count = self.add_commits(commits, repository)
+        with self._connection:
+            self._get_repository_id(repository)
+            self._connection.execute("UPDATE repositories SET tips = ? WHERE name = ?", (' '.join(tips), repository))
+        return count
+
+    def optimize(
+            self
+    ) -> None:
+        """
+        Merges postings segments of every term into one, so that queries read one row per term.
+        """
+        with self._connection:
+            rows = self._connection.execute(
+                "SELECT field, term, MIN(segment) FROM postings GROUP BY field, term HAVING COUNT(*) > 1"
+            ).fetchall()
+            for field, term, segment in rows:
+                documents = array.array('I')
+                for data, in self._connection.execute(
+                        "SELECT documents FROM postings WHERE field = ? AND term = ? ORDER BY segment",
+                        (field, term)
+                ):
+                    documents.extend(_unpack(data))
+                self._connection.execute("DELETE FROM postings WHERE field = ? AND term = ?", (field, term))
+                self._connection.execute(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                    (field, term, segment, _pack(documents))
+                )
+        self._connection.execute("VACUUM")
+
+    def _lookup(
+            self,
+            fields: Sequence[int],
+            term: str,
+            prefix: bool
+    ) -> Set[int]:
+        if prefix:
+            condition = "term >= ? AND term < ?"
+            arguments = (term, term[:-1] + chr(ord(term[-1]) + 1))
+        else:
+            condition = "term = ?"
+            arguments = (term,)
+        documents = set()
+        for field in fields:
+            for data, in self._connection.execute(
+                    f"SELECT documents FROM postings WHERE field = ? AND {condition}",
+                    (field,) + arguments
+            ):
+                documents.update(_unpack(data))
+        return documents
+
+    def _match_term(
+            self,
+            word: str
+    ) -> Set[int]:
+        """
+        Splits word into terms like indexed text, so punctuation around words is ignored,
+        e.g. '(CVE-2021-3156),' matches 'cve-2021-3156'. Commits have to match all terms,
+        '*' applies to the last one.
+        """
+        fields = range(len(FIELDS))
+        name, separator, term = word.partition(':')
+        if separator and name in FIELD_ALIASES:
+            fields = FIELD_ALIASES[name]
+        else:
+            term = word
+        prefix = term.endswith('*')
+        tokens = _find_tokens(term.rstrip('*'))
+        if not tokens:
+            if prefix:
+                return set(x for x, in self._connection.execute("SELECT id FROM commits"))
+            return set()
+        documents = None
+        for index, token in enumerate(tokens):
+            token_documents = self._lookup(fields, token, prefix and index == len(tokens) - 1)
+            documents = token_documents if documents is None else documents & token_documents
+        return documents
+
+    def _match(
+            self,
+            query: str
+    ) -> Set[int]:
+        included = None
+        excluded = set()
+        words = query.split()
+        index = 0
+        while index < len(words):
+            negated = words[index].startswith('-')
+            documents = self._match_term(words[index].lstrip('-'))
+            index += 1
+            while index + 1 < len(words) and words[index] == 'OR':
+                documents |= self._match_term(words[index + 1])
+                index += 2
+            if negated:
+                excluded |= documents
+            elif included is None:
+                included = documents
+            else:
+                included &= documents
+        if included is None:
+            included = set(x for x, in self._connection.execute("SELECT id FROM commits")) if excluded else set()
+        return included - excluded
+
+    def search(
+            self,
+            query: str,
+            repositories: Optional[Sequence[str]] = None,
+            limit: Optional[int] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        :param query: Query, see class description.
+        :type query: str
+        :param repositories: Names of repositories to search, None means all.
+        :type repositories: Sequence[str]
+        :param limit: Maximum number of results.
+        :type limit: int
+        :return: Repository names and SHAs of matching commits, newest committer date first,
+            in order of indexing for equal dates.
+        :rtype: List[Tuple[str, str]]
+        """
+        documents = sorted(self._match(query))
+        condition = ""
+        repository_names = list()
+        if repositories is not None:
+            repository_names = list(repositories)
+            if not repository_names:
+                return []
+            condition = f" AND r.name IN ({','.join('?' * len(repository_names))})"
+        chunk_size = max(500 - len(repository_names), 1)
+        results = list()
+        for start in range(0, len(documents), chunk_size):
+            chunk = documents[start:start + chunk_size]
+            results += self._connection.execute(
+                "SELECT r.name, c.commit_id, c.committer_timestamp, c.id FROM commits c "
+                "JOIN repositories r ON r.id = c.repository_id "
+                f"WHERE c.id IN ({','.join('?' * len(chunk))}){condition}",
+                chunk + repository_names
+            ).fetchall()
+        results.sort(key=lambda x: (-x[2], x[3]))
+        return [(name, commit_id) for name, commit_id, _, _ in results[:limit]]
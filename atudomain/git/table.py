@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+
+from atudomain.git.objects import Commit
+from atudomain.git.parsers import GitLogParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+# 1970-01-01 was Thursday, weeks start on Monday.
+WEEK_ORIGIN = -3 * DAY
+
+DATE_AUTHOR = "author"
+DATE_COMMITTER = "committer"
+
+
+def _require_numpy() -> None:
+    if numpy is None:
+        raise ImportError("CommitTable requires 'numpy' package, which can be installed with 'atudomain-git[numpy]'")
+
+
+def _parse_person_line(
+        person_line: str
+) -> Tuple[str, str, int, int]:
+    """
+    :return: Name, email, timestamp and offset of timezone in minutes.
+    """
+    name_email, _, date_source = person_line.rpartition('> ')
+    name, _, email = name_email.partition(' <')
+    timestamp, _, timezone = date_source.partition(' ')
+    offset = 0
+    if len(timezone) == 5 and timezone[1:].isdigit():
+        offset = int(timezone[1:3]) * 60 + int(timezone[3:5])
+        if timezone[0] == '-':
+            offset = -offset
+    return name, email, int(timestamp), offset
+
+
+class _CommitTableBuilder:
+    """
+    Collects columns of commits, as rows of 'git log --pretty=raw' parsed by GitLogParser or as Commit objects.
+    """
+    def __init__(self):
+        self.commit_ids: List[str] = list()
+        self.parents: List[Tuple[str, ...]] = list()
+        self.author_timestamps: List[int] = list()
+        self.author_offsets: List[int] = list()
+        self.author_ids: List[int] = list()
+        self.committer_timestamps: List[int] = list()
+        self.committer_offsets: List[int] = list()
+        self.committer_ids: List[int] = list()
+        self.identity_ids: Dict[Tuple[str, str], int] = dict()
+
+    def _identity_id(
+            self,
+            name: str,
+            email: str
+    ) -> int:
+        identity = (name, email)
+        identity_id = self.identity_ids.get(identity)
+        if identity_id is None:
+            identity_id = self.identity_ids[identity] = len(self.identity_ids)
+        return identity_id
+
+    def add_row(
+            self,
+            commit_id: str,
+            parents: Tuple[str, ...],
+            author: str,
+            author_email: str,
+            author_timestamp: int,
+            author_offset: int,
+            committer: str,
+            committer_email: str,
+            committer_timestamp: int,
+            committer_offset: int
+    ) -> None:
+        self.commit_ids.append(commit_id)
+        self.parents.append(parents)
+        self.author_timestamps.append(author_timestamp)
+        self.author_offsets.append(author_offset)
+        self.author_ids.append(self._identity_id(author, author_email))
+        self.committer_timestamps.append(committer_timestamp)
+        self.committer_offsets.append(committer_offset)
+        self.committer_ids.append(self._identity_id(committer, committer_email))
+
+    def add_record(
+            self,
+            commit_id: str,
+            tree: str,
+            parents: List[str],
+            author_line: str,
+            committer_line: str,
+            message_lines: List[str],
+            identities: dict
+    ) -> None:
+        """
+        Callback of GitLogParser._parse_lines, messages are not used.
+        """
+        self.add_row(
+            commit_id,
+            tuple(parents),
+            *_parse_person_line(author_line),
+            *_parse_person_line(committer_line)
+        )
+
+    def add_commit(
+            self,
+            commit: Commit
+    ) -> None:
+        author_offset = commit.author_date.utcoffset()
+        committer_offset = commit.committer_date.utcoffset()
+        self.add_row(
+            commit.commit_id,
+            tuple(commit.parents),
+            commit.author,
+            commit.author_email,
+            int(commit.author_date.timestamp()),
+            int(author_offset.total_seconds()) // 60 if author_offset else 0,
+            commit.committer,
+            commit.committer_email,
+            int(commit.committer_date.timestamp()),
+            int(committer_offset.total_seconds()) // 60 if committer_offset else 0
+        )
+
+    def build(self) -> "CommitTable":
+        positions = {x: i for i, x in enumerate(self.commit_ids)}
+        parent_offsets = [0]
+        parents = list()
+        for commit_parents in self.parents:
+            parents += [positions.get(x, -1) for x in commit_parents]
+            parent_offsets.append(len(parents))
+        hash_size = max((len(x) for x in self.commit_ids), default=40)
+        return CommitTable(
+            commit_ids=numpy.array(self.commit_ids, dtype=f"S{hash_size}"),
+            author_timestamps=numpy.array(self.author_timestamps, dtype=numpy.int64),
+            author_offsets=numpy.array(self.author_offsets, dtype=numpy.int16),
+            author_ids=numpy.array(self.author_ids, dtype=numpy.int32),
+            committer_timestamps=numpy.array(self.committer_timestamps, dtype=numpy.int64),
+            committer_offsets=numpy.array(self.committer_offsets, dtype=numpy.int16),
+            committer_ids=numpy.array(self.committer_ids, dtype=numpy.int32),
+            parent_offsets=numpy.array(parent_offsets, dtype=numpy.int64),
+            parents=numpy.array(parents, dtype=numpy.int32),
+            identities=list(self.identity_ids)
+        )
+
+
+class CommitTable:
+    """
+    Columnar table of commit metadata in NumPy arrays, one row per commit, for vectorized analytics over
+    many commits. Dates are int64 Unix timestamps with timezone offsets in minutes, authors and committers
+    are int32 ids into identities. Parents are kept in CSR layout: parents of row i are
+    parents[parent_offsets[i]:parent_offsets[i + 1]], as row numbers, -1 for parents not in table.
+    Messages are not kept. Requires 'numpy' package, which can be installed with 'atudomain-git[numpy]'.
+
+    Tables are usually built with from_raw_log, from_commits or Git.get_commit_table.
+    """
+    def __init__(
+            self,
+            commit_ids,
+            author_timestamps,
+            author_offsets,
+            author_ids,
+            committer_timestamps,
+            committer_offsets,
+            committer_ids,
+            parent_offsets,
+            parents,
+            identities: List[Tuple[str, str]]
+    ):
+        _require_numpy()
+        self._commit_ids = commit_ids
+        self._author_timestamps = author_timestamps
+        self._author_offsets = author_offsets
+        self._author_ids = author_ids
+        self._committer_timestamps = committer_timestamps
+        self._committer_offsets = committer_offsets
+        self._committer_ids = committer_ids
+        self._parent_offsets = parent_offsets
+        self._parents = parents
+        self._identities = identities
+
+    @classmethod
+    def from_raw_log(
+            cls,
+            raw_log_string: str
+    ) -> "CommitTable":
+        """
+        Builds table from 'git log --pretty=raw' output without creating Commit objects.
+
+        :param raw_log_string: Output of 'git log --pretty=raw'.
+        :type raw_log_string: str
+        :rtype: CommitTable
+        """
+        _require_numpy()
+        builder = _CommitTableBuilder()
+        for _ in GitLogParser()._parse_lines(raw_log_string.split('\n'), builder.add_record):
+            pass
+        return builder.build()
+
+    @classmethod
+    def from_commits(
+            cls,
+            commits: Iterable[Commit]
+    ) -> "CommitTable":
+        """
+        :param commits: Commits, e.g. from Git.get_commits.
+        :type commits: Iterable[Commit]
+        :rtype: CommitTable
+        """
+        _require_numpy()
+        builder = _CommitTableBuilder()
+        for commit in commits:
+            builder.add_commit(commit)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self._commit_ids)
+
+    @property
+    def commit_ids(self):
+        """
+        :return: SHAs as ASCII bytes.
+        :rtype: numpy.ndarray
+        """
+        return self._commit_ids
+
+    @property
+    def author_timestamps(self):
+        """
+        :rtype: numpy.ndarray
+        """
+        return self._author_timestamps
+
+    @property
+    def author_offsets(self):
+        """
+        :return: Offsets of author timezones from UTC in minutes.
+        :rtype: numpy.ndarray
+        """
+        return self._author_offsets
+
+    @property
+    def author_ids(self):
+        """
+        :return: Positions of authors in identities.
+        :rtype: numpy.ndarray
+        """
+        return self._author_ids
+
+    @property
+    def committer_timestamps(self):
+        """
+        :rtype: numpy.ndarray
+        """
+        return self._committer_timestamps
+
+    @property
+    def committer_offsets(self):
+        """
+        :return: Offsets of committer timezones from UTC in minutes.
+        :rtype: numpy.ndarray
+        """
+        return self._committer_offsets
+
+    @property
+    def committer_ids(self):
+        """
+        :return: Positions of committers in identities.
+        :rtype: numpy.ndarray
+        """
+        return self._committer_ids
+
+    @property
+    def parent_offsets(self):
+        """
+        :rtype: numpy.ndarray
+        """
+        return self._parent_offsets
+
+    @property
+    def parents(self):
+        """
+        :rtype: numpy.ndarray
+        """
+        return self._parents
+
+    @property
+    def identities(self) -> List[Tuple[str, str]]:
+        """
+        :return: Names and emails of authors and committers.
+        :rtype: List[Tuple[str, str]]
+        """
+        return self._identities
+
+    @property
+    def parent_counts(self):
+        """
+        :rtype: numpy.ndarray
+        """
+        return numpy.diff(self._parent_offsets)
+
+    @property
+    def is_merge(self):
+        """
+        :return: Boolean array, True for commits with more than one parent.
+        :rtype: numpy.ndarray
+        """
+        return self.parent_counts > 1
+
+    def _select_date(
+            self,
+            date: str,
+            local: bool
+    ):
+        if date == DATE_AUTHOR:
+            timestamps, offsets = self._author_timestamps, self._author_offsets
+        elif date == DATE_COMMITTER:
+            timestamps, offsets = self._committer_timestamps, self._committer_offsets
+        else:
+            raise ValueError(f"Unknown date: {date}")
+        if local:
+            return timestamps + offsets.astype(numpy.int64) * 60
+        return timestamps
+
+    def _select_identities(
+            self,
+            by: str
+    ):
+        if by == DATE_AUTHOR:
+            return self._author_ids
+        if by == DATE_COMMITTER:
+            return self._committer_ids
+        raise ValueError(f"Unknown identity: {by}")
+
+    def merge_ratio(self) -> float:
+        """
+        :return: Fraction of commits which are merges, 0.0 for empty table.
+        :rtype: float
+        """
+        return float(self.is_merge.mean()) if len(self) else 0.0
+
+    def count_by_identity(
+            self,
+            by=DATE_AUTHOR
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        :param by: 'author' or 'committer'.
+        :type by: str
+        :return: Numbers of commits per identity, identities without commits are skipped.
+        :rtype: Dict[Tuple[str, str], int]
+        """
+        counts = numpy.bincount(self._select_identities(by), minlength=len(self._identities))
+        return {self._identities[x]: int(counts[x]) for x in numpy.flatnonzero(counts)}
+
+    def hour_histogram(
+            self,
+            date=DATE_AUTHOR,
+            local=True
+    ):
+        """
+        :param date: 'author' or 'committer'.
+        :type date: str
+        :param local: True if hours should be in timezone of author or committer, False for UTC.
+        :type local: bool
+        :return: Numbers of commits per hour of day, 24 elements.
+        :rtype: numpy.ndarray
+        """
+        return numpy.bincount(self._select_date(date, local) // 3600 % 24, minlength=24)
+
+    def weekday_histogram(
+            self,
+            date=DATE_AUTHOR,
+            local=True
+    ):
+        """
+        :return: Numbers of commits per day of week, Monday first, 7 elements.
+        :rtype: numpy.ndarray
+        """
+        return numpy.bincount((self._select_date(date, local) - WEEK_ORIGIN) // DAY % 7, minlength=7)
+
+    def resample(
+            self,
+            period=WEEK,
+            date=DATE_AUTHOR,
+            by: Optional[str] = None,
+            local=False
+    ):
+        """
+        Counts commits per period of time, e.g. commits per author per week.
+
+        :param period: Length of period in seconds, periods start at Monday 00:00 UTC for multiples of week.
+        :type period: int
+        :param date: 'author' or 'committer'.
+        :type date: str
+        :param by: None for total counts, 'author' or 'committer' for counts per identity.
+        :type by: Optional[str]
+        :param local: True if periods should be in timezone of author or committer.
+        :type local: bool
+        :return: Start timestamps of consecutive periods from the oldest to the newest commit and counts,
+            array of counts per period or, with by, 2D array with row of counts per identity.
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if not len(self):
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros((len(self._identities), 0) if by else 0)
+        buckets = (self._select_date(date, local) - WEEK_ORIGIN) // period
+        first = buckets.min()
+        bucket_count = int(buckets.max() - first + 1)
+        starts = (numpy.arange(bucket_count, dtype=numpy.int64) + first) * period + WEEK_ORIGIN
+        buckets = buckets - first
+        if by is None:
+            return starts, numpy.bincount(buckets, minlength=bucket_count)
+        identities = self._select_identities(by).astype(numpy.int64)
+        counts = numpy.bincount(
+            identities * bucket_count + buckets,
+            minlength=len(self._identities) * bucket_count
+        )
+        return starts, counts.reshape(len(self._identities), bucket_count)
+
+    def select(
+            self,
+            mask
+    ) -> "CommitTable":
+        """
+        :param mask: Boolean array of rows to keep, e.g. table.author_timestamps >= since.
+        :type mask: numpy.ndarray
+        :return: Table with selected rows. Parents outside selection become -1, identities are kept.
+        :rtype: CommitTable
+        """
+        mask = numpy.asarray(mask, dtype=bool)
+        positions = numpy.cumsum(mask) - 1
+        parent_counts = self.parent_counts
+        edge_mask = numpy.repeat(mask, parent_counts)
+        parents = self._parents[edge_mask]
+        known = parents >= 0
+        known[known] = mask[parents[known]]
+        parents = numpy.where(known, positions[numpy.where(known, parents, 0)], -1).astype(numpy.int32)
+        parent_offsets = numpy.concatenate(([0], numpy.cumsum(parent_counts[mask]))).astype(numpy.int64)
+        return CommitTable(
+            commit_ids=self._commit_ids[mask],
+            author_timestamps=self._author_timestamps[mask],
+            author_offsets=self._author_offsets[mask],
+            author_ids=self._author_ids[mask],
+            committer_timestamps=self._committer_timestamps[mask],
+            committer_offsets=self._committer_offsets[mask],
+            committer_ids=self._committer_ids[mask],
+            parent_offsets=parent_offsets,
+            parents=parents,
+            identities=self._identities
+        )
+
+    def to_structured_array(self):
+        """
+        :return: NumPy structured array with fields commit_id, author_timestamp, author_offset, author_id,
+            committer_timestamp, committer_offset, committer_id, parent_count and is_merge.
+        :rtype: numpy.ndarray
+        """
+        columns = [
+            ("commit_id", self._commit_ids),
+            ("author_timestamp", self._author_timestamps),
+            ("author_offset", self._author_offsets),
+            ("author_id", self._author_ids),
+            ("committer_timestamp", self._committer_timestamps),
+            ("committer_offset", self._committer_offsets),
+            ("committer_id", self._committer_ids),
+            ("parent_count", self.parent_counts.astype(numpy.int32)),
+            ("is_merge", self.is_merge),
+        ]
+        array = numpy.empty(len(self), dtype=[(name, values.dtype) for name, values in columns])
+        for name, values in columns:
+            array[name] = values
+        return array
+
+    def to_pandas(self):
+        """
+        Requires 'pandas' package. Authors and committers are categorical columns of 'Name <email>'.
+
+        :return: DataFrame with one row per commit and UTC datetime columns.
+        :rtype: pandas.DataFrame
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("CommitTable.to_pandas requires 'pandas' package") from None
+        categories = [f"{name} <{email}>" for name, email in self._identities]
+        return pandas.DataFrame({
+            "commit_id": self._commit_ids.astype(str),
+            "author": pandas.Categorical.from_codes(self._author_ids, categories),
+            "author_date": pandas.to_datetime(self._author_timestamps, unit="s", utc=True),
+            "author_offset": self._author_offsets,
+            "committer": pandas.Categorical.from_codes(self._committer_ids, categories),
+            "committer_date": pandas.to_datetime(self._committer_timestamps, unit="s", utc=True),
+            "committer_offset": self._committer_offsets,
+            "parent_count": self.parent_counts,
+            "is_merge": self.is_merge,
+        })
+
+    def to_arrow(self):
+        """
+        Requires 'pyarrow' package. Authors and committers are dictionary encoded columns of 'Name <email>'.
+
+        :return: Arrow table with one row per commit.
+        :rtype: pyarrow.Table
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("CommitTable.to_arrow requires 'pyarrow' package") from None
+        categories = pyarrow.array([f"{name} <{email}>" for name, email in self._identities], pyarrow.string())
+        return pyarrow.table({
+            "commit_id": pyarrow.array(self._commit_ids.astype(str)),
+            "author": pyarrow.DictionaryArray.from_arrays(self._author_ids, categories),
+            "author_timestamp": pyarrow.array(self._author_timestamps, pyarrow.timestamp("s", tz="UTC")),
+            "author_offset": self._author_offsets,
+            "committer": pyarrow.DictionaryArray.from_arrays(self._committer_ids, categories),
+            "committer_timestamp": pyarrow.array(self._committer_timestamps, pyarrow.timestamp("s", tz="UTC")),
+            "committer_offset": self._committer_offsets,
+            "parent_count": self.parent_counts,
+            "is_merge": self.is_merge,
+        })
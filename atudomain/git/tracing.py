@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+
+import bisect
+import io
+import locale
+import resource
+import subprocess
+import threading
+import time
+
+from typing import Dict, List, Optional, Tuple
+
+
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class CommandEvent:
+    """
+    Describes single git command run by Git. Times are in seconds, start_time_ns is wall clock time
+    in nanoseconds since epoch. CPU time is user and system time of finished child processes measured
+    around the command, so it also includes other children finished in the meantime by other threads.
+    """
+    __slots__ = (
+        'command',
+        'start_time_ns',
+        'wall_time',
+        'cpu_time',
+        'stdout_bytes',
+        'stderr_bytes',
+        'returncode',
+    )
+
+    def __init__(
+            self,
+            command: List[str],
+            start_time_ns: int,
+            wall_time: float,
+            cpu_time: float,
+            stdout_bytes: int,
+            stderr_bytes: int,
+            returncode: int
+    ):
+        self.command = command
+        self.start_time_ns = start_time_ns
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+        self.returncode = returncode
+
+    @property
+    def subcommand(self) -> str:
+        """
+        :return: Git subcommand, e.g. 'log'.
+        :rtype: str
+        """
+        return self.command[0] if self.command else ''
+
+
+class ParseEvent:
+    """
+    Describes parsing of git command output, e.g. by GitLogParser.extract_commits.
+    Input size is length of output in bytes, as read from git.
+    """
+    __slots__ = (
+        'parser',
+        'start_time_ns',
+        'wall_time',
+        'input_size',
+        'record_count',
+    )
+
+    def __init__(
+            self,
+            parser: str,
+            start_time_ns: int,
+            wall_time: float,
+            input_size: int,
+            record_count: int
+    ):
+        self.parser = parser
+        self.start_time_ns = start_time_ns
+        self.wall_time = wall_time
+        self.input_size = input_size
+        self.record_count = record_count
+
+
+def decode_output(
+        data: bytes
+) -> str:
+    """
+    Decodes output of command like subprocess does in text mode, with locale encoding
+    and universal newlines.
+
+    :rtype: str
+    """
+    text = data.decode(locale.getpreferredencoding(False))
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+class TracedCompletedProcess(subprocess.CompletedProcess):
+    """
+    Result of traced git command with lengths of stdout and stderr in bytes, also in text mode.
+    """
+    def __init__(
+            self,
+            args: List[str],
+            returncode: int,
+            stdout,
+            stderr,
+            stdout_bytes: int,
+            stderr_bytes: int
+    ):
+        super().__init__(args, returncode, stdout, stderr)
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+
+
+class _CountingReader(io.RawIOBase):
+    """
+    Raw reader counting bytes read from pipe.
+    """
+    def __init__(
+            self,
+            raw
+    ):
+        super().__init__()
+        self._raw = raw
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(
+            self,
+            buffer
+    ) -> Optional[int]:
+        size = self._raw.readinto(buffer)
+        if size:
+            self.count += size
+        return size
+
+    def fileno(self) -> int:
+        return self._raw.fileno()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+class TracedPopen(subprocess.Popen):
+    """
+    Git process started without waiting for it, which reports CommandEvent to tracer when it is waited on.
+    Pipes are opened in binary mode and wrapped, so that bytes of stdout and stderr are counted
+    without encoding decoded output again. In text mode pipes are decoded like by subprocess.
+
+    :param tracer: Tracer receiving CommandEvent.
+    :type tracer: GitTracer
+    :param command: Git command without 'git', as reported in CommandEvent.
+    :type command: List[str]
+    :param args: Arguments of process.
+    :type args: List[str]
+    :param text: True if pipes should be opened in text mode, False for binary pipes.
+    :type text: bool
+    """
+    def __init__(
+            self,
+            tracer: "GitTracer",
+            command: List[str],
+            args: List[str],
+            text=True,
+            **kwargs
+    ):
+        self._tracer = tracer
+        self._command = command
+        self._text = text
+        self._reported = False
+        self._report_suspended = False
+        self._start_time_ns = int(time.time() * 1e9)
+        self._start = time.perf_counter()
+        self._start_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        super().__init__(args, universal_newlines=False, **kwargs)
+        encoding = locale.getpreferredencoding(False)
+        self._counters: Dict[str, _CountingReader] = dict()
+        self._binary_streams: Dict[str, io.BufferedReader] = dict()
+        for name in ("stdout", "stderr"):
+            stream = getattr(self, name)
+            if stream is None:
+                continue
+            counter = self._counters[name] = _CountingReader(stream.detach())
+            binary_stream = self._binary_streams[name] = io.BufferedReader(counter)
+            setattr(self, name, io.TextIOWrapper(binary_stream, encoding=encoding) if text else binary_stream)
+        if text and self.stdin is not None:
+            self.stdin = io.TextIOWrapper(self.stdin, encoding=encoding, write_through=True)
+
+    def _count(
+            self,
+            name: str
+    ) -> int:
+        counter = self._counters.get(name)
+        return 0 if counter is None else counter.count
+
+    def _report(self) -> None:
+        if self._reported or self._report_suspended or self.returncode is None:
+            return
+        self._reported = True
+        end_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._tracer.on_command(
+            CommandEvent(
+                command=self._command,
+                start_time_ns=self._start_time_ns,
+                wall_time=time.perf_counter() - self._start,
+                cpu_time=(
+                    (end_usage.ru_utime - self._start_usage.ru_utime)
+                    + (end_usage.ru_stime - self._start_usage.ru_stime)
+                ),
+                stdout_bytes=self._count("stdout"),
+                stderr_bytes=self._count("stderr"),
+                returncode=self.returncode
+            )
+        )
+
+    def poll(self) -> Optional[int]:
+        returncode = super().poll()
+        self._report()
+        return returncode
+
+    def wait(self, *args, **kwargs) -> int:
+        returncode = super().wait(*args, **kwargs)
+        self._report()
+        return returncode
+
+    def communicate(
+            self,
+            input=None,
+            timeout=None
+    ) -> Tuple:
+        """
+        Same as subprocess.Popen.communicate. Output is read from binary pipes, counted and decoded
+        in text mode.
+        """
+        if self._text:
+            if isinstance(input, str):
+                input = input.encode(locale.getpreferredencoding(False))
+            if self.stdin is not None:
+                self.stdin = self.stdin.detach()
+        counts = {x: self._count(x) for x in self._counters}
+        for name, binary_stream in self._binary_streams.items():
+            setattr(self, name, binary_stream)
+        self._report_suspended = True
+        try:
+            stdout, stderr = super().communicate(input, timeout)
+        finally:
+            self._report_suspended = False
+        outputs = list()
+        for name, output in (("stdout", stdout), ("stderr", stderr)):
+            if output is not None:
+                self._counters[name].count = counts[name] + len(output)
+                if self._text:
+                    output = decode_output(output)
+            outputs.append(output)
+        self._report()
+        return tuple(outputs)
+
+
+class GitTracer:
+    """
+    Receives events from Git given as tracer parameter. Methods are called synchronously
+    in thread which ran the command, so they should be fast. Default implementation ignores events.
+    """
+    def on_command(
+            self,
+            event: CommandEvent
+    ) -> None:
+        pass
+
+    def on_parse(
+            self,
+            event: ParseEvent
+    ) -> None:
+        pass
+
+
+class _Statistics:
+    __slots__ = (
+        'count',
+        'failures',
+        'wall_time',
+        'max_wall_time',
+        'cpu_time',
+        'input_bytes',
+        'output_bytes',
+        'records',
+        'histogram',
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.wall_time = 0.0
+        self.max_wall_time = 0.0
+        self.cpu_time = 0.0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.records = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(
+            self,
+            wall_time: float
+    ) -> None:
+        self.count += 1
+        self.wall_time += wall_time
+        self.max_wall_time = max(self.max_wall_time, wall_time)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, wall_time * 1000)] += 1
+
+    def to_dict(self) -> dict:
+        return {x: getattr(self, x) for x in self.__slots__}
+
+
+class TracingAggregator(GitTracer):
+    """
+    Collects statistics of git commands per subcommand and of parsing per parser, with histograms
+    of wall times in buckets bounded by HISTOGRAM_BOUNDS_MS. Can be shared by many Git objects and threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands: Dict[str, _Statistics] = dict()
+        self._parsers: Dict[str, _Statistics] = dict()
+
+    def on_command(
+            self,
+            event: CommandEvent
+    ) -> None:
+        with self._lock:
+            statistics = self._commands.get(event.subcommand)
+            if statistics is None:
+                statistics = self._commands[event.subcommand] = _Statistics()
+            statistics.add(event.wall_time)
+            statistics.cpu_time += event.cpu_time
+            statistics.output_bytes += event.stdout_bytes + event.stderr_bytes
+            if event.returncode != 0:
+                statistics.failures += 1
+
+    def on_parse(
+            self,
+            event: ParseEvent
+    ) -> None:
+        with self._lock:
+            statistics = self._parsers.get(event.parser)
+            if statistics is None:
+                statistics = self._parsers[event.parser] = _Statistics()
+            statistics.add(event.wall_time)
+            statistics.input_bytes += event.input_size
+            statistics.records += event.record_count
+
+    def get_command_statistics(
+            self
+    ) -> Dict[str, dict]:
+        """
+        :return: Statistics per git subcommand: count, failures, wall_time, max_wall_time, cpu_time,
+            output_bytes and histogram (counts per bucket, last bucket is above last bound).
+        :rtype: Dict[str, dict]
+        """
+        with self._lock:
+            return {name: x.to_dict() for name, x in self._commands.items()}
+
+    def get_parse_statistics(
+            self
+    ) -> Dict[str, dict]:
+        """
+        :return: Statistics per parser: count, wall_time, max_wall_time, input_bytes, records and histogram.
+        :rtype: Dict[str, dict]
+        """
+        with self._lock:
+            return {name: x.to_dict() for name, x in self._parsers.items()}
+
+    def reset(
+            self
+    ) -> None:
+        with self._lock:
+            self._commands.clear()
+            self._parsers.clear()
+
+    def report(
+            self
+    ) -> str:
+        """
+        :return: Human readable table of collected statistics with histograms.
+        :rtype: str
+        """
+        bounds = ' '.join(f"{x:>5}" for x in HISTOGRAM_BOUNDS_MS) + "   inf"
+        lines = [f"{'name':32} {'count':>6} {'total s':>9} {'max ms':>9} {'cpu s':>8}  histogram (ms) {bounds}"]
+        for prefix, statistics in (("git ", self.get_command_statistics()), ("", self.get_parse_statistics())):
+            for name, x in sorted(statistics.items()):
+                histogram = ' '.join(f"{count:>5}" for count in x["histogram"])
+                lines.append(
+                    f"{prefix + name:32} {x['count']:>6} {x['wall_time']:>9.3f} "
+                    f"{x['max_wall_time'] * 1000:>9.1f} {x['cpu_time']:>8.3f}  {'':15}{histogram}"
+                )
+        return '\n'.join(lines)
+
+
+class OpenTelemetryTracer(GitTracer):
+    """
+    Emits OpenTelemetry spans for git commands and parsing. Requires 'opentelemetry-api' package,
+    which can be installed with 'atudomain-git[opentelemetry]'.
+
+    :param tracer: OpenTelemetry tracer. None means tracer named 'atudomain.git' from global tracer provider.
+    """
+    def __init__(
+            self,
+            tracer=None
+    ):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("OpenTelemetryTracer requires 'opentelemetry-api' package") from None
+        self._trace = trace
+        self._tracer = tracer if tracer is not None else trace.get_tracer("atudomain.git")
+
+    def on_command(
+            self,
+            event: CommandEvent
+    ) -> None:
+        span = self._tracer.start_span(
+            f"git {event.subcommand}",
+            start_time=event.start_time_ns,
+            attributes={
+                "git.command": ' '.join(event.command),
+                "git.cpu_time": event.cpu_time,
+                "git.stdout_bytes": event.stdout_bytes,
+                "git.stderr_bytes": event.stderr_bytes,
+                "git.returncode": event.returncode,
+            }
+        )
+        if event.returncode != 0:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=event.start_time_ns + int(event.wall_time * 1e9))
+
+    def on_parse(
+            self,
+            event: ParseEvent
+    ) -> None:
+        span = self._tracer.start_span(
+            f"parse {event.parser}",
+            start_time=event.start_time_ns,
+            attributes={
+                "git.parse.input_size": event.input_size,
+                "git.parse.records": event.record_count,
+            }
+        )
+        span.end(end_time=event.start_time_ns + int(event.wall_time * 1e9))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Measures memory used by Commit objects returned by GitLogParser.extract_commits.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_commit_memory --commits 100000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from atudomain.git.parsers import GitLogParser
+from benchmarks.synthetic import generate_raw_log
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=100000)
+    arguments = argument_parser.parse_args()
+
+    raw_log_string = generate_raw_log(arguments.commits)
+    git_log_parser = GitLogParser()
+
+    gc.collect()
+    tracemalloc.start()
+    commits = git_log_parser.extract_commits(raw_log_string)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"commits: {len(commits)}")
+    print(f"retained: {retained / len(commits):,.0f} bytes per commit")
+    print(f"peak during parsing: {peak / len(commits):,.0f} bytes per commit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compares Git.create_commits with Git.add_files and Git.commit for every commit
+in freshly initialized repositories.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_create_commits --commits 1000
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from atudomain.git.objects import NewCommit
+from atudomain.git.repository import Git
+
+
+def _init(directory: str) -> Git:
+    subprocess.run(["git", "init", "-q", directory], check=True)
+    git = Git(directory)
+    git.config("user.name", "Bench")
+    git.config("user.email", "bench@example.com")
+    return git
+
+
+def _add_and_commit(directory: str, commit_count: int) -> None:
+    git = _init(directory)
+    for index in range(commit_count):
+        with open(os.path.join(directory, f"file{index % 100}.txt"), "w") as f:
+            f.write(f"content {index}\n")
+        git.add_files(".")
+        git.commit(f"commit {index}")
+
+
+def _create_commits(directory: str, commit_count: int) -> None:
+    git = _init(directory)
+    git.create_commits(
+        NewCommit(f"commit {index}", files={f"file{index % 100}.txt": f"content {index}\n"}, branch="master")
+        for index in range(commit_count)
+    )
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=1000)
+    arguments = argument_parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_create_commits_")
+    try:
+        print(f"commits: {arguments.commits}")
+        start = time.perf_counter()
+        _add_and_commit(os.path.join(root, "add_and_commit"), arguments.commits)
+        add_and_commit_time = time.perf_counter() - start
+        print(f"add_files and commit: {add_and_commit_time:.3f}s")
+        start = time.perf_counter()
+        _create_commits(os.path.join(root, "create_commits"), arguments.commits)
+        create_commits_time = time.perf_counter() - start
+        print(
+            f"create_commits:       {create_commits_time:.3f}s, "
+            f"speedup: {add_and_commit_time / create_commits_time:.1f}x"
+        )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
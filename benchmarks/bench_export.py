@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measures throughput of exporting commits to every file format and of loading them back
+as Commit objects and as CommitTable, compared with parsing 'raw' git log output.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_export --commits 100000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from atudomain.git.export import export_commits
+from atudomain.git.export import load_commit_table
+from atudomain.git.export import load_commits
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.table import numpy
+from benchmarks.synthetic import generate_commit_records
+from benchmarks.synthetic import render_raw_log
+
+
+FILE_NAMES = ["commits.ndjson", "commits.csv", "history.commits", "history.commits.gz"]
+
+
+def _measure(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=50000)
+    arguments = argument_parser.parse_args()
+
+    raw_log_string = render_raw_log(generate_commit_records(arguments.commits))
+    commits = GitLogParser().extract_commits(raw_log_string)
+    parse_time = _measure(lambda: GitLogParser().extract_commits(raw_log_string))
+    print(f"commits: {arguments.commits}")
+    print(f"{'raw git log':20} {len(raw_log_string.encode()) / 2 ** 20:8.1f} MiB"
+          f"{'':>24} parse {arguments.commits / parse_time:>10,.0f}/s")
+
+    directory = tempfile.mkdtemp(prefix="bench_export_")
+    try:
+        for file_name in FILE_NAMES:
+            path = os.path.join(directory, file_name)
+            export_time = _measure(lambda: export_commits(commits, path))
+            load_time = _measure(lambda: sum(1 for _ in load_commits(path)))
+            line = (
+                f"{file_name:20} {os.path.getsize(path) / 2 ** 20:8.1f} MiB"
+                f"  export {arguments.commits / export_time:>10,.0f}/s"
+                f"  load {arguments.commits / load_time:>10,.0f}/s"
+            )
+            if numpy is not None:
+                table_time = _measure(lambda: load_commit_table(path))
+                line += f"  table {arguments.commits / table_time:>10,.0f}/s"
+            print(line)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
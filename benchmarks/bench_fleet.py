@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compares GitFleet with a serial loop over Git instances on generated local repositories.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_fleet --repositories 200 --commits 500 --workers 8
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from atudomain.git.fleet import GitFleet
+from atudomain.git.repository import Git
+from benchmarks.synthetic import create_repository
+
+
+def _serial(directories):
+    results = list()
+    for directory in directories:
+        with Git(directory) as git:
+            results.append(git.get_commits())
+    return results
+
+
+def _fleet(directories, workers, executor):
+    return list(GitFleet(directories, max_workers=workers, executor=executor).get_commits())
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--repositories", type=int, default=100)
+    argument_parser.add_argument("--commits", type=int, default=500)
+    argument_parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    arguments = argument_parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_fleet_")
+    try:
+        directories = [os.path.join(root, f"repo{i}.git") for i in range(arguments.repositories)]
+        for index, directory in enumerate(directories):
+            create_repository(directory, arguments.commits, seed=index)
+
+        print(f"repositories: {arguments.repositories}, commits per repository: {arguments.commits}")
+        start = time.perf_counter()
+        _serial(directories)
+        serial_time = time.perf_counter() - start
+        print(f"serial loop:               {serial_time:.3f}s")
+        for executor in ("thread", "process"):
+            start = time.perf_counter()
+            _fleet(directories, arguments.workers, executor)
+            fleet_time = time.perf_counter() - start
+            print(
+                f"fleet {executor:7} ({arguments.workers:2} workers): {fleet_time:.3f}s, "
+                f"speedup: {serial_time / fleet_time:.2f}x"
+            )
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Compares eager and lazy Commit construction, with and without reading a few fields.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_lazy_commits --commits 100000
+"""
+
+import argparse
+
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.parsers import GitMachineLogParser
+from benchmarks.bench_log_parser import _measure
+from benchmarks.synthetic import generate_commit_records
+from benchmarks.synthetic import render_machine_log
+from benchmarks.synthetic import render_raw_log
+
+
+def _read_some_fields(commits):
+    for commit in commits:
+        commit.commit_id
+        commit.parents
+        commit.author_email
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=100000)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    records = generate_commit_records(arguments.commits)
+    logs = [
+        ("raw", GitLogParser(), render_raw_log(records)),
+        ("machine", GitMachineLogParser(), render_machine_log(records)),
+    ]
+
+    print(f"commits: {arguments.commits}")
+    for name, parser, log_string in logs:
+        eager_time = _measure(parser.extract_commits, log_string, arguments.repeat)
+        lazy_time = _measure(parser.extract_lazy_commits, log_string, arguments.repeat)
+        lazy_read_time = _measure(
+            lambda x: _read_some_fields(parser.extract_lazy_commits(x)), log_string, arguments.repeat
+        )
+        print(f"{name}: eager {eager_time:.3f}s, lazy {lazy_time:.3f}s, "
+              f"lazy + commit_id/parents/author_email {lazy_read_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Compares parsing throughput of 'raw' and 'machine' git log formats.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_log_formats --commits 100000
+"""
+
+import argparse
+
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.parsers import GitMachineLogParser
+from benchmarks.bench_log_parser import _measure
+from benchmarks.synthetic import generate_commit_records
+from benchmarks.synthetic import render_machine_log
+from benchmarks.synthetic import render_raw_log
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=50000)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    records = generate_commit_records(arguments.commits)
+    raw_log_string = render_raw_log(records)
+    machine_log_string = render_machine_log(records)
+
+    raw_time = _measure(GitLogParser().extract_commits, raw_log_string, arguments.repeat)
+    machine_time = _measure(GitMachineLogParser().extract_commits, machine_log_string, arguments.repeat)
+
+    print(f"commits: {arguments.commits}")
+    print(f"raw:     {raw_time:.3f}s ({arguments.commits / raw_time:,.0f} commits/s)")
+    print(f"machine: {machine_time:.3f}s ({arguments.commits / machine_time:,.0f} commits/s)")
+    print(f"speedup: {raw_time / machine_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
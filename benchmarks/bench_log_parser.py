@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Compares the line based GitLogParser engine with the previous regex engine.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_log_parser --commits 100000
+"""
+
+import argparse
+import time
+
+from atudomain.git.parsers import GitLogParser
+from benchmarks.synthetic import generate_raw_log
+
+
+def _measure(function, argument, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=50000)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    raw_log_string = generate_raw_log(arguments.commits)
+    git_log_parser = GitLogParser()
+
+    regex_time = _measure(git_log_parser._extract_commits_regex, raw_log_string, arguments.repeat)
+    lines_time = _measure(git_log_parser.extract_commits, raw_log_string, arguments.repeat)
+
+    print(f"commits: {arguments.commits}, log size: {len(raw_log_string) / 2 ** 20:.1f} MiB")
+    print(f"regex engine: {regex_time:.3f}s ({arguments.commits / regex_time:,.0f} commits/s)")
+    print(f"line engine:  {lines_time:.3f}s ({arguments.commits / lines_time:,.0f} commits/s)")
+    print(f"speedup: {regex_time / lines_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Shows how parallel mode of GitLogParser.extract_commits scales with number of worker processes.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_parallel_parser --commits 500000 --processes 1 2 4 8
+"""
+
+import argparse
+import functools
+
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.parsers import PARALLEL_CHUNK_SIZE
+from benchmarks.bench_log_parser import _measure
+from benchmarks.synthetic import generate_raw_log
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=200000)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    argument_parser.add_argument("--chunk-size", type=int, default=PARALLEL_CHUNK_SIZE)
+    arguments = argument_parser.parse_args()
+
+    raw_log_string = generate_raw_log(arguments.commits)
+    git_log_parser = GitLogParser()
+
+    print(f"commits: {arguments.commits}, log size: {len(raw_log_string) / 2 ** 20:.1f} MiB")
+    serial_time = None
+    for processes in arguments.processes:
+        parse_time = _measure(
+            functools.partial(git_log_parser.extract_commits, processes=processes, chunk_size=arguments.chunk_size),
+            raw_log_string,
+            arguments.repeat
+        )
+        serial_time = serial_time or parse_time
+        print(
+            f"processes: {processes:2}, {parse_time:.3f}s ({arguments.commits / parse_time:,.0f} commits/s), "
+            f"speedup: {serial_time / parse_time:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite of public APIs on a generated repository. Measures total time, latency to first result,
+throughput and peak Python memory of every benchmark. Results can be saved as baseline and later runs
+compared against it, e.g. before and after a change:
+
+    python3 -m benchmarks.suite --commits 100000 --branches 1000 --save before
+    python3 -m benchmarks.suite --commits 100000 --branches 1000 --compare before
+
+Repositories are generated with git fast-import and kept in --work-directory between runs.
+Baselines are stored as JSON in benchmarks/baselines.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.repository import Git
+from atudomain.git.table import CommitTable
+from atudomain.git.table import numpy
+from benchmarks.synthetic import create_repository
+
+
+BASELINES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def _build_benchmarks(directory: str) -> dict:
+    """
+    :return: Benchmark names mapped to functions, which get Git and return list or iterator of results.
+    """
+    with Git(directory) as git:
+        raw_log_string = git._run(["log", "--pretty=raw"]).stdout
+        raw_log_bytes = git._run(["log", "--pretty=raw", "--encoding=none"], text=False).stdout
+        commit_ids = [x.commit_id for x in git.get_commits(log_format="machine", lazy=True)]
+    git_log_parser = GitLogParser()
+    benchmarks = {
+        "get_commits": lambda git: git.get_commits(),
+        "get_commits_machine": lambda git: git.get_commits(log_format="machine"),
+        "get_commits_lazy": lambda git: git.get_commits(lazy=True),
+        "get_commits_binary": lambda git: git.get_commits(binary=True),
+        "iter_commits": lambda git: git.iter_commits(),
+        "get_commits_by_id": lambda git: git.get_commits_by_id(commit_ids),
+        "walk_commit_ids": lambda git: git.walk_commit_ids(),
+        "get_branches": lambda git: git.get_branches(),
+        "get_branch_refs": lambda git: git.get_branch_refs(),
+        "get_branch_details": lambda git: git.get_branch_details(),
+        "GitLogParser.extract_commits": lambda git: git_log_parser.extract_commits(raw_log_string),
+        "GitLogParser.extract_commits_from_bytes":
+            lambda git: git_log_parser.extract_commits_from_bytes(raw_log_bytes),
+    }
+    if numpy is not None:
+        benchmarks["get_commit_table"] = lambda git: git.get_commit_table()
+        benchmarks["CommitTable.from_raw_log"] = lambda git: CommitTable.from_raw_log(raw_log_string)
+    return benchmarks
+
+
+def _run_once(function, directory: str):
+    """
+    :return: Number of results, total time and time to first result.
+    """
+    with Git(directory) as git:
+        start = time.perf_counter()
+        result = function(git)
+        if isinstance(result, (list, dict, CommitTable)):
+            total = time.perf_counter() - start
+            return len(result), total, total
+        count = 0
+        first = None
+        for _ in result:
+            if first is None:
+                first = time.perf_counter() - start
+            count += 1
+        total = time.perf_counter() - start
+        return count, total, total if first is None else first
+
+
+def _measure_peak_memory(function, directory: str) -> int:
+    with Git(directory) as git:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = function(git)
+            if not isinstance(result, (list, dict, CommitTable)):
+                for _ in result:
+                    pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def run_benchmarks(directory: str, repeat: int, only=None) -> dict:
+    results = dict()
+    for name, function in _build_benchmarks(directory).items():
+        if only and name not in only:
+            continue
+        runs = [_run_once(function, directory) for _ in range(repeat)]
+        count = runs[0][0]
+        total = min(x[1] for x in runs)
+        first = min(x[2] for x in runs)
+        results[name] = {
+            "results": count,
+            "total_seconds": total,
+            "first_result_seconds": first,
+            "results_per_second": count / total if total else 0.0,
+            "peak_memory_bytes": _measure_peak_memory(function, directory),
+        }
+        print(
+            f"{name:30} {count:>9} results {total:>9.4f}s total {first:>9.4f}s first "
+            f"{results[name]['results_per_second']:>12,.0f}/s {results[name]['peak_memory_bytes'] / 2 ** 20:>9.1f} MiB",
+            flush=True
+        )
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """
+    Prints ratios of current results to baseline results.
+
+    :return: True if no benchmark got slower or used more memory than threshold allows.
+    """
+    if current["parameters"] != baseline["parameters"]:
+        print(f"warning: baseline parameters differ: {baseline['parameters']}")
+    passed = True
+    print(f"{'benchmark':30} {'total':>8} {'first':>8} {'memory':>8}")
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:30} {'new':>8}")
+            continue
+        ratios = [
+            result[x] / previous[x] if previous[x] else 1.0
+            for x in ("total_seconds", "first_result_seconds", "peak_memory_bytes")
+        ]
+        regression = ratios[0] > 1 + threshold or ratios[2] > 1 + threshold
+        passed = passed and not regression
+        print(
+            f"{name:30} {ratios[0]:>7.2f}x {ratios[1]:>7.2f}x {ratios[2]:>7.2f}x"
+            + ("  REGRESSION" if regression else "")
+        )
+    return passed
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--commits", type=int, default=10000)
+    argument_parser.add_argument("--branches", type=int, default=100)
+    argument_parser.add_argument("--merge-every", type=int, default=10)
+    argument_parser.add_argument("--body-lines", type=int, default=3)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--only", nargs="*", help="names of benchmarks to run")
+    argument_parser.add_argument("--work-directory", default=os.path.join(tempfile.gettempdir(), "atudomain-git-bench"))
+    argument_parser.add_argument("--save", metavar="NAME", help="save results as baseline NAME")
+    argument_parser.add_argument("--compare", metavar="NAME", help="compare results with baseline NAME")
+    argument_parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative regression")
+    arguments = argument_parser.parse_args()
+
+    parameters = {
+        "commits": arguments.commits,
+        "branches": arguments.branches,
+        "merge_every": arguments.merge_every,
+        "body_lines": arguments.body_lines,
+        "seed": arguments.seed,
+    }
+    directory = os.path.join(
+        arguments.work_directory,
+        "repo-" + "-".join(f"{key}{value}" for key, value in parameters.items()) + ".git"
+    )
+    if not os.path.isdir(directory):
+        os.makedirs(arguments.work_directory, exist_ok=True)
+        start = time.perf_counter()
+        create_repository(
+            directory,
+            arguments.commits,
+            merge_every=arguments.merge_every,
+            body_lines=arguments.body_lines,
+            seed=arguments.seed,
+            branch_count=arguments.branches
+        )
+        print(f"generated {directory} in {time.perf_counter() - start:.1f}s")
+
+    current = {
+        "parameters": parameters,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": run_benchmarks(directory, arguments.repeat, arguments.only),
+    }
+    if arguments.save:
+        os.makedirs(BASELINES_DIRECTORY, exist_ok=True)
+        with open(os.path.join(BASELINES_DIRECTORY, f"{arguments.save}.json"), "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if arguments.compare:
+        with open(os.path.join(BASELINES_DIRECTORY, f"{arguments.compare}.json"), "r") as f:
+            baseline = json.load(f)
+        if not compare(current, baseline, arguments.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
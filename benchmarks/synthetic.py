@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+import hashlib
+import random
+import subprocess
+
+from typing import Dict, Iterable, Iterator, List
+
+
+AUTHORS = [
+    ("Adrian Tuzimek", "tuziomek@gmail.com"),
+    ("Jan Kowalski", "jan.kowalski@example.com"),
+    ("Anna Nowak", "anna.nowak@example.com"),
+    ("John Doe", "john.doe@example.com"),
+]
+
+WORDS = [
+    "fix", "add", "remove", "refactor", "parser", "branch", "commit", "tests",
+    "docs", "release", "update", "cleanup", "handle", "error", "repository",
+]
+
+
+def _sha(value: str) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def iter_commit_records(
+        commit_count: int,
+        merge_every=10,
+        body_lines=3,
+        seed=0
+) -> Iterator[Dict]:
+    """
+    Generates deterministic commit descriptions, oldest commit first.
+    Every merge_every-th commit is a merge and every commit has a subject and body_lines of body.
+    Records also have index and parent_indexes, i.e. positions of commits in generation order.
+    """
+    rng = random.Random(seed)
+    timestamp = 1500000000
+    commit_ids = list()
+    for index in range(commit_count):
+        parent_indexes = list()
+        if index > 0:
+            parent_indexes.append(index - 1)
+        if index > 1 and merge_every and index % merge_every == 0:
+            parent_indexes.append(rng.randrange(0, index - 1))
+        author, author_email = rng.choice(AUTHORS)
+        committer, committer_email = rng.choice(AUTHORS)
+        timestamp += rng.randrange(60, 7200)
+        message_lines = [_sentence(rng, 6)]
+        if body_lines:
+            message_lines.append("")
+            message_lines += [_sentence(rng, 10) for _ in range(body_lines)]
+        commit_ids.append(_sha(f"commit {index}"))
+        yield {
+            "index": index,
+            "commit_id": commit_ids[index],
+            "tree": _sha(f"tree {index}"),
+            "parents": [commit_ids[x] for x in parent_indexes],
+            "parent_indexes": parent_indexes,
+            "author": author,
+            "author_email": author_email,
+            "author_timestamp": timestamp,
+            "committer": committer,
+            "committer_email": committer_email,
+            "committer_timestamp": timestamp + 30,
+            "message": '\n'.join(message_lines),
+        }
+
+
+def generate_commit_records(
+        commit_count: int,
+        merge_every=10,
+        body_lines=3,
+        seed=0
+) -> List[Dict]:
+    """
+    Generates deterministic commit descriptions, newest commit first.
+    """
+    records = list(iter_commit_records(commit_count, merge_every, body_lines, seed))
+    records.reverse()
+    return records
+
+
+def render_raw_log(
+        records: List[Dict]
+) -> str:
+    """
+    Renders records as 'git log --pretty=raw' output.
+    """
+    commit_strings = list()
+    for record in records:
+        lines = [
+            f"commit {record['commit_id']}",
+            f"tree {record['tree']}",
+        ]
+        lines += [f"parent {x}" for x in record["parents"]]
+        lines.append(
+            f"author {record['author']} <{record['author_email']}> {record['author_timestamp']} +0100"
+        )
+        lines.append(
+            f"committer {record['committer']} <{record['committer_email']}> {record['committer_timestamp']} +0100"
+        )
+        lines.append("")
+        lines += [f"    {x}" for x in record["message"].split('\n')]
+        commit_strings.append('\n'.join(lines) + '\n')
+    return '\n'.join(commit_strings)
+
+
+def render_machine_log(
+        records: List[Dict]
+) -> str:
+    """
+    Renders records as 'git log -z' output with GitMachineLogParser.FORMAT.
+    """
+    return ''.join(
+        '\x1e'.join([
+            record["commit_id"],
+            record["tree"],
+            ' '.join(record["parents"]),
+            record["author"],
+            record["author_email"],
+            str(record["author_timestamp"]),
+            record["committer"],
+            record["committer_email"],
+            str(record["committer_timestamp"]),
+            record["message"] + '\n',
+        ]) + '\0'
+        for record in records
+    )
+
+
+def generate_raw_log(
+        commit_count: int,
+        merge_every=10,
+        body_lines=3,
+        seed=0
+) -> str:
+    return render_raw_log(
+        generate_commit_records(commit_count, merge_every, body_lines, seed)
+    )
+
+
+def iter_fast_import(
+        records: Iterable[Dict],
+        ref="refs/heads/master",
+        branch_count=0,
+        seed=0
+) -> Iterator[bytes]:
+    """
+    Renders records, oldest first, as 'git fast-import' stream committing them to ref. Commits have
+    empty trees, so commit ids differ from those in records, but history shape, identities and messages
+    are kept. Then branch_count branches named 'branch-N' are created at random commits.
+    """
+    commit_count = 0
+    for record in records:
+        message = (record["message"] + '\n').encode()
+        parents = ''.join(
+            f"{'from' if index == 0 else 'merge'} :{parent + 1}\n"
+            for index, parent in enumerate(record["parent_indexes"])
+        )
+        yield (
+            f"commit {ref}\nmark :{record['index'] + 1}\n"
+            f"author {record['author']} <{record['author_email']}> {record['author_timestamp']} +0100\n"
+            f"committer {record['committer']} <{record['committer_email']}> {record['committer_timestamp']} +0100\n"
+            f"data {len(message)}\n"
+        ).encode() + message + f"{parents}\n".encode()
+        commit_count += 1
+    rng = random.Random(seed)
+    for index in range(branch_count if commit_count else 0):
+        yield f"reset refs/heads/branch-{index}\nfrom :{rng.randrange(commit_count) + 1}\n\n".encode()
+
+
+def render_fast_import(
+        records: List[Dict],
+        ref="refs/heads/master"
+) -> bytes:
+    """
+    Renders records, newest first, as 'git fast-import' stream, see iter_fast_import.
+    """
+    return b''.join(iter_fast_import(reversed(records), ref))
+
+
+def create_repository(
+        path: str,
+        commit_count: int,
+        merge_every=10,
+        body_lines=3,
+        seed=0,
+        branch_count=0,
+        pack_refs=True
+) -> None:
+    """
+    Creates bare repository at path with commit_count generated commits on master branch
+    and branch_count other branches. History is streamed into git fast-import, so memory usage
+    does not grow with commit_count.
+    """
+    subprocess.run(["git", "init", "--quiet", "--bare", path], check=True)
+    process = subprocess.Popen(["git", "fast-import", "--quiet"], stdin=subprocess.PIPE, cwd=path)
+    try:
+        for chunk in iter_fast_import(
+                iter_commit_records(commit_count, merge_every, body_lines, seed),
+                branch_count=branch_count,
+                seed=seed
+        ):
+            process.stdin.write(chunk)
+    finally:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/master"], cwd=path, check=True)
+    if pack_refs:
+        subprocess.run(["git", "pack-refs", "--all"], cwd=path, check=True)
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.async_repository import AsyncGit
+from atudomain.git.repository import Git
+from atudomain.git.repository import NoCommitsError
+from atudomain.git.repository import NotARepositoryError
+from tests import SANDBOX_DIR
+from tests.util import CommitFields
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "async_repo")
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def create_repo():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init {repo_dir}", shell=True)
+    subprocess.run(f"git config user.name Test Example", shell=True, cwd=repo_dir)
+    subprocess.run(f"git config user.email test@example.com", shell=True, cwd=repo_dir)
+
+
+def add_commits_with_messages(messages):
+    for message in messages:
+        subprocess.run(f"git commit --allow-empty -m '{message}'", shell=True, cwd=repo_dir)
+
+
+@pytest.fixture
+def async_git():
+    create_repo()
+    yield AsyncGit(repo_dir)
+    shutil.rmtree(repo_dir)
+
+
+@pytest.fixture
+def async_git_with_commits():
+    create_repo()
+    add_commits_with_messages(["first", "second\n\nbody of second", "third"])
+    yield AsyncGit(repo_dir)
+    shutil.rmtree(repo_dir)
+
+
+def test_not_a_repository():
+    with pytest.raises(NotARepositoryError):
+        run(AsyncGit("/").get_commits())
+
+
+def test_empty_repo(async_git):
+    with pytest.raises(NoCommitsError):
+        run(async_git.get_commits())
+    assert [] == run(async_git.get_branches())
+
+
+def test_get_commits_matches_git(async_git_with_commits):
+    expected = [CommitFields.extract(x) for x in Git(repo_dir).get_commits()]
+    for log_format in ("raw", "machine"):
+        commits = run(async_git_with_commits.get_commits(log_format=log_format))
+        assert expected == [CommitFields.extract(x) for x in commits]
+
+
+def test_iter_commits_matches_get_commits(async_git_with_commits):
+    async def collect(log_format):
+        return [x async for x in async_git_with_commits.iter_commits(log_format=log_format, chunk_size=64)]
+
+    expected = [CommitFields.extract(x) for x in Git(repo_dir).get_commits()]
+    for log_format in ("raw", "machine"):
+        assert expected == [CommitFields.extract(x) for x in run(collect(log_format))]
+
+
+def test_iter_commits_stopped_early(async_git_with_commits):
+    async def first():
+        iterator = async_git_with_commits.iter_commits()
+        commit = await iterator.__anext__()
+        await iterator.aclose()
+        return commit
+
+    assert "third" == run(first()).message
+    assert not async_git_with_commits._processes
+
+
+def test_iter_commits_with_records_larger_than_chunks(async_git):
+    add_commits_with_messages(["x" * 100000, "y" * 100000])
+
+    async def collect(log_format):
+        return [x async for x in async_git.iter_commits(log_format=log_format, chunk_size=64)]
+
+    for log_format in ("raw", "machine"):
+        assert [100000, 100000] == [len(x.message) for x in run(collect(log_format))]
+
+
+def test_iter_commits_consumer_does_not_hold_process_slot(async_git_with_commits):
+    async_git = AsyncGit(repo_dir, max_processes=1)
+
+    async def work():
+        iterator = async_git.iter_commits()
+        commit = await iterator.__anext__()
+        branches = await asyncio.wait_for(async_git.get_branches(), 10)
+        remaining = [x.message async for x in iterator]
+        return commit.message, branches, remaining
+
+    message, branches, remaining = run(work())
+    assert "third" == message
+    assert 1 == len(branches)
+    assert ["second\n\nbody of second", "first"] == remaining
+
+
+def test_write_operations(async_git):
+    async def work():
+        with open(os.path.join(repo_dir, "testfile"), "w") as f:
+            f.write("test")
+        await async_git.add_files(".")
+        await async_git.commit("test")
+        await async_git.checkout_new_branch("feature")
+        return await async_git.get_branches()
+
+    assert sorted(["master", "feature"]) == sorted(
+        x.replace("main", "master") for x in run(work())
+    )
+
+
+def test_concurrency_limit(async_git_with_commits):
+    async_git = AsyncGit(repo_dir, max_processes=2)
+    peak = 0
+    spawn = async_git._spawn
+
+    async def counting_spawn(*args, **kwargs):
+        nonlocal peak
+        process = await spawn(*args, **kwargs)
+        peak = max(peak, len(async_git._processes))
+        return process
+
+    async_git._spawn = counting_spawn
+
+    async def work():
+        return await asyncio.gather(*[async_git.get_commits() for _ in range(8)])
+
+    results = run(work())
+    assert 8 == len(results)
+    assert 1 <= peak <= 2
+
+
+def test_cancellation_kills_process(async_git_with_commits):
+    run(async_git_with_commits._check_directory())
+    processes = list()
+    spawn = async_git_with_commits._spawn
+
+    async def recording_spawn(*args, **kwargs):
+        process = await spawn(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    async_git_with_commits._spawn = recording_spawn
+
+    async def work():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                async_git_with_commits._run(["cat-file", "--batch"], stdin=asyncio.subprocess.PIPE),
+                timeout=0.5
+            )
+
+    run(work())
+    assert 1 == len(processes)
+    assert processes[0].returncode is not None
+    assert not async_git_with_commits._processes
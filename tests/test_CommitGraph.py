@@ -0,0 +1,89 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.graph import CommitGraph
+from atudomain.git.repository import Git
+from tests import SANDBOX_DIR
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "graph_repo")
+
+
+def run(command):
+    return subprocess.run(
+        command, shell=True, cwd=repo_dir, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def git():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init {repo_dir}", shell=True)
+    run("git config user.name Test")
+    run("git config user.email test@example.com")
+    for i in range(3):
+        run(f"git commit --allow-empty -m base{i}")
+    run("git checkout -b feature")
+    for i in range(3):
+        run(f"git commit --allow-empty -m feature{i}")
+    run("git checkout master")
+    for i in range(2):
+        run(f"git commit --allow-empty -m master{i}")
+    run("git merge --no-ff -m merge feature")
+    run("git checkout feature")
+    run("git commit --allow-empty -m feature-after-merge")
+    run("git checkout master")
+    yield Git(repo_dir)
+    shutil.rmtree(repo_dir)
+
+
+def check_graph(graph):
+    order = graph.topological_order()
+    assert sorted(order) == sorted(graph.commit_ids)
+    positions = {x: i for i, x in enumerate(order)}
+    for commit_id in order:
+        for parent in graph.parents(commit_id):
+            assert positions[commit_id] < positions[parent]
+            assert commit_id in graph.children(parent)
+    master = run("git rev-parse master")
+    feature = run("git rev-parse feature")
+    assert run("git merge-base master feature") == graph.merge_base(master, feature)
+    assert [run("git merge-base master feature")] == graph.merge_bases(feature, master)
+    for ancestor, descendant in [("master~3", "master"), ("feature", "master"), ("master", "feature^")]:
+        expected = subprocess.run(
+            f"git merge-base --is-ancestor {ancestor} {descendant}", shell=True, cwd=repo_dir
+        ).returncode == 0
+        assert expected == graph.is_ancestor(run(f"git rev-parse {ancestor}"), run(f"git rev-parse {descendant}"))
+    assert run("git rev-list --first-parent master").split("\n") == graph.first_parent_chain(master)
+    assert set(run("git rev-list master..feature").split("\n")) == set(graph.difference(feature, master))
+    assert 1 == graph.generation(run("git rev-list --max-parents=0 HEAD"))
+
+
+def test_commit_graph(git):
+    commits = git.get_commits("--all")
+    graph = CommitGraph(reversed(commits))
+    assert len(commits) == len(graph)
+    check_graph(graph)
+
+
+def test_commit_graph_partial_history(git):
+    graph = CommitGraph(git.get_commits("master~2..master"))
+    boundary = run("git rev-parse master~2")
+    assert boundary in graph
+    assert [] == graph.parents(boundary)
+    with pytest.raises(KeyError):
+        graph.parents("0" * 40)
+
+
+def test_commit_graph_save_and_load(git):
+    graph = CommitGraph(git.get_commits("--all"))
+    path = os.path.join(repo_dir, "graph.bin")
+    graph.save(path)
+    loaded = CommitGraph.load(path)
+    assert graph.commit_ids == loaded.commit_ids
+    assert graph.topological_order() == loaded.topological_order()
+    check_graph(loaded)
@@ -0,0 +1,148 @@
+import datetime
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.commitgraph import CommitGraphFile
+from atudomain.git.repository import Git
+from tests import SANDBOX_DIR
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "commit_graph_repo")
+objects_dir = os.path.join(repo_dir, ".git", "objects")
+
+
+def run(command) -> str:
+    return subprocess.run(
+        command, shell=True, cwd=repo_dir, check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout.strip()
+
+
+def commit(message, timestamp):
+    run(
+        f"GIT_AUTHOR_DATE='{timestamp} +0000' GIT_COMMITTER_DATE='{timestamp} +0000' "
+        f"git commit -q --allow-empty -m '{message}'"
+    )
+
+
+def merge(branches, timestamp):
+    run(
+        f"GIT_AUTHOR_DATE='{timestamp} +0000' GIT_COMMITTER_DATE='{timestamp} +0000' "
+        f"git merge -q --no-ff -m 'Merge {branches}' {branches}"
+    )
+
+
+@pytest.fixture
+def repo():
+    shutil.rmtree(repo_dir, ignore_errors=True)
+    subprocess.run(f"git init -q -b master {repo_dir}", shell=True, check=True)
+    run("git config user.name 'Test Example'")
+    run("git config user.email test@example.com")
+    timestamps = iter(range(1600000100, 1700000000, 100))
+    for i in range(5):
+        commit(f"master {i}", next(timestamps))
+    for branch in ["a", "b", "c"]:
+        run(f"git checkout -q -b {branch} master~{ord(branch) - ord('a')}")
+        for i in range(3):
+            commit(f"{branch} {i}", next(timestamps))
+    run("git checkout -q master")
+    merge("a b c", next(timestamps))
+    run("git checkout -q -b d a~1")
+    commit("d 0", next(timestamps))
+    run("git checkout -q master")
+    yield repo_dir
+    shutil.rmtree(repo_dir)
+
+
+def all_commit_ids():
+    return run("git rev-list --all").split()
+
+
+def assert_matches_git():
+    git = Git(repo_dir)
+    revisions = ["master", "a", "b", "c", "d", "master~1", "a~2"]
+    for first in revisions:
+        for second in revisions:
+            expected_is_ancestor = subprocess.run(
+                f"git merge-base --is-ancestor {first} {second}", shell=True, cwd=repo_dir
+            ).returncode == 0
+            assert expected_is_ancestor == git.is_ancestor(first, second)
+            assert run(f"git merge-base {first} {second}") == git.merge_base(first, second)
+    for revision in revisions:
+        assert run(f"git rev-list {revision}").split() == list(git.walk_commit_ids(revision))
+    git.close()
+
+
+def test_commit_graph_file_matches_objects(repo):
+    run("git commit-graph write --reachable")
+    commit_graph = CommitGraphFile(objects_dir)
+    assert len(all_commit_ids()) == len(commit_graph)
+    for commit_id in all_commit_ids():
+        position = commit_graph.lookup(commit_id)
+        assert commit_id == commit_graph.commit_id(position)
+        tree, parents, generation, commit_time = commit_graph.commit_data(position)
+        assert run(f"git rev-parse {commit_id}^{{tree}}") == tree
+        assert run(f"git rev-list --no-walk --parents {commit_id}").split()[1:] == [
+            commit_graph.commit_id(x) for x in parents
+        ]
+        assert int(run(f"git log -1 --format=%ct {commit_id}")) == commit_time
+        assert generation == 1 + max([commit_graph.generation(x) for x in parents], default=0)
+    assert commit_graph.lookup("0" * 40) is None
+    commit_graph.close()
+
+
+def test_without_commit_graph(repo):
+    assert not CommitGraphFile.find_paths(objects_dir)
+    assert_matches_git()
+
+
+def test_single_commit_graph(repo):
+    run("git commit-graph write --reachable")
+    assert_matches_git()
+
+
+def test_split_commit_graph_and_commits_outside_graph(repo):
+    run("git checkout -q -b e master~2")
+    run("git commit-graph write --reachable --split=no-merge")
+    commit("e 0", 1700000000)
+    run("git commit-graph write --reachable --split=no-merge")
+    commit("e 1", 1700000100)
+    assert 2 == len(CommitGraphFile.find_paths(objects_dir))
+    assert_matches_git()
+    git = Git(repo_dir)
+    assert git.is_ancestor("master~2", "e")
+    assert run("git rev-parse master~2") == git.merge_base("e", "master")
+
+
+@pytest.mark.parametrize("x_count", [1, 2])
+def test_merge_base_of_criss_cross_merges(repo, x_count):
+    run("git checkout -q -b x master")
+    for i in range(x_count):
+        commit(f"x {i}", 1700000100 + i)
+    run("git checkout -q -b y master")
+    commit("y 0", 1700000200)
+    merge("x", 1700000300)
+    run("git checkout -q x")
+    merge("y~1", 1700000400)
+    run("git commit-graph write --reachable")
+    git = Git(repo_dir)
+    assert run("git merge-base x y") == git.merge_base("x", "y")
+    assert run("git merge-base y x") == git.merge_base("y", "x")
+    git.close()
+
+
+def test_walk_limited_by_date_and_generation(repo):
+    run("git commit-graph write --reachable")
+    git = Git(repo_dir)
+    since = datetime.datetime.fromtimestamp(1600000900, tz=datetime.timezone.utc)
+    assert run("git rev-list --since=1600000900 master").split() == list(
+        git.walk_commit_ids("master", since=since)
+    )
+    commit_graph = CommitGraphFile(objects_dir)
+    commit_ids = list(git.walk_commit_ids("master", min_generation=5))
+    assert commit_ids
+    assert all(commit_graph.generation(commit_graph.lookup(x)) >= 5 for x in commit_ids)
+    commit_graph.close()
+    git.close()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.repository import Git
+from atudomain.git.search import CommitSearchIndex
+from atudomain.git.search import tokenize
+from tests import RESOURCES_DIR
+from tests import SANDBOX_DIR
+from tests.util import ResourceReader
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "search_repo")
+index_path = os.path.join(SANDBOX_DIR, "search_index", "index.sqlite")
+
+
+def commit(message, author="Test"):
+    subprocess.run(
+        ["git", "-c", f"user.name={author}", "commit", "-q", "--allow-empty", "-m", message],
+        cwd=repo_dir
+    )
+
+
+@pytest.fixture
+def index():
+    if os.path.isdir(os.path.dirname(index_path)):
+        shutil.rmtree(os.path.dirname(index_path))
+    commit_index = CommitSearchIndex(index_path)
+    yield commit_index
+    commit_index.close()
+    shutil.rmtree(os.path.dirname(index_path))
+
+
+@pytest.fixture
+def git():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init -q {repo_dir}", shell=True)
+    subprocess.run("git config user.email test@example.com", shell=True, cwd=repo_dir)
+    yield Git(repo_dir)
+    shutil.rmtree(repo_dir)
+
+
+def test_tokenize():
+    assert {"fix", "cve-2021-3156", "cve", "2021", "3156"} == tokenize("Fix CVE-2021-3156.")
+    assert {"anna@example.com", "anna", "example", "com"} == tokenize("anna@example.com")
+    assert {"łukasz", "иван", "李雷", "café"} == tokenize("Łukasz Иван 李雷 cafe\u0301")
+
+
+def test_search_parsed_commits(index):
+    commits = GitLogParser().extract_commits(
+        ResourceReader.read(file=os.path.join(RESOURCES_DIR, "test_GitLogParser", "test_extract_commits_2.txt"))
+    )
+    assert 4 == index.add_commits(commits, "example")
+    assert 0 == index.add_commits(commits, "example")
+    by_id = {x.commit_id: x for x in commits}
+    results = index.search("add")
+    assert ["Add c", "Add b"] == [by_id[x].message_subject for _, x in results][:2]
+    assert {"example"} == {x for x, _ in results}
+    assert [("example", commits[2].commit_id)] == index.search("body:spanning")
+    assert [] == index.search("subject:spanning")
+    assert [x.commit_id for x in commits] == [x for _, x in index.search("author:kowal*")]
+    assert [] == index.search("author:anna")
+    assert {commits[1].commit_id, commits[2].commit_id} == {x for _, x in index.search("subject:c OR subject:b")}
+    assert commits[2].commit_id not in [x for _, x in index.search("add -spanning")]
+    assert [] == index.search("add", repositories=["other"])
+    assert 1 == len(index.search("add", limit=1))
+
+
+def test_query_terms_are_tokenized(index, git):
+    commit("Fix parser crash, see (CVE-2021-3156)")
+    index.update(git, "repo")
+    for query in ["crash,", "(CVE-2021-3156)", "parser.", "subject:(cve*", "fix -(other)"]:
+        assert 1 == len(index.search(query)), query
+    assert [] == index.search("-crash,")
+    assert [] == index.search("...")
+
+
+def test_non_ascii_authors_and_messages(index, git):
+    commit("Poprawka błędu zapisu", author="Łukasz Żółw")
+    commit("Исправление ошибки", author="Иван Петров")
+    commit("修复 café", author="李雷")
+    index.update(git, "repo")
+    index.update(git, "other")
+    assert 1 == len(index.search("author:łukasz błędu", repositories=["repo"]))
+    assert 1 == len(index.search("author:ИВАН", repositories=["repo"]))
+    assert 1 == len(index.search("author:李雷 café", repositories=["repo"]))
+    assert 2 == len(index.search("author:ż* OR author:пет*", repositories=["other"]))
+    assert 2 == len(index.search("author:иван"))
+    assert [] == index.search("author:ukasz")
+
+
+def test_update_is_incremental(index, git):
+    commit("Fix PROJ-12 crash", author="Anna")
+    assert 1 == index.update(git, "repo")
+    commit("Fix CVE-2021-3156")
+    subprocess.run("git branch feature && git checkout -q feature", shell=True, cwd=repo_dir)
+    commit("Feature work for PROJ-12")
+    assert 2 == index.update(git, "repo")
+    assert 0 == index.update(git, "repo")
+    assert 2 == len(index.search("proj-12"))
+    assert 1 == len(index.search("cve-2021-3156"))
+    assert 1 == len(index.search("author:anna proj*"))
+    index.optimize()
+    assert 3 == len(index.search("fix OR feature"))
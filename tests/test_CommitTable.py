@@ -0,0 +1,91 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.repository import Git
+from tests import RESOURCES_DIR
+from tests import SANDBOX_DIR
+from tests.util import ResourceReader
+
+numpy = pytest.importorskip("numpy")
+
+from atudomain.git.table import CommitTable
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "table_repo")
+raw_log = ResourceReader.read(
+    file=os.path.join(RESOURCES_DIR, "test_GitLogParser", "test_extract_commits_2.txt")
+)
+
+
+def test_from_raw_log():
+    table = CommitTable.from_raw_log(raw_log)
+    commits = GitLogParser().extract_commits(raw_log)
+    assert len(commits) == len(table)
+    assert [x.commit_id.encode() for x in commits] == list(table.commit_ids)
+    assert [int(x.author_date.timestamp()) for x in commits] == list(table.author_timestamps)
+    assert [120] * len(commits) == list(table.author_offsets)
+    assert [("Jan Kowalski", "jan@example.com"), ("Anna Nowak", "anna@example.com")] == table.identities
+    assert [True, False, False, False] == list(table.is_merge)
+    assert [1, 2] == list(table.parents[table.parent_offsets[0]:table.parent_offsets[1]])
+    assert 0.25 == table.merge_ratio()
+    assert {("Anna Nowak", "anna@example.com"): 4} == table.count_by_identity("committer")
+
+
+def test_from_commits_matches_raw_log():
+    commits = GitLogParser().extract_commits(raw_log)
+    expected = CommitTable.from_raw_log(raw_log).to_structured_array()
+    structured_array = CommitTable.from_commits(commits).to_structured_array()
+    for name in ("commit_id", "author_timestamp", "author_id", "committer_id", "parent_count", "is_merge"):
+        assert list(expected[name]) == list(structured_array[name])
+
+
+def test_histograms_and_resample():
+    day = 24 * 60 * 60
+    # 1970-01-05 was Monday.
+    monday = 4 * day
+    table = CommitTable(
+        commit_ids=numpy.array([b"c", b"b", b"a"]),
+        author_timestamps=numpy.array([monday + 8 * day + 3600, monday + day, monday], dtype=numpy.int64),
+        author_offsets=numpy.array([60, 0, 0], dtype=numpy.int16),
+        author_ids=numpy.array([1, 0, 0], dtype=numpy.int32),
+        committer_timestamps=numpy.array([monday + 8 * day, monday + day, monday], dtype=numpy.int64),
+        committer_offsets=numpy.array([0, 0, 0], dtype=numpy.int16),
+        committer_ids=numpy.array([0, 0, 0], dtype=numpy.int32),
+        parent_offsets=numpy.array([0, 1, 2, 2], dtype=numpy.int64),
+        parents=numpy.array([1, 2], dtype=numpy.int32),
+        identities=[("A", "a@example.com"), ("B", "b@example.com")]
+    )
+    assert [2, 0, 1] == list(table.hour_histogram()[:3])
+    assert [2, 1] == list(table.hour_histogram(local=False)[:2])
+    assert [1, 2, 0, 0, 0, 0, 0] == list(table.weekday_histogram())
+    starts, counts = table.resample()
+    assert [monday, monday + 7 * day] == list(starts)
+    assert [2, 1] == list(counts)
+    starts, counts = table.resample(period=day, by="author")
+    assert 9 == len(starts)
+    assert [[1, 1, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 0, 1]] == counts.tolist()
+    selected = table.select(table.author_timestamps < monday + 7 * day)
+    assert [b"b", b"a"] == list(selected.commit_ids)
+    assert [1] == list(selected.parents)
+    assert [0, 1, 1] == list(selected.parent_offsets)
+
+
+def test_get_commit_table():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init -q {repo_dir}", shell=True)
+    subprocess.run("git config user.name Test", shell=True, cwd=repo_dir)
+    subprocess.run("git config user.email test@example.com", shell=True, cwd=repo_dir)
+    for message in ("first", "second"):
+        subprocess.run(f"git commit -q --allow-empty -m {message}", shell=True, cwd=repo_dir)
+    git = Git(repo_dir)
+    table = git.get_commit_table()
+    assert [x.commit_id.encode() for x in git.get_commits()] == list(table.commit_ids)
+    assert [1, 0] == list(table.parent_counts)
+    assert [1] == list(table.parents)
+    assert 0 == len(git.get_commit_table(no_merges=True, paths=["missing"]))
+    shutil.rmtree(repo_dir)
@@ -0,0 +1,36 @@
+import os
+import pytest
+
+from atudomain.git.history import FileHistoryIndex
+from atudomain.git.parsers import GitLogParser
+from tests.util import ResourceReader
+from tests import RESOURCES_DIR
+
+
+MODULE_RESOURCES_DIR = os.path.join(RESOURCES_DIR, "test_GitLogParser")
+
+commits = GitLogParser().extract_commits_with_changes(
+    ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_with_changes_name_status.txt")
+    ),
+    "name-status"
+)
+
+
+def test_get_history() -> None:
+    file_history_index = FileHistoryIndex(commits)
+    assert {"b.txt", "a.txt", "bin.dat", "z", "sp ace.txt"} == set(file_history_index.paths)
+    assert ["two", "one"] == [x.message_subject for x in file_history_index.get_history("b.txt")]
+    assert ["two"] == [x.message_subject for x in file_history_index.get_history("b.txt", follow_renames=False)]
+    assert ["two", "one"] == [x.message_subject for x in file_history_index.get_history("a.txt")]
+    assert [] == file_history_index.get_history("missing")
+    assert ["R"] == [x[1].status for x in file_history_index.get_changes("b.txt")]
+
+
+def test_commits_without_changes() -> None:
+    with pytest.raises(ValueError):
+        FileHistoryIndex(
+            GitLogParser().extract_commits(
+                ResourceReader.read(file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_1.txt"))
+            )
+        )
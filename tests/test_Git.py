@@ -1,11 +1,17 @@
+import datetime
+import itertools
 import os
 import shutil
 import subprocess
+import time
 import pytest
 
+from atudomain.git.objects import NewCommit
 from atudomain.git.repository import Git
+from atudomain.git.repository import MissingObjectError
 from atudomain.git.repository import NoCommitsError
 from tests import SANDBOX_DIR
+from tests.util import CommitFields
 
 
 os.makedirs(SANDBOX_DIR, exist_ok=True)
@@ -48,6 +54,15 @@ def add_commits():
     subprocess.run(f"git commit -m 'test'", shell=True, cwd=repo_dir)
 
 
+def add_commits_with_messages(messages):
+    add_commits_with_messages_in(repo_dir, messages)
+
+
+def add_commits_with_messages_in(directory, messages):
+    for message in messages:
+        subprocess.run(f"git commit --allow-empty -m '{message}'", shell=True, cwd=directory)
+
+
 @pytest.fixture
 def git():
     create_repo()
@@ -97,6 +112,113 @@ def test_repo(git_with_commits):
     git_with_commits.get_branches()
 
 
+def test_empty_repo_iter_commits(git):
+    with pytest.raises(NoCommitsError):
+        list(git.iter_commits())
+
+
+def test_iter_commits(git_with_commits):
+    add_commits_with_messages(["second", "third"])
+    commits = list(git_with_commits.iter_commits())
+    assert [x.commit_id for x in git_with_commits.get_commits()] == [x.commit_id for x in commits]
+    assert ["third", "second", "test"] == [x.message for x in commits]
+
+
+def test_iter_commits_with_revision_list(git_with_commits):
+    add_commits_with_messages(["second", "third"])
+    revisions = ["HEAD", "^HEAD~2"]
+    assert [x.commit_id for x in git_with_commits.get_commits(revisions)] == [
+        x.commit_id for x in git_with_commits.iter_commits(revisions)
+    ]
+    assert ["third", "second"] == [x.message for x in git_with_commits.iter_commits(revisions)]
+
+
+def test_iter_commits_stopped_early(git_with_commits):
+    add_commits_with_messages(["second", "third"])
+    commits = list(itertools.islice(git_with_commits.iter_commits(), 1))
+    assert ["third"] == [x.message for x in commits]
+
+
+def test_empty_repo_machine_format(git):
+    with pytest.raises(NoCommitsError):
+        git.get_commits(log_format="machine")
+    with pytest.raises(NoCommitsError):
+        list(git.iter_commits(log_format="machine"))
+
+
+def test_unknown_log_format(git_with_commits):
+    with pytest.raises(ValueError):
+        git_with_commits.get_commits(log_format="oneline")
+
+
+def test_machine_format_matches_raw_format(git_with_commits):
+    add_commits_with_messages(["second\n\nbody of second", "third"])
+    raw_commits = git_with_commits.get_commits()
+    machine_git = Git(repo_dir, log_format="machine")
+    assert [CommitFields.extract(x) for x in raw_commits] == [
+        CommitFields.extract(x) for x in machine_git.get_commits()
+    ]
+    assert [CommitFields.extract(x) for x in raw_commits] == [
+        CommitFields.extract(x) for x in git_with_commits.iter_commits(log_format="machine")
+    ]
+
+
+def test_lazy_commits(git_with_commits):
+    add_commits_with_messages(["second\n\nbody of second", "third"])
+    commits = git_with_commits.get_commits()
+    for log_format in ["raw", "machine"]:
+        assert [CommitFields.extract(x) for x in commits] == [
+            CommitFields.extract(x) for x in git_with_commits.get_commits(log_format=log_format, lazy=True)
+        ]
+
+
+def test_get_commit(git_with_commits):
+    add_commits_with_messages(["second\n\nbody of second", "third"])
+    commits = git_with_commits.get_commits()
+    assert CommitFields.extract(commits[1]) == CommitFields.extract(
+        git_with_commits.get_commit(commits[1].commit_id)
+    )
+    assert CommitFields.extract(commits[0]) == CommitFields.extract(
+        git_with_commits.get_commit("HEAD")
+    )
+
+
+def test_get_commits_by_id(git_with_commits):
+    add_commits_with_messages(["second", "third"])
+    commits = git_with_commits.get_commits()
+    commit_ids = [x.commit_id for x in reversed(commits)] * 100
+    assert commit_ids == [x.commit_id for x in git_with_commits.get_commits_by_id(commit_ids)]
+    with pytest.raises(MissingObjectError):
+        git_with_commits.get_commits_by_id([commits[0].commit_id, "0" * 40])
+    with pytest.raises(ValueError):
+        git_with_commits.get_commit("HEAD^{tree}")
+
+
+def test_read_object_and_object_info(git_with_commits):
+    object_info, data = git_with_commits.read_object("HEAD:testfile")
+    assert "blob" == object_info.object_type
+    assert b"test\n" == data
+    assert [object_info, None] == git_with_commits.object_info([object_info.object_id, "0" * 40])
+    with pytest.raises(MissingObjectError):
+        git_with_commits.read_object("HEAD:missing")
+
+
+def test_cat_file_restarts_after_crash(git_with_commits):
+    commit_id = git_with_commits.get_commit("HEAD").commit_id
+    for process in git_with_commits._git_cat_file._processes.values():
+        process.kill()
+        process.wait()
+    assert commit_id == git_with_commits.get_commit("HEAD").commit_id
+
+
+def test_context_manager_closes_cat_file(git_with_commits):
+    with git_with_commits as git:
+        git.get_commit("HEAD")
+        processes = list(git._git_cat_file._processes.values())
+    assert processes
+    assert all(x.poll() is not None for x in processes)
+
+
 def test_create_commit_and_get_commits(git):
     subprocess.run(f"echo '{test_file_content}' > test_create.txt", shell=True, cwd=repo_dir)
     git.add_files("test_create.txt")
@@ -110,3 +232,155 @@ def test_push_and_pull(git_with_origin):
     git_with_origin.commit(test_file_content)
     git_with_origin.push()
     git_with_origin.pull()
+
+
+def test_get_branch_details(git_with_origin):
+    add_commits_with_messages_in(clone_repo_dir, ["pushed"])
+    git_with_origin.push(set_upstream=True, branch="master")
+    add_commits_with_messages_in(clone_repo_dir, ["ahead"])
+    branches = git_with_origin.get_branch_details(ahead_behind=True)
+    assert git_with_origin.get_branches() == [x.name for x in branches]
+    master = branches[0]
+    head = git_with_origin.get_commit("HEAD")
+    assert ("master", head.commit_id, head.committer_date) == (master.name, master.commit_id, master.committer_date)
+    assert ("Test", "test@example.com") == (master.author, master.author_email)
+    assert ("remotes/origin/master", 1, 0) == (master.upstream, master.ahead, master.behind)
+    assert [] == git_with_origin.get_branch_details(exclude="master")
+    assert git_with_origin.get_branch_details()[0].ahead is None
+
+
+def test_get_commits_with_changes(git_with_commits):
+    subprocess.run("git mv testfile renamed && echo 'more' >> renamed", shell=True, cwd=repo_dir)
+    subprocess.run("git commit -qam rename", shell=True, cwd=repo_dir)
+    commits = git_with_commits.get_commits(changes="numstat")
+    assert [x.commit_id for x in git_with_commits.get_commits()] == [x.commit_id for x in commits]
+    assert [("renamed", "testfile", 1, 0)] == [(x.path, x.old_path, x.added, x.deleted) for x in commits[0].changes]
+    commits = git_with_commits.get_commits("HEAD~1", changes="name-status")
+    assert [("testfile", "A")] == [(x.path, x.status) for x in commits[0].changes]
+    with pytest.raises(ValueError):
+        git_with_commits.get_commits(changes="stat")
+
+
+def test_create_commits(git_bare):
+    git_bare.config("user.name", "Committer")
+    git_bare.config("user.email", "committer@example.com")
+    date = datetime.datetime(2020, 1, 1, 12, tzinfo=datetime.timezone(datetime.timedelta(hours=1)))
+    commit_ids = git_bare.create_commits([
+        NewCommit("first", files={"a.txt": "a", "b.bin": b"\0b"}, branch="master", parents=[],
+                  author="Author", author_email="author@example.com", author_date=date),
+        NewCommit("second", files={"a.txt": None}, branch="master"),
+        NewCommit("side", files={"c.txt": "c"}, branch="side", parents=[0]),
+        NewCommit("merge", branch="master", parents=[1, 2]),
+    ])
+    commits = {x.commit_id: x for x in git_bare.get_commits("master")}
+    assert set(commit_ids) == set(commits)
+    assert [commit_ids[1], commit_ids[2]] == list(commits[commit_ids[3]].parents)
+    first = commits[commit_ids[0]]
+    assert ("Author", "author@example.com", date) == (first.author, first.author_email, first.author_date)
+    assert ("Committer", "committer@example.com") == (first.committer, first.committer_email)
+    assert ["b.bin"] == git_bare._run(["ls-tree", "--name-only", "master"]).stdout.split()
+    assert ["a.txt", "b.bin", "c.txt"] == git_bare._run(["ls-tree", "--name-only", "side"]).stdout.split()
+    assert commit_ids[2] == git_bare.get_branch_refs()["side"]
+
+
+def test_create_commits_continues_branch(git_with_commits):
+    head = git_with_commits.get_commit("HEAD")
+    commit_ids = git_with_commits.create_commits([NewCommit(f"bulk {x}") for x in range(3)])
+    commits = git_with_commits.get_commits("HEAD")
+    assert commit_ids[::-1] + [head.commit_id] == [x.commit_id for x in commits]
+    assert ("Test", "test@example.com") == (commits[0].author, commits[0].author_email)
+    with pytest.raises(subprocess.CalledProcessError):
+        git_with_commits.create_commits([NewCommit("root", parents=[])])
+    assert commit_ids[-1] == git_with_commits.get_commit("HEAD").commit_id
+    with pytest.raises(ValueError):
+        git_with_commits.create_commits([NewCommit("bad", parents=[0])])
+
+
+def test_get_commits_binary(git_with_commits):
+    subprocess.run("git config i18n.commitEncoding ISO-8859-1", shell=True, cwd=repo_dir)
+    with open(os.path.join(repo_dir, "message.txt"), "wb") as f:
+        f.write("Caf\u00e9".encode("latin-1"))
+    subprocess.run("git commit -q --allow-empty -F message.txt", shell=True, cwd=repo_dir)
+    commits = git_with_commits.get_commits(binary=True)
+    assert "Caf\u00e9" == commits[0].message
+    subprocess.run("git config --unset i18n.commitEncoding", shell=True, cwd=repo_dir)
+    assert [CommitFields.extract(x) for x in git_with_commits.get_commits()] == [
+        CommitFields.extract(x) for x in commits
+    ]
+    with pytest.raises(NoCommitsError):
+        git_with_commits.get_commits("missing", binary=True)
+
+
+def test_get_commits_with_query(git_with_commits):
+    add_commits_with_messages(["second", "third", "fourth"])
+    subprocess.run("git checkout -q -b feature && git commit -q --allow-empty -m feature", shell=True, cwd=repo_dir)
+    messages = lambda commits: [x.message for x in commits]
+    assert ["third", "second"] == messages(git_with_commits.get_commits("master", max_count=2, skip=1))
+    assert ["feature", "fourth"] == messages(git_with_commits.get_commits(["feature", "^master~1"]))
+    assert ["third"] == messages(git_with_commits.get_commits(grep="^thi"))
+    assert ["test"] == messages(git_with_commits.get_commits(paths=["testfile"]))
+    assert [] == git_with_commits.get_commits(author="nobody")
+    assert [] == git_with_commits.get_commits(until=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc))
+    assert 5 == len(git_with_commits.get_commits(since="2000-01-01", binary=True))
+    assert ["testfile"] == [x.path for x in git_with_commits.get_commits(paths=["testfile"], changes="numstat")[0].changes]
+
+
+def test_get_commits_page(git_with_commits):
+    add_commits_with_messages(["second", "third", "fourth", "fifth"])
+    expected = git_with_commits.get_commits()
+    commands = list()
+    run = git_with_commits._run
+
+    def recording_run(command, *args, **kwargs):
+        commands.append(command)
+        return run(command, *args, **kwargs)
+
+    git_with_commits._run = recording_run
+    page = git_with_commits.get_commits_page(page_size=2)
+    pages = [page.commits]
+    while page.next_cursor is not None:
+        add_commits_with_messages(["added while paging"])
+        page = git_with_commits.get_commits_page(cursor=page.next_cursor, page_size=2)
+        pages.append(page.commits)
+    assert [2, 2, 1] == [len(x) for x in pages]
+    assert not [x for command in commands for x in command if x.startswith("--skip")]
+    assert [x.commit_id for x in expected] == [x.commit_id for commits in pages for x in commits]
+    assert ["fifth"] == [x.message for x in git_with_commits.get_commits_page(["HEAD", "^HEAD~4"], grep="fifth").commits]
+    with pytest.raises(ValueError):
+        git_with_commits.get_commits_page(cursor="--all")
+
+
+def test_get_commits_page_of_merged_branches(git_with_commits):
+    def commit(message, timestamp, file_name=None):
+        if file_name is not None:
+            with open(os.path.join(repo_dir, file_name), "a") as f:
+                f.write(message)
+            subprocess.run(f"git add {file_name}", shell=True, cwd=repo_dir)
+        subprocess.run(
+            f"GIT_COMMITTER_DATE='{start + timestamp} +0000' git commit -q --allow-empty -m '{message}'",
+            shell=True,
+            cwd=repo_dir
+        )
+
+    def collect_pages(page_size, **kwargs):
+        page = git_with_commits.get_commits_page(page_size=page_size, **kwargs)
+        commit_ids = [x.commit_id for x in page.commits]
+        while page.next_cursor is not None:
+            page = git_with_commits.get_commits_page(cursor=page.next_cursor, page_size=page_size, **kwargs)
+            commit_ids += [x.commit_id for x in page.commits]
+        return commit_ids
+
+    start = int(time.time()) + 1000
+    subprocess.run("git checkout -q -b feature", shell=True, cwd=repo_dir)
+    for i in range(4):
+        commit(f"feature {i}", 200 * i + 100, "feature.txt" if i % 2 else None)
+    subprocess.run("git checkout -q -", shell=True, cwd=repo_dir)
+    for i in range(4):
+        commit(f"master {i}", 200 * i + 200, "master.txt" if i % 2 else None)
+    subprocess.run(
+        f"GIT_COMMITTER_DATE='{start + 1000} +0000' git merge -q --no-ff -m merge feature", shell=True, cwd=repo_dir
+    )
+    for query in [dict(), dict(paths=["feature.txt"]), dict(first_parent=True), dict(no_merges=True, grep="feature")]:
+        expected = [x.commit_id for x in git_with_commits.get_commits(**query)]
+        for page_size in [1, 2, 3]:
+            assert expected == collect_pages(page_size, **query), (query, page_size)
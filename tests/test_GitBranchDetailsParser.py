@@ -0,0 +1,56 @@
+import datetime
+import os
+import re
+
+from atudomain.git.objects import BranchDetails
+from atudomain.git.parsers import GitBranchDetailsParser
+from tests.util import ResourceReader
+from tests import RESOURCES_DIR
+
+
+MODULE_RESOURCES_DIR = os.path.join(RESOURCES_DIR, "test_GitBranchDetailsParser")
+
+git_branch_details_parser = GitBranchDetailsParser()
+
+
+def test_extract_branch_details() -> None:
+    for_each_ref_string = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_branch_details_1.txt")
+    )
+    branches = git_branch_details_parser.extract_branch_details(for_each_ref_string)
+    assert [
+        "feature",
+        "master",
+        "orphan",
+        "stale",
+        "remotes/origin/feature",
+        "remotes/origin/master"
+    ] == [x.name for x in branches]
+    assert BranchDetails(
+        name="feature",
+        commit_id="a" * 40,
+        committer_date=datetime.datetime(2019, 11, 8, 21, 53, 19, tzinfo=datetime.timezone.utc),
+        author="Jan Kowalski",
+        author_email="jan.kowalski@example.com",
+        upstream="remotes/origin/feature",
+        ahead=2,
+        behind=1
+    ) == branches[0]
+    assert (0, 0) == (branches[1].ahead, branches[1].behind)
+    assert branches[2].upstream is None
+    assert (None, None) == (branches[2].ahead, branches[2].behind)
+    assert "remotes/origin/stale" == branches[3].upstream
+    assert (None, None) == (branches[3].ahead, branches[3].behind)
+    assert branches[1].author is branches[2].author
+
+
+def test_extract_branch_details_filters() -> None:
+    for_each_ref_string = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_branch_details_1.txt")
+    )
+    branches = git_branch_details_parser.extract_branch_details(
+        for_each_ref_string,
+        include_search=re.compile("^remotes/").search,
+        exclude_search=re.compile("master").search
+    )
+    assert ["remotes/origin/feature"] == [x.name for x in branches]
@@ -0,0 +1,104 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.commandcache import GitCommandCache
+from atudomain.git.commandcache import is_cacheable
+from atudomain.git.commandcache import is_read_only
+from atudomain.git.repository import Git
+from atudomain.git.repository import NoCommitsError
+from tests import SANDBOX_DIR
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "command_cache_repo")
+
+
+def commit(message):
+    subprocess.run(f"git commit -q --allow-empty -m '{message}'", shell=True, cwd=repo_dir)
+
+
+@pytest.fixture
+def git():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init -q {repo_dir}", shell=True)
+    subprocess.run("git config user.name Test", shell=True, cwd=repo_dir)
+    subprocess.run("git config user.email test@example.com", shell=True, cwd=repo_dir)
+    commit("first")
+    yield Git(repo_dir, command_cache=True)
+    shutil.rmtree(repo_dir)
+
+
+def test_is_read_only():
+    assert is_read_only(["log", "--pretty=raw"])
+    assert is_read_only(["branch", "--all"])
+    assert not is_read_only(["branch", "-d", "feature"])
+    assert not is_read_only(["commit", "-m", "message"])
+    assert not is_read_only([])
+    assert is_read_only(["symbolic-ref", "--short", "HEAD"])
+    assert not is_read_only(["symbolic-ref", "HEAD", "refs/heads/feature"])
+    assert not is_read_only(["symbolic-ref", "-m", "reason", "HEAD", "refs/heads/feature"])
+    assert not is_read_only(["symbolic-ref", "--delete", "HEAD"])
+
+
+def test_is_cacheable():
+    assert is_cacheable(["log", "--since=2020-01-01T10:00:00+02:00", "--until", "1600000000"])
+    assert not is_cacheable(["log", "--since=2 weeks ago"])
+    assert not is_cacheable(["log", "--until", "yesterday"])
+    assert not is_cacheable(["log", "master@{2.weeks.ago}"])
+    assert not is_cacheable(["symbolic-ref", "HEAD", "refs/heads/feature"])
+
+
+def test_relative_dates_are_not_cached(git):
+    assert 1 == len(git.get_commits(since="1 year ago"))
+    assert 1 == len(git.get_commits(since="1 year ago"))
+    assert (0, 0, 0) == (git.command_cache.hits, git.command_cache.misses, len(git.command_cache))
+
+
+def test_repeated_commands_hit_cache(git):
+    assert ["first"] == [x.message_subject for x in git.get_commits()]
+    misses = git.command_cache.misses
+    assert ["first"] == [x.message_subject for x in git.get_commits()]
+    assert ["master"] == git.get_branches()
+    assert ["master"] == git.get_branches()
+    assert (2, misses + 1) == (git.command_cache.hits, git.command_cache.misses)
+
+
+def test_ref_changes_invalidate_cache(git):
+    git.get_commits()
+    commit("outside")
+    assert ["outside", "first"] == [x.message_subject for x in git.get_commits()]
+    with open(os.path.join(repo_dir, "file.txt"), "w") as f:
+        f.write("inside")
+    git.add_files("file.txt")
+    git.get_commits()
+    git.commit("inside")
+    assert 0 == len(git.command_cache)
+    assert "inside" == git.get_commits()[0].message_subject
+    subprocess.run("git branch feature", shell=True, cwd=repo_dir)
+    assert ["feature", "master"] == git.get_branches()
+    assert 0 == git.command_cache.hits
+
+
+def test_failed_commands_are_cached(git):
+    with pytest.raises(NoCommitsError):
+        git.get_commits("missing")
+    with pytest.raises(NoCommitsError):
+        git.get_commits("missing")
+    assert 1 == git.command_cache.hits
+
+
+def test_size_bounded_eviction(git):
+    cache = GitCommandCache(os.path.join(repo_dir, ".git"), max_size=10)
+    key = cache.build_key(["log"])
+    assert cache.get(key) is None
+    cache.put(key, subprocess.CompletedProcess(["log"], 0, "123456", ""))
+    other_key = cache.build_key(["branch"])
+    cache.put(other_key, subprocess.CompletedProcess(["branch"], 0, "123456", ""))
+    assert (1, 6) == (len(cache), cache.size)
+    assert cache.get(key) is None
+    assert cache.get(other_key) is not None
+    cache.put(cache.build_key(["show"]), subprocess.CompletedProcess(["show"], 0, "12345678901", ""))
+    assert 1 == len(cache)
@@ -0,0 +1,132 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.repository import Git
+from atudomain.git.repository import NoCommitsError
+from tests import SANDBOX_DIR
+from tests.util import CommitFields
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "commit_cache_repo")
+cache_dir = os.path.join(SANDBOX_DIR, "commit_cache")
+
+
+def run(command):
+    subprocess.run(command, shell=True, cwd=repo_dir, check=True, stdout=subprocess.DEVNULL)
+
+
+def add_commits(messages):
+    for message in messages:
+        run(f"git commit -q --allow-empty -m '{message}'")
+
+
+class CountingGit(Git):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parsed = list()
+
+    def _get_commits(self, revisions, log_format):
+        commits = super()._get_commits(revisions, log_format)
+        self.parsed += commits
+        return commits
+
+
+@pytest.fixture
+def repo():
+    shutil.rmtree(repo_dir, ignore_errors=True)
+    subprocess.run(f"git init -q {repo_dir}", shell=True, check=True)
+    run("git config user.name 'Test Example'")
+    run("git config user.email test@example.com")
+    yield repo_dir
+    shutil.rmtree(repo_dir)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def assert_matches_uncached(commits, revision_range=""):
+    assert [CommitFields.extract(x) for x in Git(repo_dir).get_commits(revision_range)] == [
+        CommitFields.extract(x) for x in commits
+    ]
+
+
+def test_empty_repo(repo):
+    with pytest.raises(NoCommitsError):
+        Git(repo_dir, commit_cache=True).get_commits()
+
+
+def test_unchanged_history_is_not_parsed_again(repo):
+    add_commits(["first", "second\n\nbody"])
+    git = CountingGit(repo_dir, commit_cache=True)
+    assert_matches_uncached(git.get_commits())
+    assert 2 == len(git.parsed)
+    assert_matches_uncached(git.get_commits())
+    assert 2 == len(git.parsed)
+    assert os.path.isfile(os.path.join(repo_dir, ".git", "atudomain-git-commits.sqlite"))
+
+
+def test_only_new_commits_are_parsed(repo):
+    add_commits(["first", "second"])
+    git = CountingGit(repo_dir, commit_cache=True)
+    git.get_commits()
+    add_commits(["third", "fourth"])
+    commits = git.get_commits()
+    assert_matches_uncached(commits)
+    assert ["second", "first", "fourth", "third"] == [x.message for x in git.parsed]
+
+
+def test_fast_forward_to_merge_of_older_commits(repo):
+    def commit(message, timestamp):
+        run(f"GIT_COMMITTER_DATE='{1600000000 + timestamp} +0000' git commit -q --allow-empty -m '{message}'")
+
+    commit("base", 1000)
+    run("git branch feature")
+    commit("m1", 2000)
+    commit("m2", 4000)
+    git = CountingGit(repo_dir, commit_cache=True)
+    git.get_commits()
+    run("git checkout -q feature")
+    commit("f1", 1500)
+    commit("f2", 3000)
+    run("git checkout -q master")
+    run("GIT_COMMITTER_DATE='1600005000 +0000' git merge -q --no-ff -m merge feature")
+    commits = git.get_commits()
+    assert_matches_uncached(commits)
+    assert ["merge", "m2", "f2", "m1", "f1", "base"] == [x.message for x in commits]
+
+
+def test_revision_options_bypass_cache(repo):
+    add_commits(["first"])
+    run("git branch feature")
+    run("git checkout -q feature")
+    add_commits(["second"])
+    git = Git(repo_dir, commit_cache=True)
+    assert_matches_uncached(git.get_commits("--all"), "--all")
+    assert_matches_uncached(git.get_commits("feature^@"), "feature^@")
+    assert_matches_uncached(git.get_commits("master...feature"), "master...feature")
+
+
+def test_rewritten_history_invalidates_cache(repo):
+    add_commits(["first", "second"])
+    git = Git(repo_dir, commit_cache=True)
+    git.get_commits()
+    run("git commit -q --amend --allow-empty -m 'amended'")
+    commits = git.get_commits()
+    assert_matches_uncached(commits)
+    assert "amended" == commits[0].message
+
+
+def test_ranges_and_cache_directory(repo):
+    add_commits(["first", "second", "third"])
+    first_git = Git(repo_dir, commit_cache_directory=cache_dir)
+    assert_matches_uncached(first_git.get_commits("HEAD~2..HEAD"), "HEAD~2..HEAD")
+    first_git.close()
+    add_commits(["fourth"])
+    second_git = CountingGit(repo_dir, commit_cache_directory=cache_dir)
+    assert_matches_uncached(second_git.get_commits("HEAD~3..HEAD"), "HEAD~3..HEAD")
+    assert_matches_uncached(second_git.get_commits("HEAD~3..HEAD"), "HEAD~3..HEAD")
+    assert 3 == len(second_git.parsed)
+    assert_matches_uncached(list(second_git.iter_commits("HEAD~2")), "HEAD~2")
+    assert 3 == len(second_git.parsed)
+    assert 1 == len(os.listdir(cache_dir))
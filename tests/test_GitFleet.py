@@ -0,0 +1,81 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import pytest
+
+from atudomain.git.fleet import GitFleet
+from atudomain.git.repository import Git
+from atudomain.git.repository import NoCommitsError
+from atudomain.git.repository import NotARepositoryError
+from tests import SANDBOX_DIR
+
+
+fleet_dir = os.path.join(SANDBOX_DIR, "fleet")
+
+
+def create_repo(name, messages):
+    directory = os.path.join(fleet_dir, name)
+    subprocess.run(f"git init {directory}", shell=True)
+    subprocess.run(f"git config user.name Test Example", shell=True, cwd=directory)
+    subprocess.run(f"git config user.email test@example.com", shell=True, cwd=directory)
+    for message in messages:
+        subprocess.run(f"git commit --allow-empty -m '{message}'", shell=True, cwd=directory)
+    return directory
+
+
+@pytest.fixture
+def directories():
+    if os.path.isdir(fleet_dir):
+        shutil.rmtree(fleet_dir)
+    first = create_repo("first", ["first 1", "first 2"])
+    subprocess.run("git branch feature", shell=True, cwd=first)
+    second = create_repo("second", ["second 1"])
+    empty = create_repo("empty", [])
+    not_a_repo = tempfile.mkdtemp()
+    yield [first, second, empty, not_a_repo]
+    shutil.rmtree(fleet_dir)
+    shutil.rmtree(not_a_repo)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_get_commits(directories, executor):
+    first, second, empty, not_a_repo = directories
+    results = {x.directory: x for x in GitFleet(directories, max_workers=2, executor=executor).get_commits()}
+    assert set(directories) == set(results)
+    assert ["first 2", "first 1"] == [x.message for x in results[first].value]
+    assert results[first].error is None
+    assert ["second 1"] == [x.message for x in results[second].value]
+    assert isinstance(results[empty].error, NoCommitsError)
+    assert isinstance(results[not_a_repo].error, NotARepositoryError)
+    assert results[not_a_repo].value is None
+
+
+def test_get_branches(directories):
+    first, second, empty, not_a_repo = directories
+    results = {x.directory: x for x in GitFleet(directories).get_branches(exclude="^feature$")}
+    assert ["master"] == results[first].value
+    assert [] == results[empty].value
+    assert isinstance(results[not_a_repo].error, NotARepositoryError)
+
+
+def test_get_latest_commits(directories):
+    first, second, empty, not_a_repo = directories
+    results = {x.directory: x for x in GitFleet(directories, executor="process").get_latest_commits()}
+    head = Git(first).get_commit("HEAD")
+    assert {"feature": head, "master": head} == results[first].value
+    assert {"master"} == set(results[second].value)
+    assert {} == results[empty].value
+
+
+def test_get_latest_commits_with_tag_named_like_branch(directories):
+    first = directories[0]
+    subprocess.run("git tag feature HEAD~1", shell=True, cwd=first)
+    results = {x.directory: x for x in GitFleet([first]).get_latest_commits()}
+    head = Git(first).get_commit("HEAD")
+    assert {"feature": head, "master": head} == results[first].value
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        GitFleet([], executor="fiber")
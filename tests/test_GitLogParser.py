@@ -1,9 +1,13 @@
 import datetime
 import os
+import tracemalloc
 import unittest
 
 from atudomain.git.objects import Commit
+from atudomain.git.objects import FileChange
+from atudomain.git import parsers
 from atudomain.git.parsers import GitLogParser
+from tests.util import CommitFields
 from tests.util import ResourceReader
 from tests import RESOURCES_DIR
 
@@ -57,3 +61,201 @@ def test_extract_commits() -> None:
     )
 
     assert commit == commits[0]
+
+
+def test_iter_commits() -> None:
+    raw_log_string_1 = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_1.txt")
+    )
+
+    commits = list(git_log_parser.iter_commits(
+        raw_log_lines=raw_log_string_1.splitlines(keepends=True)
+    ))
+
+    assert git_log_parser.extract_commits(raw_log_string=raw_log_string_1) == commits
+    assert [
+        "Added tests",
+        "Added README and fixed splitting messages only with subject",
+        "Added method for getting branch names as a list",
+        "Refactor",
+        "First release"
+    ] == [x.message for x in commits]
+
+
+def _generate_raw_log_lines(
+        count: int
+):
+    for i in range(count):
+        yield f"commit {i + 1:040x}\n"
+        yield f"tree {0:040x}\n"
+        yield f"parent {i + 2:040x}\n"
+        yield f"author Author {i % 10} <author{i % 10}@example.com> {1600000000 + i} +0000\n"
+        yield f"committer Author {i % 10} <author{i % 10}@example.com> {1600000000 + i} +0000\n"
+        yield "\n"
+        yield f"    Commit {i}\n"
+
+
+def _measure_iter_commits_peak(
+        count: int
+) -> int:
+    tracemalloc.start()
+    try:
+        for _ in git_log_parser.iter_commits(_generate_raw_log_lines(count)):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_commits_memory_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(parsers, "STREAM_IDENTITIES_LIMIT", 1000)
+
+    short_peak = _measure_iter_commits_peak(2000)
+    long_peak = _measure_iter_commits_peak(20000)
+
+    assert long_peak < 2 * short_peak
+
+
+def test_extract_commits_matches_regex_engine() -> None:
+    for resource in ["test_extract_commits_1.txt", "test_extract_commits_2.txt"]:
+        raw_log_string = ResourceReader.read(
+            file=os.path.join(f"{MODULE_RESOURCES_DIR}", resource)
+        )
+        assert [
+            CommitFields.extract(x) for x in git_log_parser._extract_commits_regex(raw_log_string)
+        ] == [
+            CommitFields.extract(x) for x in git_log_parser.extract_commits(raw_log_string)
+        ]
+
+
+def test_extract_commits_from_bytes() -> None:
+    for resource in ["test_extract_commits_1.txt", "test_extract_commits_2.txt"]:
+        raw_log_string = ResourceReader.read(
+            file=os.path.join(f"{MODULE_RESOURCES_DIR}", resource)
+        )
+        assert [
+            CommitFields.extract(x) for x in git_log_parser.extract_commits(raw_log_string)
+        ] == [
+            CommitFields.extract(x) for x in git_log_parser.extract_commits_from_bytes(raw_log_string.encode())
+        ]
+
+
+def test_extract_commits_from_bytes_encoding() -> None:
+    raw_log_bytes = (
+        "commit 6b934071528ebac0cf38cb051121228d268d9ed6\n"
+        "tree 20c24b3631ef204a9820e808847eec9cfc787055\n"
+        "author J\u00f6rg <jorg@example.com> 1573250000 +0100\n"
+        "committer J\u00f6rg <jorg@example.com> 1573250000 +0100\n"
+        "encoding ISO-8859-1\n"
+        "\n"
+        "    Caf\u00e9\n"
+        "\n"
+        "commit a726619390acd3989a7e1b07b4cebf7da952ddbd\n"
+        "tree 20c24b3631ef204a9820e808847eec9cfc787055\n"
+        "author Anna <anna@example.com> 1573240000 +0100\n"
+        "committer Anna <anna@example.com> 1573240000 +0100\n"
+        "\n"
+    ).encode("latin-1") + b"    Broken \xff\n"
+    commits = git_log_parser.extract_commits_from_bytes(raw_log_bytes)
+    assert ["J\u00f6rg", "Anna"] == [x.author for x in commits]
+    assert ["Caf\u00e9", "Broken \ufffd"] == [x.message for x in commits]
+
+
+def test_extract_commits_merge_and_signature() -> None:
+    raw_log_string_2 = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_2.txt")
+    )
+
+    commits = git_log_parser.extract_commits(
+        raw_log_string=raw_log_string_2
+    )
+
+    assert 4 == len(commits)
+    assert commits[0].is_merge
+    assert (
+        "96f9c0fef3630bd95a4f8cdc642ae2d97615a5c6",
+        "4c806583d7e32ff3ecb595e95eca0824f809114c"
+    ) == commits[0].parents
+    assert "Add c" == commits[1].message
+    assert "Add b" == commits[2].message_subject
+    assert "Longer description of b\nspanning two lines.\n\n    Indented block." == commits[2].message_body
+    assert "Jan Kowalski" == commits[3].author
+    assert "anna@example.com" == commits[3].committer_email
+
+
+def test_extract_commits_compact_layout() -> None:
+    raw_log_string_2 = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_2.txt")
+    )
+
+    commits = git_log_parser.extract_commits(
+        raw_log_string=raw_log_string_2
+    )
+
+    assert not hasattr(commits[0], "__dict__")
+    assert isinstance(commits[0].parents, tuple)
+    assert commits[0].author is commits[3].author
+    assert commits[0].author_email is commits[3].author_email
+    assert commits[0].parents[0] is commits[1].commit_id
+    assert commits[2].committer_date is commits[3].committer_date
+
+
+def test_extract_lazy_commits() -> None:
+    for resource in ["test_extract_commits_1.txt", "test_extract_commits_2.txt"]:
+        raw_log_string = ResourceReader.read(
+            file=os.path.join(f"{MODULE_RESOURCES_DIR}", resource)
+        )
+        lazy_commits = git_log_parser.extract_lazy_commits(raw_log_string)
+        assert [x.author_email for x in git_log_parser.extract_commits(raw_log_string)] == [
+            x.author_email for x in lazy_commits
+        ]
+        assert [
+            CommitFields.extract(x) for x in git_log_parser.extract_commits(raw_log_string)
+        ] == [
+            CommitFields.extract(x) for x in lazy_commits
+        ]
+    assert [] == git_log_parser.extract_lazy_commits("")
+
+
+def test_extract_commits_parallel() -> None:
+    raw_log_string = '\n'.join(
+        ResourceReader.read(file=os.path.join(f"{MODULE_RESOURCES_DIR}", x))
+        for x in ("test_extract_commits_1.txt", "test_extract_commits_2.txt")
+    )
+    expected = [CommitFields.extract(x) for x in git_log_parser.extract_commits(raw_log_string)]
+    chunks = git_log_parser._split_chunks(raw_log_string, 200)
+    assert 1 < len(chunks)
+    assert raw_log_string == '\n'.join(chunks)
+    commits = git_log_parser.extract_commits(raw_log_string, processes=2, chunk_size=200)
+    assert expected == [CommitFields.extract(x) for x in commits]
+
+
+def test_extract_commits_with_changes() -> None:
+    numstat_commits = git_log_parser.extract_commits_with_changes(
+        ResourceReader.read(
+            file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_with_changes_numstat.txt")
+        ),
+        "numstat"
+    )
+    name_status_commits = git_log_parser.extract_commits_with_changes(
+        ResourceReader.read(
+            file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_with_changes_name_status.txt")
+        ),
+        "name-status"
+    )
+    assert ["three", "empty", "two\n\nbody", "one"] == [x.message for x in numstat_commits]
+    assert [x.commit_id for x in numstat_commits] == [x.commit_id for x in name_status_commits]
+    assert (FileChange("z", added=1, deleted=0),) == numstat_commits[0].changes
+    assert () == numstat_commits[1].changes
+    assert (
+        FileChange("b.txt", old_path="a.txt", added=1, deleted=0),
+        FileChange("bin.dat")
+    ) == numstat_commits[2].changes
+    assert (
+        FileChange("b.txt", old_path="a.txt", status="R"),
+        FileChange("bin.dat", status="A")
+    ) == name_status_commits[2].changes
+    assert ["a.txt", "sp ace.txt"] == [x.path for x in name_status_commits[3].changes]
+    assert git_log_parser.extract_commits(
+        ResourceReader.read(file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_1.txt"))
+    )[0].changes is None
@@ -0,0 +1,106 @@
+import os
+import tracemalloc
+
+from atudomain.git import parsers
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.parsers import GitMachineLogParser
+from tests.util import CommitFields
+from tests.util import ResourceReader
+from tests import RESOURCES_DIR
+
+
+MODULE_RESOURCES_DIR = os.path.join(RESOURCES_DIR, "test_GitMachineLogParser")
+
+git_machine_log_parser = GitMachineLogParser()
+
+
+def test_extract_commits_matches_raw_format() -> None:
+    machine_log_string_1 = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_1.txt")
+    )
+    raw_log_string = ResourceReader.read(
+        file=os.path.join(f"{RESOURCES_DIR}", "test_GitLogParser", "test_extract_commits_2.txt")
+    )
+
+    commits = git_machine_log_parser.extract_commits(
+        raw_log_string=machine_log_string_1
+    )
+
+    assert 4 == len(commits)
+    assert [
+        CommitFields.extract(x) for x in GitLogParser().extract_commits(raw_log_string)
+    ] == [
+        CommitFields.extract(x) for x in commits
+    ]
+
+
+def test_iter_commits_with_unaligned_chunks() -> None:
+    machine_log_string_1 = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_1.txt")
+    )
+    chunks = [machine_log_string_1[i:i + 7] for i in range(0, len(machine_log_string_1), 7)]
+
+    commits = list(git_machine_log_parser.iter_commits(
+        raw_log_chunks=chunks
+    ))
+
+    assert [
+        CommitFields.extract(x) for x in git_machine_log_parser.extract_commits(machine_log_string_1)
+    ] == [
+        CommitFields.extract(x) for x in commits
+    ]
+
+
+def _generate_machine_log_chunks(
+        count: int
+):
+    for i in range(count):
+        yield '\x1e'.join([
+            f"{i + 1:040x}",
+            f"{0:040x}",
+            f"{i + 2:040x}",
+            f"Author {i % 10}",
+            f"author{i % 10}@example.com",
+            str(1600000000 + i),
+            f"Author {i % 10}",
+            f"author{i % 10}@example.com",
+            str(1600000000 + i),
+            f"Commit {i}\n"
+        ]) + '\0'
+
+
+def _measure_iter_commits_peak(
+        count: int
+) -> int:
+    tracemalloc.start()
+    try:
+        for _ in git_machine_log_parser.iter_commits(_generate_machine_log_chunks(count)):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_commits_memory_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(parsers, "STREAM_IDENTITIES_LIMIT", 1000)
+
+    short_peak = _measure_iter_commits_peak(2000)
+    long_peak = _measure_iter_commits_peak(20000)
+
+    assert long_peak < 2 * short_peak
+
+
+def test_extract_lazy_commits() -> None:
+    machine_log_string_1 = ResourceReader.read(
+        file=os.path.join(f"{MODULE_RESOURCES_DIR}", "test_extract_commits_1.txt")
+    )
+
+    lazy_commits = git_machine_log_parser.extract_lazy_commits(machine_log_string_1)
+
+    assert 4 == len(lazy_commits)
+    assert "Merge branch 'feature'" == lazy_commits[0].message_subject
+    assert [
+        CommitFields.extract(x) for x in git_machine_log_parser.extract_commits(machine_log_string_1)
+    ] == [
+        CommitFields.extract(x) for x in lazy_commits
+    ]
@@ -0,0 +1,182 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.objectstore import GitObjectStore
+from atudomain.git.objectstore import LIMIT_SLOP
+from atudomain.git.objectstore import apply_delta
+from atudomain.git.repository import Git
+from atudomain.git.repository import MissingObjectError
+from atudomain.git.repository import NoCommitsError
+from atudomain.git.repository import NotARepositoryError
+from tests import SANDBOX_DIR
+from tests.util import CommitFields
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "object_store_repo")
+
+
+def run(command):
+    subprocess.run(command, shell=True, cwd=repo_dir, check=True, stdout=subprocess.DEVNULL)
+
+
+def create_repo():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init -q {repo_dir}", shell=True, check=True)
+    run("git config user.name 'Test Example'")
+    run("git config user.email test@example.com")
+    for i in range(20):
+        with open(os.path.join(repo_dir, "file.txt"), "a") as f:
+            f.write(f"line {i} " + "content " * 50 + "\n")
+        run("git add file.txt")
+        date = f"GIT_AUTHOR_DATE='{1600000000 + i * 60} +0000' GIT_COMMITTER_DATE='{1600000000 + i * 60} +0000'"
+        run(f"{date} git commit -q -m 'Commit {i}' -m 'Body of commit {i}'")
+        if i == 10:
+            run("git checkout -q -b feature")
+        if i == 15:
+            run("git checkout -q -")
+            run(f"{date} git merge -q --no-ff feature -m 'Merge feature'")
+    run("git tag -a v1 -m 'Version 1' HEAD~2")
+
+
+def assert_backends_match():
+    git = Git(repo_dir)
+    python_git = Git(repo_dir, backend="python")
+    for revision_range in ["", "HEAD~3", "v1", "feature", "HEAD~5..HEAD", "feature..master", "master..feature", "HEAD~2..feature"]:
+        assert [CommitFields.extract(x) for x in git.get_commits(revision_range)] == [
+            CommitFields.extract(x) for x in python_git.get_commits(revision_range)
+        ]
+    commit_ids = [x.commit_id for x in git.get_commits()]
+    assert [CommitFields.extract(x) for x in git.get_commits_by_id(commit_ids)] == [
+        CommitFields.extract(x) for x in python_git.get_commits_by_id(commit_ids)
+    ]
+    blob_id = git.read_object("HEAD:file.txt")[0].object_id
+    tree_id = git.read_object("HEAD^{tree}")[0].object_id
+    object_ids = [blob_id, tree_id, commit_ids[0], "0" * 40]
+    assert git.object_info(object_ids) == python_git.object_info(object_ids)
+    for object_id in object_ids[:3]:
+        assert git.read_object(object_id) == python_git.read_object(object_id)
+    git.close()
+    python_git.close()
+
+
+@pytest.fixture
+def repo():
+    create_repo()
+    yield repo_dir
+    shutil.rmtree(repo_dir)
+
+
+def test_loose_objects(repo):
+    assert_backends_match()
+
+
+def test_packed_objects_with_offset_deltas(repo):
+    run("git gc -q --aggressive")
+    assert not any(x for x in os.listdir(os.path.join(repo_dir, ".git", "objects")) if len(x) == 2)
+    assert_backends_match()
+
+
+def test_packed_objects_with_ref_deltas_and_index_v1(repo):
+    run("git -c repack.useDeltaBaseOffset=false -c pack.indexVersion=1 repack -q -a -d -f")
+    assert_backends_match()
+
+
+def test_delta_base_cache_is_bounded(repo):
+    run("git gc -q --aggressive")
+    git = Git(repo_dir)
+    blob_ids = [git.read_object(f"HEAD~{i}:file.txt")[0].object_id for i in range(10)]
+    object_store = GitObjectStore(os.path.join(repo_dir, ".git"), delta_base_cache_size=4096)
+    for blob_id in blob_ids:
+        assert git.read_object(blob_id)[1] == object_store.read_object(blob_id)[1]
+    assert object_store._delta_base_cache._bytes <= 4096
+    object_store.close()
+    git.close()
+
+
+def test_range_walk_stops_at_excluded_history(repo):
+    store = GitObjectStore(os.path.join(repo_dir, ".git"))
+    decoded = list()
+    commit_header = store._commit_header
+
+    def counting_commit_header(commit_id):
+        decoded.append(commit_id)
+        return commit_header(commit_id)
+
+    store._commit_header = counting_commit_header
+    expected = subprocess.run(
+        "git rev-list HEAD~5..HEAD", shell=True, cwd=repo_dir, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout.split()
+    assert expected == [x for x, _ in store.walk_commits("HEAD~5..HEAD")]
+    assert len(set(decoded)) <= len(expected) + 2 + LIMIT_SLOP
+    store.close()
+
+
+def test_range_walk_with_skewed_dates(repo):
+    def commit(message, timestamp):
+        date = f"GIT_AUTHOR_DATE='{timestamp} +0000' GIT_COMMITTER_DATE='{timestamp} +0000'"
+        run(f"{date} git commit -q --allow-empty -m '{message}'")
+
+    run("git checkout -q --orphan skew")
+    commit("A", 1700000000)
+    run("git checkout -q -b inc")
+    commit("I", 1700000200)
+    run("git checkout -q -b exc skew")
+    commit("X", 1600000500)
+    commit("E", 1700000100)
+    git = Git(repo_dir)
+    python_git = Git(repo_dir, backend="python")
+    assert ["I"] == [x.message for x in git.get_commits("exc..inc")]
+    assert ["I"] == [x.message for x in python_git.get_commits("exc..inc")]
+    git.close()
+    python_git.close()
+
+
+def test_branches_named_like_git_directory_files(repo):
+    git = Git(repo_dir)
+    python_git = Git(repo_dir, backend="python")
+    for branch in ["config", "description", "index", "packed-refs"]:
+        run(f"git branch {branch} HEAD~{len(branch) % 5}")
+        assert git.get_commits(branch)[0].commit_id == python_git.get_commits(branch)[0].commit_id
+    run("git gc -q")
+    assert git.get_commits("config")[0].commit_id == python_git.get_commits("config")[0].commit_id
+    assert git.get_commits("HEAD")[0].commit_id == python_git.get_commits("HEAD")[0].commit_id
+    git.close()
+    python_git.close()
+
+
+def test_is_ancestor_without_commit_graph(repo):
+    python_git = Git(repo_dir, backend="python")
+    assert python_git.is_ancestor("HEAD~5", "HEAD")
+    assert python_git.is_ancestor("feature", "HEAD")
+    assert not python_git.is_ancestor("HEAD", "feature")
+    python_git.close()
+
+
+def test_missing_objects_and_revisions(repo):
+    python_git = Git(repo_dir, backend="python")
+    with pytest.raises(MissingObjectError):
+        python_git.read_object("0" * 40)
+    with pytest.raises(NoCommitsError):
+        python_git.get_commits("missing-branch")
+
+
+def test_empty_and_invalid_repo():
+    shutil.rmtree(repo_dir, ignore_errors=True)
+    subprocess.run(f"git init -q {repo_dir}", shell=True, check=True)
+    with pytest.raises(NoCommitsError):
+        Git(repo_dir, backend="python").get_commits()
+    shutil.rmtree(repo_dir)
+    os.makedirs(repo_dir)
+    with pytest.raises(NotARepositoryError):
+        Git(repo_dir, backend="python")
+    shutil.rmtree(repo_dir)
+
+
+def test_apply_delta():
+    base = b"0123456789"
+    delta = bytes([10, 7, 0x91, 2, 3]) + bytes([4]) + b"abcd"
+    assert b"234abcd" == apply_delta(base, delta)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.refs import GitRefStore
+from atudomain.git.repository import Git
+from tests import SANDBOX_DIR
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+refs_dir = os.path.join(SANDBOX_DIR, "refs")
+origin_dir = os.path.join(refs_dir, "origin")
+repo_dir = os.path.join(refs_dir, "repo")
+
+
+def run(command, cwd=repo_dir):
+    return subprocess.run(command, shell=True, cwd=cwd, stdout=subprocess.PIPE, universal_newlines=True).stdout
+
+
+@pytest.fixture
+def git():
+    if os.path.isdir(refs_dir):
+        shutil.rmtree(refs_dir)
+    os.makedirs(refs_dir)
+    run(f"git init {origin_dir}", cwd=refs_dir)
+    run("git config user.name Test Example", cwd=origin_dir)
+    run("git config user.email test@example.com", cwd=origin_dir)
+    run("git commit --allow-empty -m first", cwd=origin_dir)
+    run("git branch origin-feature", cwd=origin_dir)
+    run(f"git clone {origin_dir} {repo_dir}", cwd=refs_dir)
+    run("git config user.name Test Example")
+    run("git config user.email test@example.com")
+    run("git commit --allow-empty -m second")
+    run("git branch packed")
+    run("git tag -a v1 -m v1")
+    run("git pack-refs --all")
+    run("git commit --allow-empty -m third")
+    run("git branch loose/nested")
+    run("git symbolic-ref refs/heads/alias refs/heads/master")
+    yield Git(repo_dir)
+    shutil.rmtree(refs_dir)
+
+
+def test_get_branches_matches_git_branch(git):
+    ref_store = GitRefStore(os.path.join(repo_dir, ".git"))
+    branches = ref_store.get_branches()
+    assert git.get_branches() == list(branches)
+    for name, object_id in branches.items():
+        assert run(f"git rev-parse {name}").strip() == object_id
+    assert "remotes/origin/HEAD" not in branches
+    assert "refs/remotes/origin/HEAD" in ref_store.get_symbolic_refs()
+
+
+def test_get_refs(git):
+    refs = GitRefStore(os.path.join(repo_dir, ".git")).get_refs()
+    output = run("git for-each-ref --format='%(refname) %(objectname)'")
+    expected = dict(x.split(" ") for x in output.split("\n") if x)
+    assert expected == refs
+    assert refs["refs/heads/alias"] == refs["refs/heads/master"]
+    assert run("git rev-parse v1").strip() == refs["refs/tags/v1"]
+
+
+def test_cache_invalidated_by_ref_changes(git):
+    ref_store = GitRefStore(os.path.join(repo_dir, ".git"))
+    loads = list()
+    load = ref_store._load
+
+    def counting_load():
+        loads.append(None)
+        load()
+
+    ref_store._load = counting_load
+    ref_store.get_branches()
+    ref_store.get_branches()
+    assert 1 == len(loads)
+    run("git branch new/branch")
+    assert "new/branch" in ref_store.get_branches()
+    run("git commit --allow-empty -m fourth")
+    assert run("git rev-parse master").strip() == ref_store.get_branches()["master"]
+    run("git pack-refs --all")
+    run("git branch -D packed")
+    assert "packed" not in ref_store.get_branches()
+    assert 4 == len(loads)
+
+
+def test_git_get_branch_refs(git):
+    branch_refs = git.get_branch_refs(include="^(master|loose/.*)$", exclude="nested")
+    assert {"master": run("git rev-parse master").strip()} == branch_refs
+    python_git = Git(repo_dir, backend="python")
+    assert git.get_branches() == python_git.get_branches()
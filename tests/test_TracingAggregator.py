@@ -0,0 +1,107 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+from atudomain.git.objects import NewCommit
+from atudomain.git.repository import Git
+from atudomain.git.tracing import GitTracer
+from atudomain.git.tracing import OpenTelemetryTracer
+from atudomain.git.tracing import TracingAggregator
+from tests import SANDBOX_DIR
+
+
+os.makedirs(SANDBOX_DIR, exist_ok=True)
+repo_dir = os.path.join(SANDBOX_DIR, "tracing_repo")
+
+
+class RecordingTracer(GitTracer):
+    def __init__(self):
+        self.commands = list()
+        self.parses = list()
+
+    def on_command(self, event):
+        self.commands.append(event)
+
+    def on_parse(self, event):
+        self.parses.append(event)
+
+
+@pytest.fixture
+def repo():
+    if os.path.isdir(repo_dir):
+        shutil.rmtree(repo_dir)
+    subprocess.run(f"git init {repo_dir}", shell=True)
+    subprocess.run("git config user.name Test", shell=True, cwd=repo_dir)
+    subprocess.run("git config user.email test@example.com", shell=True, cwd=repo_dir)
+    for message in ["first", "second"]:
+        subprocess.run(f"git commit --allow-empty -m {message}", shell=True, cwd=repo_dir)
+    yield repo_dir
+    shutil.rmtree(repo_dir)
+
+
+def test_tracer_receives_events(repo):
+    tracer = RecordingTracer()
+    git = Git(repo, tracer=tracer)
+    git.get_commits()
+    assert ["rev-parse", "log"] == [x.subcommand for x in tracer.commands]
+    log_event = tracer.commands[-1]
+    assert 0 == log_event.returncode
+    assert 0 < log_event.stdout_bytes
+    assert 0 <= log_event.cpu_time
+    assert 0 < log_event.wall_time
+    assert ["GitLogParser.extract_commits"] == [x.parser for x in tracer.parses]
+    assert 2 == tracer.parses[0].record_count
+    assert log_event.stdout_bytes == tracer.parses[0].input_size
+    with pytest.raises(subprocess.CalledProcessError):
+        git.checkout("missing")
+    assert 0 != tracer.commands[-1].returncode
+    assert 0 < tracer.commands[-1].stderr_bytes
+
+
+def test_streaming_processes_are_traced(repo):
+    subprocess.run("git commit -q --allow-empty -m 'zażółć'", shell=True, cwd=repo)
+    tracer = RecordingTracer()
+    git = Git(repo, tracer=tracer)
+    assert "zażółć" == next(git.iter_commits()).message
+    commits = list(git.iter_commits())
+    assert 3 == len(commits)
+    log_event = tracer.commands[-1]
+    assert "log" == log_event.subcommand
+    raw_log = subprocess.run(["git", "log", "--pretty=raw"], cwd=repo, stdout=subprocess.PIPE).stdout
+    assert len(raw_log) == log_event.stdout_bytes
+    git.get_commits()
+    assert len(raw_log) == tracer.parses[-1].input_size
+    git.create_commits([NewCommit("imported", files={"file.txt": "content"})])
+    assert "fast-import" == tracer.commands[-1].subcommand
+    assert 0 == tracer.commands[-1].returncode
+
+
+def test_aggregator(repo):
+    aggregator = TracingAggregator()
+    git = Git(repo, tracer=aggregator)
+    for _ in range(3):
+        git.get_commits()
+    git.get_branches()
+    with pytest.raises(subprocess.CalledProcessError):
+        git.checkout("missing")
+    commands = aggregator.get_command_statistics()
+    assert 3 == commands["log"]["count"]
+    assert 3 == sum(commands["log"]["histogram"])
+    assert 1 == commands["checkout"]["failures"]
+    parsers = aggregator.get_parse_statistics()
+    assert 6 == parsers["GitLogParser.extract_commits"]["records"]
+    assert ["master"] == git.get_branches()
+    assert "git log" in aggregator.report()
+    aggregator.reset()
+    assert {} == aggregator.get_command_statistics()
+
+
+def test_open_telemetry_tracer_requires_package():
+    try:
+        import opentelemetry
+    except ImportError:
+        with pytest.raises(ImportError):
+            OpenTelemetryTracer()
+    else:
+        OpenTelemetryTracer()
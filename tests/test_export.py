@@ -0,0 +1,103 @@
+import datetime
+import os
+import shutil
+import pytest
+
+from atudomain.git.export import export_commits
+from atudomain.git.export import load_commit_table
+from atudomain.git.export import load_commits
+from atudomain.git.objects import Commit
+from atudomain.git.parsers import GitLogParser
+from atudomain.git.table import CommitTable
+from tests import RESOURCES_DIR
+from tests import SANDBOX_DIR
+from tests.util import CommitFields
+from tests.util import ResourceReader
+
+
+export_dir = os.path.join(SANDBOX_DIR, "export")
+commits = GitLogParser().extract_commits(
+    ResourceReader.read(file=os.path.join(RESOURCES_DIR, "test_GitLogParser", "test_extract_commits_2.txt"))
+)
+
+
+
+
+def with_timezones(commit, author_offset, committer_offset):
+    return Commit(
+        is_merge=commit.is_merge,
+        commit_id=commit.commit_id,
+        tree=commit.tree,
+        parents=commit.parents,
+        author=commit.author,
+        author_email=commit.author_email,
+        author_date=commit.author_date.astimezone(datetime.timezone(datetime.timedelta(minutes=author_offset))),
+        committer=commit.committer,
+        committer_email=commit.committer_email,
+        committer_date=commit.committer_date.astimezone(
+            datetime.timezone(datetime.timedelta(minutes=committer_offset))
+        ),
+        message=commit.message
+    )
+
+
+commits_with_timezones = [with_timezones(x, 120, -330) for x in commits]
+
+
+@pytest.fixture
+def directory():
+    os.makedirs(export_dir, exist_ok=True)
+    yield export_dir
+    shutil.rmtree(export_dir)
+
+
+@pytest.mark.parametrize("name", ["commits.ndjson", "commits.csv", "history.commits", "commits.csv.gz"])
+def test_export_and_load(directory, name):
+    path = os.path.join(directory, name)
+    assert len(commits) == export_commits(iter(commits), path)
+    loaded = list(load_commits(path))
+    assert [CommitFields.extract(x) for x in commits] == [CommitFields.extract(x) for x in loaded]
+
+
+@pytest.mark.parametrize("name", ["commits.ndjson", "commits.csv", "history.commits"])
+def test_timezones_are_kept(directory, name):
+    path = os.path.join(directory, name)
+    export_commits(commits_with_timezones, path)
+    loaded = list(load_commits(path))
+    for commit, loaded_commit in zip(commits_with_timezones, loaded):
+        assert commit.get_author_date_string() == loaded_commit.get_author_date_string()
+        assert commit.get_committer_date_string() == loaded_commit.get_committer_date_string()
+        assert commit.author_date == loaded_commit.author_date
+    assert "+0200" == loaded[0].get_author_date_string("%z")
+    assert "-0530" == loaded[0].get_committer_date_string("%z")
+
+
+def test_explicit_format(directory):
+    path = os.path.join(directory, "commits.bin")
+    with pytest.raises(ValueError):
+        export_commits(commits, path)
+    export_commits(commits, path, file_format="binary")
+    assert [x.parents for x in commits] == [x.parents for x in load_commits(path, file_format="binary")]
+    with pytest.raises(ValueError):
+        list(load_commits(path, file_format="ndjson"))
+
+
+def test_load_commit_table(directory):
+    pytest.importorskip("numpy")
+    path = os.path.join(directory, "commits.commits")
+    export_commits(commits, path)
+    table = load_commit_table(path)
+    assert [x.commit_id.encode() for x in commits] == list(table.commit_ids)
+    assert [x.is_merge for x in commits] == list(table.is_merge)
+
+
+def test_load_commit_table_with_timezones(directory):
+    pytest.importorskip("numpy")
+    path = os.path.join(directory, "commits.commits")
+    export_commits(commits_with_timezones, path)
+    table = load_commit_table(path)
+    expected = CommitTable.from_commits(commits_with_timezones)
+    assert [120] * len(commits) == list(table.author_offsets)
+    assert [-330] * len(commits) == list(table.committer_offsets)
+    assert list(expected.hour_histogram()) == list(table.hour_histogram())
+    assert list(expected.weekday_histogram(date="committer")) == list(table.weekday_histogram(date="committer"))
@@ -6,3 +6,23 @@ class ResourceReader:
         with open(file, 'r') as f:
             resource_string = f.read()
         return resource_string
+
+
+class CommitFields:
+    @staticmethod
+    def extract(commit) -> tuple:
+        return (
+            commit.is_merge,
+            commit.commit_id,
+            commit.tree,
+            list(commit.parents),
+            commit.author,
+            commit.author_email,
+            commit.author_date,
+            commit.committer,
+            commit.committer_email,
+            commit.committer_date,
+            commit.message,
+            commit.message_subject,
+            commit.message_body
+        )